@@ -9,6 +9,7 @@ from data_fetcher import GoldDataFetcher
 from technical_analysis import TechnicalAnalyzer
 from sentiment_analysis import SentimentAnalyzer
 from predictor import GoldPricePredictor
+from price_pyramid import choose_level
 from config import Config
 
 st.set_page_config(
@@ -24,6 +25,23 @@ def load_data():
     df = fetcher.get_latest_data()
     return df
 
+@st.cache_data(ttl=3600)
+def load_price_levels(df):
+    fetcher = GoldDataFetcher()
+    return fetcher.load_price_levels(df)
+
+RESOLUTION_OPTIONS = {'自动': None, '日线': '1d', '周线': '1w', '月线': '1M', '季线': '1Q'}
+
+def select_chart_data(df, resolution):
+    """按所选周期取K线；自动时选择不超过 CHART_MAX_POINTS 根的最细周期"""
+    levels = {'1d': df, **{level: bars for level, bars in load_price_levels(df).items() if not bars.empty}}
+    row_counts = {level: len(bars) for level, bars in levels.items()}
+    if resolution is None:
+        level = choose_level(row_counts, max_points=Config.CHART_MAX_POINTS)
+    else:
+        level = choose_level(row_counts, resolution=resolution)
+    return levels[level], level
+
 @st.cache_data(ttl=1800)
 def analyze_technical(df):
     analyzer = TechnicalAnalyzer()
@@ -244,6 +262,8 @@ def main():
             default=['SMA', 'RSI', 'MACD', 'Bollinger Bands']
         )
         
+        chart_resolution = st.selectbox("K线周期", list(RESOLUTION_OPTIONS), index=0)
+        
         refresh_data = st.button("🔄 刷新数据")
         
         st.markdown("---")
@@ -290,7 +310,8 @@ def main():
     
     with tab1:
         st.subheader("黄金价格走势图")
-        fig_price = plot_price_chart(df)
+        chart_df, chart_level = select_chart_data(df, RESOLUTION_OPTIONS[chart_resolution])
+        fig_price = plot_price_chart(chart_df, title=f"黄金价格走势（{chart_level}）")
         st.plotly_chart(fig_price, use_container_width=True)
         
         st.subheader("价格统计")
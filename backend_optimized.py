@@ -1,18 +1,26 @@
-from flask import Flask, jsonify, request, render_template
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
+from flask import Flask, jsonify, request, render_template, Response, stream_with_context
 from flask_cors import CORS
-from data_fetcher import GoldDataFetcher
-from technical_analysis import TechnicalAnalyzer
-from sentiment_analysis import SentimentAnalyzer
-from predictor import GoldPricePredictor
-from central_bank_reserves import CentralBankGoldReserves
+from http_client import get_http_client
+from source_health import get_source_health
+from rate_limiter import get_rate_limiter
+from stale_cache import get_background_refresher
+from tick_stream import get_tick_poller
+from fetch_context import FetchContext
 from config import Config
-import pandas as pd
 from datetime import datetime
 import threading
-import time
-import psutil
 import logging
 import os
+import gzip
+import pickle
+import tempfile
+
+# pandas、sklearn、ta、akshare 等较重的依赖在首次更新数据时才导入（见 _run_update），
+# 使 worker 可以尽快开始处理请求
 
 # 配置日志记录
 logging.basicConfig(
@@ -54,16 +62,66 @@ performance_metrics = {
     'last_update_duration': 0,
     'api_call_count': 0,
     'error_count': 0,
+    'last_update_fetch_dedup': None,
     'start_time': datetime.now()
 }
 
+# 启动各阶段耗时（秒）：模块导入、快照恢复、首次有数据可用、首次完成数据更新
+startup_metrics = {
+    'mode': None,
+    'import_s': None,
+    'restore_s': None,
+    'restored_snapshot_time': None,
+    'first_ready_s': None,
+    'first_update_s': None
+}
+
+# 快照恢复或首次更新完成后置位，接口在此之前等待而不是各自触发同步更新
+_startup_ready = threading.Event()
+_startup_thread = None
+_startup_lock = threading.Lock()
+
+# 同一时间只运行一次数据更新，并发调用方等待正在进行的更新完成
+_update_lock = threading.Lock()
+
+# 跨更新复用的技术指标分析器（保留指标结果缓存和流式指标状态）
+_tech_analyzer = None
+# data_cache 中技术指标和支撑阻力位对应的指标缓存键
+_technical_digest = None
+
 def update_data():
+    if not _update_lock.acquire(blocking=False):
+        logger.info("数据更新正在进行中，等待其完成...")
+        with _update_lock:
+            return
+    try:
+        # 本周期内相同的历史数据、实时报价和新闻请求只执行一次
+        with FetchContext('update_data') as fetch_context:
+            _run_update()
+        performance_metrics['last_update_fetch_dedup'] = fetch_context.stats()
+        logger.info(f"本次更新请求去重: {fetch_context.hits} 次命中, {fetch_context.misses} 次实际请求")
+    finally:
+        _update_lock.release()
+
+def _run_update():
     start_time = time.time()
     logger.info("开始更新数据...")
     
     try:
+        import pandas as pd
+        from data_fetcher import GoldDataFetcher
+        from technical_analysis import TechnicalAnalyzer
+        from sentiment_analysis import SentimentAnalyzer
+        from predictor import GoldPricePredictor
+        from central_bank_reserves import CentralBankGoldReserves
+        from indicator_cache import HIT
+        
+        global _tech_analyzer, _technical_digest
         fetcher = GoldDataFetcher()
-        tech_analyzer = TechnicalAnalyzer()
+        # 指标分析器跨更新保留流式状态，只有新增的K线需要计算
+        if _tech_analyzer is None:
+            _tech_analyzer = TechnicalAnalyzer()
+        tech_analyzer = _tech_analyzer
         sentiment_analyzer = SentimentAnalyzer()
         predictor = GoldPricePredictor()
         
@@ -81,28 +139,45 @@ def update_data():
         overall_sentiment = {'avg_compound': 0, 'positive_count': 0, 'negative_count': 0, 'neutral_count': 0}
         fear_greed = {'index': 50, 'label': 'Neutral'}
         
+        technical_unchanged = False
         if not df.empty:
-            df_tech = tech_analyzer.calculate_all_indicators(df)
+            df_tech = tech_analyzer.update_indicators(df)
+            # 价格数据与上次相同：指标结果来自缓存，沿用已有的技术指标和支撑阻力位
+            technical_unchanged = (tech_analyzer.cache.last_status == HIT
+                                   and _technical_digest == tech_analyzer.cache.digest)
             
             predictor.train(df, sentiment_score)
             predictions = predictor.ensemble_predict(df, Config.PREDICTION_DAYS, sentiment_score)
             
-            support_resistance = tech_analyzer.get_support_resistance(df_tech)
+            if technical_unchanged:
+                support_resistance = data_cache['support_resistance']
+            else:
+                support_resistance = tech_analyzer.get_support_resistance(df_tech)
             
             overall_sentiment = sentiment_analyzer.calculate_overall_sentiment(sentiment_df)
             fear_greed = sentiment_analyzer.analyze_market_fear_greed(df)
         
+        # 周线/月线/季线（含实时报价补上的今天数据），供长周期图表按需选择
+        price_levels = fetcher.load_price_levels(df) if not df.empty else {}
+        
         # 确保初始化所有必要的键
         data_cache['price_data'] = df.to_dict('records') if not df.empty else []
-        data_cache['technical_data'] = df_tech.to_dict('records') if not df_tech.empty else []
+        data_cache['price_levels'] = {
+            level: bars[['Date', 'Open', 'High', 'Low', 'Close', 'Volume', 'Bars']].to_dict('records')
+            for level, bars in price_levels.items()
+        }
+        if not technical_unchanged:
+            data_cache['technical_data'] = df_tech.to_dict('records') if not df_tech.empty else []
         data_cache['sentiment_data'] = sentiment_df.to_dict('records') if not sentiment_df.empty else []
         data_cache['predictions'] = predictions
         data_cache['support_resistance'] = support_resistance
+        _technical_digest = tech_analyzer.cache.digest if not df.empty else None
         data_cache['overall_sentiment'] = overall_sentiment
         data_cache['fear_greed'] = fear_greed
         data_cache['realtime_price'] = fetcher.fetch_realtime_price()
         
         # 获取央行增持黄金数据
+        central_bank = None
         try:
             central_bank = CentralBankGoldReserves()
             central_bank_data = central_bank.get_central_bank_data()
@@ -112,6 +187,12 @@ def update_data():
             data_cache['central_bank_data'] = {'success': False, 'error': str(e), 'data': []}
         
         data_cache['last_update'] = datetime.now().isoformat()
+        data_cache['price_cache_status'] = fetcher.last_cache_status
+        
+        # 本次使用了过期缓存时，后台刷新完成后再更新一次
+        for revalidation in (fetcher.revalidation, getattr(central_bank, 'revalidation', None)):
+            if revalidation is not None:
+                revalidation.add_done_callback(_update_after_revalidation)
         
         # 更新性能指标
         duration = time.time() - start_time
@@ -120,6 +201,11 @@ def update_data():
         
         logger.info(f"数据更新完成，耗时: {duration:.2f}秒")
         
+        _mark_ready()
+        if startup_metrics['first_update_s'] is None:
+            startup_metrics['first_update_s'] = round(time.perf_counter() - _IMPORT_STARTED, 3)
+        _save_snapshot()
+        
     except Exception as e:
         logger.error(f"数据更新失败: {e}", exc_info=True)
         performance_metrics['error_count'] += 1
@@ -132,8 +218,104 @@ def background_updater():
             time.sleep(Config.UPDATE_INTERVAL_HOURS * 3600)
         except Exception as e:
             logger.error(f"后台更新出错: {e}", exc_info=True)
+            # 首次更新失败也不再让接口等待
+            _startup_ready.set()
             time.sleep(300)
 
+_followup_lock = threading.Lock()
+_followup_pending = False
+
+def _update_after_revalidation(future):
+    """过期缓存在后台刷新成功后重新计算一次，让接口尽快用上新数据"""
+    global _followup_pending
+    if future.cancelled() or future.exception() is not None:
+        return
+    with _followup_lock:
+        # 多个缓存同时刷新完成时只补一次更新
+        if _followup_pending:
+            return
+        _followup_pending = True
+    
+    def run():
+        global _followup_pending
+        # 等待正在进行的更新结束，再基于刷新后的缓存重新更新
+        with _update_lock:
+            pass
+        with _followup_lock:
+            _followup_pending = False
+        update_data()
+    
+    threading.Thread(target=run, name='revalidated-update', daemon=True).start()
+
+def _mark_ready():
+    if startup_metrics['first_ready_s'] is None:
+        startup_metrics['first_ready_s'] = round(time.perf_counter() - _IMPORT_STARTED, 3)
+    _startup_ready.set()
+
+def _save_snapshot():
+    """把最近一次更新的结果写入磁盘，供下次启动时立即恢复"""
+    path = Config.BACKEND_SNAPSHOT_FILE
+    try:
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.snapshot_', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(gzip.compress(pickle.dumps(dict(data_cache), protocol=pickle.HIGHEST_PROTOCOL), compresslevel=3))
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    except Exception as e:
+        logger.error(f"保存数据快照失败: {e}")
+
+def restore_snapshot():
+    """从磁盘恢复上次的数据快照，成功返回 True"""
+    path = Config.BACKEND_SNAPSHOT_FILE
+    if not os.path.exists(path):
+        return False
+    start = time.perf_counter()
+    try:
+        with open(path, 'rb') as f:
+            snapshot = pickle.loads(gzip.decompress(f.read()))
+    except Exception as e:
+        logger.error(f"恢复数据快照失败: {e}")
+        return False
+    
+    # 启动后已有更新结果时不再用旧快照覆盖
+    if data_cache.get('last_update') is None:
+        data_cache.update(snapshot)
+    startup_metrics['restore_s'] = round(time.perf_counter() - start, 3)
+    startup_metrics['restored_snapshot_time'] = snapshot.get('last_update')
+    logger.info(f"已恢复数据快照 ({snapshot.get('last_update')})，耗时 {startup_metrics['restore_s']} 秒")
+    return True
+
+def _startup_sequence():
+    if restore_snapshot() and data_cache.get('price_data'):
+        _mark_ready()
+    background_updater()
+
+def start_background_startup():
+    """
+    快速启动：立即恢复上次的数据快照，然后在后台线程中刷新数据并定时更新。
+    
+    gunicorn 不会执行 __main__，由 gunicorn.conf.py 在 worker 启动后调用。
+    """
+    global _startup_thread
+    with _startup_lock:
+        if _startup_thread is not None:
+            return
+        startup_metrics['mode'] = 'fast'
+        _startup_thread = threading.Thread(target=_startup_sequence, name='startup-updater', daemon=True)
+        _startup_thread.start()
+
+def _ensure_data(key):
+    """接口所需的数据尚未就绪时，先等待启动恢复/首次更新，仍没有再同步更新"""
+    if data_cache.get(key) is None and _startup_thread is not None:
+        _startup_ready.wait(timeout=Config.STARTUP_WAIT_SECONDS)
+    if data_cache.get(key) is None:
+        update_data()
+
 @app.route('/api/health')
 def health_check():
     """
@@ -169,6 +351,7 @@ def health_check():
         
         # 获取系统资源使用情况
         try:
+            import psutil
             memory_usage = psutil.Process().memory_info().rss / 1024 / 1024  # MB
             cpu_percent = psutil.cpu_percent(interval=1)
         except:
@@ -182,7 +365,7 @@ def health_check():
         
         if cache_fresh:
             try:
-                last_update_time = pd.to_datetime(cache_status['last_update'])
+                last_update_time = datetime.fromisoformat(cache_status['last_update'])
                 time_since_update = (datetime.now() - last_update_time).total_seconds()
                 recent_update = time_since_update < 7200  # 2小时内更新过
             except:
@@ -202,14 +385,25 @@ def health_check():
                 'last_update_duration': round(performance_metrics['last_update_duration'], 2),
                 'api_call_count': performance_metrics['api_call_count'],
                 'error_count': performance_metrics['error_count'],
+                'last_update_fetch_dedup': performance_metrics['last_update_fetch_dedup'],
                 'memory_usage_mb': round(memory_usage, 2),
                 'cpu_percent': cpu_percent
             },
             'data_quality': {
-                'price_data_count': len(data_cache.get('price_data', [])),
-                'sentiment_data_count': len(data_cache.get('sentiment_data', [])),
+                'price_data_count': len(data_cache.get('price_data') or []),
+                'sentiment_data_count': len(data_cache.get('sentiment_data') or []),
                 'predictions_available': data_cache.get('predictions') is not None
-            }
+            },
+            'startup': startup_metrics,
+            'http': get_http_client().stats(),
+            'sources': get_source_health().snapshot(),
+            'rate_limits': get_rate_limiter().snapshot(),
+            'stale_caches': {
+                'price_cache': data_cache.get('price_cache_status'),
+                'background_refresh': get_background_refresher().snapshot()
+            },
+            'tick_stream': get_tick_poller(create=False).stats() if get_tick_poller(create=False) else None,
+            'indicator_cache': _tech_analyzer.cache.stats() if _tech_analyzer is not None else None
         }
         
         return jsonify(health_data)
@@ -264,31 +458,78 @@ def diagnose_detailed():
 
 @app.route('/api/price')
 def get_price_data():
+    """
+    历史价格
+    可选参数 resolution（如 1w、1M、1Q）或 max_points：返回满足要求的最粗周期K线，
+    而不是总是返回全部日线
+    """
     performance_metrics['api_call_count'] += 1
-    if data_cache['price_data'] is None:
-        update_data()
+    _ensure_data('price_data')
+    
+    from price_pyramid import choose_level
+    resolution = request.args.get('resolution')
+    max_points = request.args.get('max_points', type=int)
+    price_levels = data_cache.get('price_levels') or {}
+    row_counts = {'1d': len(data_cache['price_data'] or [])}
+    row_counts.update({level: len(bars) for level, bars in price_levels.items() if bars})
+    try:
+        level = choose_level(row_counts, resolution, max_points)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
     return jsonify({
         'success': True,
-        'data': data_cache['price_data'],
+        'data': data_cache['price_data'] if level == '1d' else price_levels[level],
+        'resolution': level,
         'last_update': data_cache['last_update']
     })
 
 @app.route('/api/realtime')
 def get_realtime_price():
     performance_metrics['api_call_count'] += 1
-    if data_cache['realtime_price'] is None:
-        update_data()
+    _ensure_data('realtime_price')
     return jsonify({
         'success': True,
         'data': data_cache['realtime_price'],
         'last_update': data_cache['last_update']
     })
 
+@app.route('/api/stream/price')
+def stream_price():
+    """
+    实时报价推送（Server-Sent Events）
+    所有客户端共享同一个后台轮询线程，断线重连时通过 Last-Event-ID 补发错过的报价
+    """
+    performance_metrics['api_call_count'] += 1
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_id')
+    try:
+        last_seq = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_seq = None
+    
+    # 每个推送连接占用一个工作线程，超过上限时让页面改为轮询 /api/realtime
+    stream = get_tick_poller().open_stream(last_seq, max_subscribers=Config.TICK_STREAM_MAX_CLIENTS)
+    if stream is None:
+        retry_after = max(1, int(Config.TICK_STREAM_MAX_SECONDS))
+        return jsonify({
+            'success': False,
+            'error': '实时推送连接数已满，请使用 /api/realtime 轮询',
+            'retry_after': retry_after
+        }), 503, {'Retry-After': str(retry_after)}
+    
+    return Response(
+        stream_with_context(stream),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
 @app.route('/api/technical')
 def get_technical_data():
     performance_metrics['api_call_count'] += 1
-    if data_cache['technical_data'] is None:
-        update_data()
+    _ensure_data('technical_data')
     return jsonify({
         'success': True,
         'data': data_cache['technical_data'],
@@ -298,8 +539,7 @@ def get_technical_data():
 @app.route('/api/sentiment')
 def get_sentiment_data():
     performance_metrics['api_call_count'] += 1
-    if data_cache['sentiment_data'] is None:
-        update_data()
+    _ensure_data('sentiment_data')
     return jsonify({
         'success': True,
         'data': data_cache['sentiment_data'],
@@ -311,8 +551,7 @@ def get_sentiment_data():
 @app.route('/api/predictions')
 def get_predictions():
     performance_metrics['api_call_count'] += 1
-    if data_cache['predictions'] is None:
-        update_data()
+    _ensure_data('predictions')
     
     predictions_data = data_cache['predictions']
     actual_predictions = predictions_data.get('predictions', {}) if isinstance(predictions_data, dict) else {}
@@ -330,8 +569,7 @@ def get_predictions():
 @app.route('/api/support-resistance')
 def get_support_resistance():
     performance_metrics['api_call_count'] += 1
-    if data_cache['support_resistance'] is None:
-        update_data()
+    _ensure_data('support_resistance')
     return jsonify({
         'success': True,
         'data': data_cache['support_resistance'],
@@ -341,8 +579,7 @@ def get_support_resistance():
 @app.route('/api/central-bank')
 def get_central_bank_data():
     performance_metrics['api_call_count'] += 1
-    if data_cache['central_bank_data'] is None:
-        update_data()
+    _ensure_data('central_bank_data')
     return jsonify(data_cache['central_bank_data'])
 
 @app.route('/api/refresh', methods=['POST'])
@@ -364,8 +601,7 @@ def refresh_data():
 @app.route('/api/summary')
 def get_summary():
     performance_metrics['api_call_count'] += 1
-    if data_cache['price_data'] is None:
-        update_data()
+    _ensure_data('price_data')
     
     latest_price = data_cache['price_data'][-1] if data_cache['price_data'] else {}
     latest_tech = data_cache['technical_data'][-1] if data_cache['technical_data'] else {}
@@ -389,13 +625,20 @@ def get_summary():
         'last_update': data_cache['last_update']
     })
 
+startup_metrics['import_s'] = round(time.perf_counter() - _IMPORT_STARTED, 3)
+
 if __name__ == '__main__':
-    print("正在初始化数据...")
-    update_data()
-    
-    print("启动后台数据更新线程...")
-    updater_thread = threading.Thread(target=background_updater, daemon=True)
-    updater_thread.start()
+    if Config.FAST_STARTUP:
+        print("快速启动：恢复数据快照并在后台刷新数据...")
+        start_background_startup()
+    else:
+        startup_metrics['mode'] = 'blocking'
+        print("正在初始化数据...")
+        update_data()
+        
+        print("启动后台数据更新线程...")
+        updater_thread = threading.Thread(target=background_updater, daemon=True)
+        updater_thread.start()
     
     print("=" * 60)
     print("🥇 黄金价格预测系统 - 后端服务")
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+向量化信号回测
+
+对 calculate_all_indicators 输出的 Overall_Signal 和各分项信号列同时回测：所有信号
+排成 K线数 × 信号数 的二维数组，仓位、收益、交易成本、回撤和逐笔交易统计都用整列的
+数组运算完成，没有逐K线的 Python 循环。
+
+规则：
+- 第 t 根K线收盘时的信号决定之后持有的仓位（做多 1 / 空仓 0 / 做空 -1），
+  第 t+1 根K线的收益归属该仓位，不使用未来数据
+- 仓位：信号 >= threshold 做多，<= -threshold 做空，其余空仓（mode='target'）；
+  mode='hold' 时信号回到 0 继续持有原仓位，直到出现反向信号
+- 交易成本：每变动 1 个单位仓位，净值乘以 (1 - cost_bps / 10000)
+- 一笔交易是连续持有同一非零仓位的区间，收益含开仓和平仓成本，胜率按逐笔收益计算
+
+用法:
+    python backtest.py                                  # 最新黄金日线
+    python backtest.py --synthetic 10000                # 模拟日线（几十年）
+    python backtest.py --synthetic 1000000 --freq min   # 模拟分钟线
+    python backtest.py --csv prices.csv --signals Overall_Signal,RSI_Signal --mode hold --cost-bps 5
+"""
+
+import argparse
+import time
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from indicator_kernels import SIGNAL_COLUMNS
+
+SIGNALS = ['Overall_Signal'] + SIGNAL_COLUMNS
+BENCHMARK = 'Buy_Hold'
+MODES = ('target', 'hold')
+METRIC_COLUMNS = ['total_return', 'annual_return', 'annual_volatility', 'sharpe', 'max_drawdown',
+                  'exposure', 'turnover', 'cost_return', 'trades', 'hit_rate', 'avg_trade_return']
+
+
+def signal_positions(signals: np.ndarray, threshold: float = 0.4, mode: str = 'target',
+                     long_only: bool = False) -> np.ndarray:
+    """把信号（K线数 × 信号数）转换为每根K线收盘后的目标仓位（int8：-1/0/1），NaN 视为 0"""
+    if mode not in MODES:
+        raise ValueError(f"未知的仓位模式: {mode}，可选 {MODES}")
+    signals = np.asarray(signals, dtype=float)
+    shape = signals.shape
+    signals = signals.reshape(len(signals), -1)
+    positions = (signals >= threshold).astype(np.int8)
+    positions -= signals <= -threshold
+    if mode == 'hold' and positions.size:
+        # 向下填充最近一次非零信号：按列优先展平，在非零信号和每列开头处分段后整段重复
+        n = len(positions)
+        flat = positions.ravel(order='F')
+        breaks = np.union1d(np.flatnonzero(flat), np.arange(0, flat.size, n))
+        lengths = np.diff(np.append(breaks, flat.size))
+        positions = np.repeat(flat[breaks], lengths).reshape(positions.shape, order='F')
+    if long_only:
+        np.maximum(positions, 0, out=positions)
+    return positions.reshape(shape)
+
+
+def periods_per_year(dates: Optional[np.ndarray], rows: int, default: float = 252.0) -> float:
+    """按日期跨度估算每年的K线数（日线约 252，日内K线随交易时段而定）"""
+    if dates is None or rows < 2:
+        return default
+    dates = pd.to_datetime(dates)
+    years = (dates[-1] - dates[0]) / pd.Timedelta(days=365.25)
+    return (rows - 1) / years if years > 0 else default
+
+
+class BacktestResult:
+    """回测结果：每个信号一列的仓位、净值、回撤，以及汇总指标和逐笔交易"""
+
+    def __init__(self, names: List[str], dates: Optional[np.ndarray], positions: np.ndarray,
+                 equity: np.ndarray, drawdown: np.ndarray, metrics: pd.DataFrame, trades: pd.DataFrame):
+        self.names = names
+        self.dates = dates
+        self.positions = positions
+        self.equity = equity
+        self.drawdown = drawdown
+        self.metrics = metrics
+        self.trades = trades
+
+    @property
+    def returns(self) -> np.ndarray:
+        """每根K线的净收益（含交易成本），按需由净值计算"""
+        previous = np.ones_like(self.equity)
+        previous[1:] = self.equity[:-1]
+        return self.equity / previous - 1
+
+    def equity_frame(self) -> pd.DataFrame:
+        """各信号的净值曲线（按日期索引）"""
+        return pd.DataFrame(self.equity, index=self.dates, columns=self.names)
+
+
+def backtest_arrays(close: np.ndarray, signals: np.ndarray, names: Iterable[str],
+                    dates: Optional[np.ndarray] = None, threshold: float = 0.4, mode: str = 'target',
+                    cost_bps: float = 0.0, long_only: bool = False,
+                    annualization: Optional[float] = None) -> BacktestResult:
+    """
+    按收盘价和信号矩阵（K线数 × 信号数）回测
+
+    annualization 为每年的K线数，默认按 dates 的跨度估算（没有日期时按 252）。
+    年化波动率和夏普比率按每根K线的对数净收益计算。
+    分钟线这样的长序列每个中间数组都有几十 MB，这里尽量原地计算、只在仓位变动处修正成本。
+    """
+    close = np.asarray(close, dtype=float)
+    signals = np.asarray(signals, dtype=float).reshape(len(close), -1)
+    names = list(names)
+    n, k = signals.shape
+    if annualization is None:
+        annualization = periods_per_year(dates, n)
+    cost_log = np.log1p(-cost_bps / 10000.0)
+
+    # 第 t 根K线持有的是第 t-1 根收盘时的目标仓位
+    target = signal_positions(signals, threshold, mode, long_only)
+    held = np.zeros((n, k), dtype=np.int8, order='F')
+    held[1:] = target[:-1]
+    # 仓位变动单位数（0/1/2），在第 t 根K线开始时（即第 t-1 根收盘时）成交
+    change = np.zeros((n, k), dtype=np.int8, order='F')
+    np.subtract(held[1:], held[:-1], out=change[1:])
+    np.abs(change, out=change)
+
+    bar_return = np.zeros(n)
+    if n > 1:
+        bar_return[1:] = close[1:] / close[:-1] - 1
+    # 仓位只有 -1/0/1：多头和空头的对数收益按K线各算一次，再按仓位选取
+    growth = np.where(held > 0, np.log1p(bar_return)[:, None], 0.0)
+    np.copyto(growth, np.log1p(-bar_return)[:, None], where=held < 0)
+    held_flat = held.ravel(order='F')
+    change_flat = change.ravel(order='F')
+    growth_flat = growth.ravel(order='F')
+    traded = np.flatnonzero(change_flat)
+    growth_flat[traded] += change_flat[traded] * cost_log
+
+    # 逐笔交易：连续持有同一非零仓位的区间。按列优先展平后用 reduceat 对每笔开仓到下一笔
+    # 开仓之间的对数净收益求和（其间空仓K线的贡献为 0，平仓成本也落在区间内）；直接反手时
+    # 平仓成本记在下一笔的开仓K线上，需要移回上一笔
+    starts = traded[held_flat[traded] != 0]
+    flipped = held_flat[starts - 1] != 0 if len(starts) else np.zeros(0, dtype=bool)
+    trade_log = np.add.reduceat(growth_flat, starts) if len(starts) else np.zeros(0)
+    trade_log[flipped] -= cost_log
+    trade_log[np.flatnonzero(flipped) - 1] += cost_log
+    next_change = np.ones(n * k, dtype=bool)
+    next_change[:-1] = change_flat[1:] != 0
+    next_change[n - 1::n] = True
+    ends = np.flatnonzero((held_flat != 0) & next_change)
+
+    trade_column = starts // n
+    trade_return = np.expm1(trade_log)
+    trade_count = np.bincount(trade_column, minlength=k)
+    wins = np.bincount(trade_column, weights=trade_return > 0, minlength=k)
+    trade_sum = np.bincount(trade_column, weights=trade_return, minlength=k)
+
+    mean = growth[1:].mean(axis=0) if n > 1 else np.zeros(k)
+    volatility = growth[1:].std(axis=0) if n > 1 else np.zeros(k)
+    # 对数净收益原地累加为净值
+    equity = np.cumsum(growth, axis=0, out=growth)
+    np.exp(equity, out=equity)
+    drawdown = np.maximum.accumulate(equity, axis=0)
+    np.maximum(drawdown, 1.0, out=drawdown)
+    np.divide(equity, drawdown, out=drawdown)
+    drawdown -= 1
+    turnover = change.sum(axis=0, dtype=np.int64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        years = (n - 1) / annualization if n > 1 else 0.0
+        final = equity[-1] if n else np.ones(k)
+        metrics = pd.DataFrame({
+            'total_return': final - 1,
+            'annual_return': final ** (1 / years) - 1 if years > 0 else np.full(k, np.nan),
+            'annual_volatility': volatility * np.sqrt(annualization),
+            'sharpe': np.where(volatility > 0, mean / volatility * np.sqrt(annualization), 0.0),
+            'max_drawdown': drawdown.min(axis=0) if n else np.zeros(k),
+            'exposure': (held != 0).mean(axis=0) if n else np.zeros(k),
+            'turnover': turnover,
+            'cost_return': np.expm1(turnover * cost_log),
+            'trades': trade_count,
+            'hit_rate': np.where(trade_count > 0, wins / trade_count, np.nan),
+            'avg_trade_return': np.where(trade_count > 0, trade_sum / trade_count, np.nan)
+        }, index=pd.Index(names, name='signal'))[METRIC_COLUMNS]
+
+    rows = starts % n
+    end_rows = ends % n
+    trades = pd.DataFrame({
+        'signal': np.asarray(names, dtype=object)[trade_column],
+        'direction': held_flat[starts].astype(np.int64),
+        # 在开仓前一根K线收盘时成交
+        'entry': dates[rows - 1] if dates is not None else rows - 1,
+        'exit': dates[end_rows] if dates is not None else end_rows,
+        'bars': end_rows - rows + 1,
+        'return': trade_return,
+        # 最后一根K线仍持有、尚未平仓
+        'open': end_rows == n - 1
+    })
+    return BacktestResult(names, dates, held, equity, drawdown, metrics, trades)
+
+
+def backtest(df: pd.DataFrame, signals: Optional[Iterable[str]] = None, threshold: float = 0.4,
+             mode: str = 'target', cost_bps: float = 0.0, long_only: bool = False, benchmark: bool = True,
+             annualization: Optional[float] = None) -> BacktestResult:
+    """
+    回测 df 中的信号列（默认 Overall_Signal 和五个分项信号）
+
+    df 缺少信号列时先用 TechnicalAnalyzer 只计算需要的信号；benchmark 为 True 时
+    附加一列始终做多的买入持有基准。
+    """
+    signals = list(signals) if signals is not None else list(SIGNALS)
+    if df.empty:
+        raise ValueError("没有可回测的数据")
+    missing = [name for name in signals if name not in df.columns]
+    if missing:
+        from technical_analysis import TechnicalAnalyzer
+        df = TechnicalAnalyzer().calculate_all_indicators(df, indicators=missing)
+    elif not df['Date'].is_monotonic_increasing:
+        df = df.sort_values('Date')
+
+    matrix = np.empty((len(df), len(signals) + benchmark), order='F')
+    for j, name in enumerate(signals):
+        matrix[:, j] = df[name].to_numpy(dtype=float)
+    names = signals + ([BENCHMARK] if benchmark else [])
+    if benchmark:
+        matrix[:, -1] = 1.0
+    dates = df['Date'].to_numpy() if 'Date' in df.columns else None
+    return backtest_arrays(df['Close'].to_numpy(), matrix, names, dates, threshold, mode, cost_bps,
+                           long_only, annualization)
+
+
+def load_prices(args) -> pd.DataFrame:
+    if args.synthetic:
+        from synthetic_market import generate_ohlc
+        return generate_ohlc(args.synthetic, freq=args.freq, seed=args.seed, mean_reversion=0.0005)
+    if args.csv:
+        df = pd.read_csv(args.csv)
+        df['Date'] = pd.to_datetime(df['Date'])
+        return df
+    from data_fetcher import GoldDataFetcher
+    return GoldDataFetcher().get_latest_data()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='技术指标信号回测')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--synthetic', type=int, default=0, help='用 synthetic_market 生成指定条数的模拟K线')
+    source.add_argument('--csv', default='', help='从 CSV 读取K线（需要 Date、High、Low、Close 列）')
+    parser.add_argument('--freq', default='D', help='模拟K线频率（D、h、min 等）')
+    parser.add_argument('--seed', type=int, default=42, help='模拟数据随机种子')
+    parser.add_argument('--signals', default=','.join(SIGNALS), help='逗号分隔的信号列')
+    parser.add_argument('--threshold', type=float, default=0.4, help='开仓信号阈值')
+    parser.add_argument('--mode', choices=MODES, default='target', help='target：按当前信号持仓；hold：持有到反向信号')
+    parser.add_argument('--cost-bps', type=float, default=2.0, help='每单位仓位变动的交易成本（基点）')
+    parser.add_argument('--long-only', action='store_true', help='只做多')
+    parser.add_argument('--equity-out', default='', help='把净值曲线写入 CSV')
+    args = parser.parse_args()
+
+    df = load_prices(args)
+    if df.empty:
+        print("❌ 没有可回测的数据")
+        return
+    signals = [name.strip() for name in args.signals.split(',') if name.strip()]
+
+    start = time.perf_counter()
+    from technical_analysis import TechnicalAnalyzer
+    df_tech = TechnicalAnalyzer().calculate_all_indicators(df, indicators=signals)
+    indicator_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = backtest(df_tech, signals, args.threshold, args.mode, args.cost_bps, args.long_only)
+    backtest_s = time.perf_counter() - start
+
+    print("=" * 100)
+    print(f"回测区间: {df_tech['Date'].iloc[0]} 至 {df_tech['Date'].iloc[-1]}，共 {len(df_tech)} 根K线")
+    print(f"指标计算 {indicator_s:.3f} 秒，回测 {backtest_s:.3f} 秒")
+    print("=" * 100)
+    print(result.metrics.to_string(float_format=lambda x: f"{x:.4g}"))
+    print("=" * 100)
+
+    if args.equity_out:
+        result.equity_frame().to_csv(args.equity_out)
+        print(f"净值曲线已写入 {args.equity_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+数据获取性能基准（离线回放）
+
+先用 --record 访问真实数据源录制一次 cassette，之后即可在无网络环境下以
+固定的合成延迟重复回放，对比 fetch_historical_data、fetch_realtime_price、
+fetch_gold_news 和 update_data 的耗时。每次运行使用临时缓存目录和全新的
+数据源健康统计，保证多次运行之间互不影响。
+
+用法:
+    python bench_fetchers.py --record
+    python bench_fetchers.py --latency 50 --repeat 5
+    python bench_fetchers.py --targets historical,realtime
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+import pandas as pd
+
+import source_health
+from http_cassette import use_cassette
+
+TARGETS = ('historical', 'realtime', 'news', 'update')
+
+
+def reset_process_state() -> None:
+    """清除跨次运行的进程状态（数据源熔断与延迟统计）"""
+    source_health._registry = None
+
+
+def run_target(target: str) -> None:
+    if target == 'historical':
+        from data_fetcher import GoldDataFetcher
+        GoldDataFetcher().fetch_historical_data()
+    elif target == 'realtime':
+        from data_fetcher import GoldDataFetcher
+        GoldDataFetcher().fetch_realtime_price()
+    elif target == 'news':
+        from sentiment_analysis import SentimentAnalyzer
+        SentimentAnalyzer().fetch_gold_news()
+    elif target == 'update':
+        import backend_optimized
+        backend_optimized.update_data()
+    else:
+        raise ValueError(f"未知的测试目标: {target}")
+
+
+def bench_target(target: str, cassette_path: str, mode: str, latency, repeat: int) -> dict:
+    durations = []
+    error = None
+    hits = misses = 0
+    for _ in range(repeat):
+        reset_process_state()
+        work_dir = tempfile.mkdtemp(prefix='bench_fetchers_')
+        cwd = os.getcwd()
+        # 在临时目录中运行，缓存文件（data_cache/）不会复用也不会污染项目目录
+        os.chdir(work_dir)
+        try:
+            with use_cassette(cassette_path, mode=mode, latency=latency) as cassette:
+                start = time.perf_counter()
+                try:
+                    run_target(target)
+                except Exception as e:
+                    error = str(e)
+                durations.append(time.perf_counter() - start)
+            hits += cassette.hits
+            misses += cassette.misses
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        'target': target,
+        'runs': repeat,
+        'min_s': min(durations),
+        'median_s': statistics.median(durations),
+        'max_s': max(durations),
+        'replayed': hits,
+        'missing': misses,
+        'error': error or ''
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='数据获取性能基准（HTTP 录制/回放）')
+    parser.add_argument('--cassette', default='data_cache/cassettes/fetchers.json', help='cassette 文件路径')
+    parser.add_argument('--record', action='store_true', help='访问真实数据源并录制 cassette')
+    parser.add_argument('--latency', type=float, default=None,
+                        help='回放时每个请求的固定延迟（毫秒），默认使用录制时的真实延迟')
+    parser.add_argument('--repeat', type=int, default=3, help='每个目标的运行次数')
+    parser.add_argument('--targets', default=','.join(TARGETS), help='逗号分隔的测试目标')
+    args = parser.parse_args()
+
+    cassette_path = os.path.abspath(args.cassette)
+    targets = [t.strip() for t in args.targets.split(',')]
+    latency = args.latency / 1000 if args.latency is not None else None
+
+    if args.record:
+        print(f"录制 cassette: {cassette_path}")
+        for target in targets:
+            print(f"录制 {target}...")
+            result = bench_target(target, cassette_path, 'auto', None, 1)
+            if result['error']:
+                print(f"  {target} 出错: {result['error']}")
+        return
+
+    if not os.path.exists(cassette_path):
+        print(f"cassette 不存在: {cassette_path}，请先运行 python bench_fetchers.py --record")
+        return
+
+    results = []
+    for target in targets:
+        print(f"回放 {target} ({args.repeat} 次)...")
+        results.append(bench_target(target, cassette_path, 'replay', latency, args.repeat))
+
+    print()
+    print("=" * 78)
+    print(pd.DataFrame(results).to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
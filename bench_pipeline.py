@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+数据处理流水线规模基准
+
+用 synthetic_market 生成不同规模的模拟K线，依次测量生成、数据质量验证、
+价格缓存写入/读取、技术指标计算和支撑阻力位计算的耗时，观察各环节随数据量
+增长的变化。
+
+用法:
+    python bench_pipeline.py
+    python bench_pipeline.py --sizes 1000,1000000,10000000 --freq min
+    python bench_pipeline.py --stages generate,validate,store
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+from data_quality import DataQualityValidator
+from price_store import create_price_store
+from synthetic_market import generate_ohlc
+from technical_analysis import TechnicalAnalyzer
+
+STAGES = ('generate', 'validate', 'store', 'indicators', 'support_resistance')
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def bench_size(rows: int, freq: str, stages, backend: str, seed: int) -> dict:
+    result = {'rows': rows}
+    elapsed, df = timed(lambda: generate_ohlc(rows, freq=freq, seed=seed, end='2026-01-01',
+                                              regimes=[(0.0, 1.0), (0.0, 2.0)], gap_probability=0.001,
+                                              mean_reversion=0.0005))
+    if 'generate' in stages:
+        result['generate_s'] = elapsed
+
+    if 'validate' in stages:
+        elapsed, report = timed(lambda: DataQualityValidator().validate(df))
+        result['validate_s'] = elapsed
+        result['quality_score'] = report.quality_score
+
+    if 'store' in stages:
+        cache_dir = tempfile.mkdtemp(prefix='bench_pipeline_')
+        try:
+            store = create_price_store(backend, cache_dir, 'gold_price_cache')
+            result['store_save_s'], _ = timed(lambda: store.save(df))
+            result['store_load_s'], _ = timed(store.load)
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    df_tech = None
+    if 'indicators' in stages or 'support_resistance' in stages:
+        elapsed, df_tech = timed(lambda: TechnicalAnalyzer().calculate_all_indicators(df))
+        if 'indicators' in stages:
+            result['indicators_s'] = elapsed
+
+    if 'support_resistance' in stages:
+        result['support_resistance_s'], _ = timed(lambda: TechnicalAnalyzer().get_support_resistance(df_tech))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='数据处理流水线规模基准')
+    parser.add_argument('--sizes', default='1000,100000,1000000', help='逗号分隔的K线条数')
+    parser.add_argument('--freq', default='min', help='K线频率（D、h、min 等）')
+    parser.add_argument('--stages', default=','.join(STAGES), help='逗号分隔的测试环节')
+    parser.add_argument('--backend', default='npy', help='价格存储后端')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子')
+    args = parser.parse_args()
+
+    sizes = [int(x) for x in args.sizes.split(',')]
+    stages = [s.strip() for s in args.stages.split(',')]
+
+    results = []
+    for rows in sizes:
+        print(f"测试 {rows} 条K线...")
+        results.append(bench_size(rows, args.freq, stages, args.backend, args.seed))
+
+    print()
+    print("=" * 78)
+    print(pd.DataFrame(results).to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+价格存储后端性能对比
+
+对比 CSV（原 gold_price_cache.csv 路径：read_csv + to_datetime）与列式存储
+在不同数据量下的写入、读取、追加耗时和磁盘占用。
+
+用法:
+    python bench_price_store.py
+    python bench_price_store.py --sizes 1000,100000 --backends csv,npy
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from price_store import create_price_store, PRICE_STORE_BACKENDS
+
+
+def make_price_df(rows: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 2000 * np.exp(np.cumsum(rng.normal(0, 0.008, rows)))
+    open_ = close * (1 + rng.normal(0, 0.004, rows))
+    spread = np.abs(rng.normal(0, 0.0015, rows))
+    return pd.DataFrame({
+        'Date': pd.date_range(end='2026-01-01', periods=rows, freq='min'),
+        'Open': open_,
+        'High': np.maximum(open_, close) * (1 + spread),
+        'Low': np.minimum(open_, close) * (1 - spread),
+        'Close': close,
+        'Volume': rng.integers(50000, 150000, rows)
+    })
+
+
+def disk_size(path: str) -> int:
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+    return os.path.getsize(path)
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def bench_backend(backend: str, df: pd.DataFrame, repeat: int) -> dict:
+    cache_dir = tempfile.mkdtemp(prefix='bench_price_store_')
+    try:
+        store = create_price_store(backend, cache_dir, 'gold_price_cache')
+        save_time = timed(lambda: store.save(df))
+        load_time = min(timed(store.load) for _ in range(repeat))
+        # 读取后访问一次数据，确保内存映射的页面真正被读入
+        touch_time = timed(lambda: store.load()['Close'].sum())
+        append_time = timed(lambda: store.append(df.tail(1)))
+        return {
+            'backend': backend,
+            'rows': len(df),
+            'save_s': save_time,
+            'load_s': load_time,
+            'load_and_scan_s': touch_time,
+            'append_1_s': append_time,
+            'size_mb': disk_size(store.path) / 1024 / 1024
+        }
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='价格存储后端性能对比')
+    parser.add_argument('--sizes', default='1000,100000,10000000', help='逗号分隔的行数')
+    parser.add_argument('--backends', default=','.join(PRICE_STORE_BACKENDS), help='逗号分隔的后端名称')
+    parser.add_argument('--repeat', type=int, default=3, help='读取重复次数（取最小值）')
+    args = parser.parse_args()
+
+    sizes = [int(x) for x in args.sizes.split(',')]
+    backends = [b.strip() for b in args.backends.split(',')]
+    if 'feather' in backends or 'parquet' in backends:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            print("未安装 pyarrow，跳过 feather/parquet")
+            backends = [b for b in backends if b not in ('feather', 'parquet')]
+
+    results = []
+    for rows in sizes:
+        df = make_price_df(rows)
+        for backend in backends:
+            print(f"测试 {backend} ({rows} 行)...")
+            results.append(bench_backend(backend, df, args.repeat))
+
+    print()
+    print("=" * 78)
+    print(pd.DataFrame(results).to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
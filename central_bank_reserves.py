@@ -1,21 +1,34 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List
-import requests
+from typing import Dict, List, Optional
 from bs4 import BeautifulSoup
 import json
+from http_client import get_http_client
+from config import Config
+from stale_cache import FRESH, STALE, cache_state, get_background_refresher
 
 class CentralBankGoldReserves:
     def __init__(self):
         self.cache_file = 'data_cache/central_bank_reserves.json'
         self.cache_expiry_hours = 12
+        # 缓存过期但未超过该时长时先返回旧数据并在后台刷新（stale-while-revalidate）
+        self.cache_max_stale_hours = Config.CENTRAL_BANK_MAX_STALE_HOURS
+        self.http = get_http_client()
+        self.refresher = get_background_refresher()
+        self.revalidation = None
         
     def get_central_bank_data(self) -> Dict:
         try:
             data = self._load_cache()
-            if data and not self._is_cache_expired(data):
-                return data
+            if data:
+                state = cache_state(self._cache_age_hours(data), self.cache_expiry_hours, self.cache_max_stale_hours)
+                if state == FRESH:
+                    return data
+                if state == STALE:
+                    print("央行增持数据缓存已过期，先使用旧数据并在后台刷新")
+                    self.revalidation = self.refresher.schedule('central_bank', self._revalidate)
+                    return {**data, 'stale': True}
             
             data = self._fetch_world_gold_council_data()
             if data:
@@ -62,7 +75,7 @@ class CentralBankGoldReserves:
             # 尝试从东方财富获取中国黄金储备数据
             try:
                 url = "https://data.eastmoney.com/cjsj/hjwh.html"
-                response = requests.get(url, headers={
+                response = self.http.get(url, headers={
                     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
                 }, timeout=10)
                 
@@ -585,14 +598,24 @@ class CentralBankGoldReserves:
         except Exception as e:
             print(f"保存缓存时出错: {e}")
     
-    def _is_cache_expired(self, data: Dict) -> bool:
+    def _revalidate(self) -> Dict:
+        data = self._fetch_world_gold_council_data()
+        if not data:
+            raise RuntimeError("无法获取央行增持数据")
+        self._save_cache(data)
+        return data
+    
+    def _cache_age_hours(self, data: Dict) -> Optional[float]:
         try:
             last_update = datetime.fromisoformat(data.get('last_update', ''))
-            expiry_time = last_update + timedelta(hours=self.cache_expiry_hours)
-            return datetime.now() > expiry_time
+            return (datetime.now() - last_update).total_seconds() / 3600
         except Exception as e:
             print(f"检查缓存过期时出错: {e}")
-            return True
+            return None
+    
+    def _is_cache_expired(self, data: Dict) -> bool:
+        age_hours = self._cache_age_hours(data)
+        return age_hours is None or age_hours > self.cache_expiry_hours
     
     def get_top_holders(self) -> List[Dict]:
         data = self.get_central_bank_data()
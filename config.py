@@ -14,6 +14,54 @@ class Config:
     FINNHUB_KEY = os.getenv('FINNHUB_KEY', '')
     HISTORICAL_DAYS = int(os.getenv('HISTORICAL_DAYS', '365'))
     UPDATE_INTERVAL_HOURS = int(os.getenv('UPDATE_INTERVAL_HOURS', '1'))
+    STALE_WHILE_REVALIDATE = os.getenv('STALE_WHILE_REVALIDATE', 'true').lower() == 'true'
+    PRICE_CACHE_MAX_STALE_HOURS = float(os.getenv('PRICE_CACHE_MAX_STALE_HOURS', '72'))
+    CENTRAL_BANK_MAX_STALE_HOURS = float(os.getenv('CENTRAL_BANK_MAX_STALE_HOURS', '720'))
+    REVALIDATE_RETRY_INTERVAL_SECONDS = float(os.getenv('REVALIDATE_RETRY_INTERVAL_SECONDS', '300'))
+    FAST_STARTUP = os.getenv('FAST_STARTUP', 'true').lower() == 'true'
+    BACKEND_SNAPSHOT_FILE = os.getenv('BACKEND_SNAPSHOT_FILE', 'data_cache/backend_snapshot.pkl.gz')
+    STARTUP_WAIT_SECONDS = float(os.getenv('STARTUP_WAIT_SECONDS', '30'))
+    CONCURRENT_FETCH = os.getenv('CONCURRENT_FETCH', 'true').lower() == 'true'
+    FETCH_MAX_WORKERS = int(os.getenv('FETCH_MAX_WORKERS', '4'))
+    SOURCE_TIMEOUT_SECONDS = float(os.getenv('SOURCE_TIMEOUT_SECONDS', '10'))
+    FETCH_DEADLINE_SECONDS = float(os.getenv('FETCH_DEADLINE_SECONDS', '15'))
+    TICKER_MAX_WORKERS = int(os.getenv('TICKER_MAX_WORKERS', '4'))
+    INCREMENTAL_FETCH = os.getenv('INCREMENTAL_FETCH', 'true').lower() == 'true'
+    PRICE_STORE = os.getenv('PRICE_STORE', 'npy')
+    PRICE_PYRAMID = os.getenv('PRICE_PYRAMID', 'true').lower() == 'true'
+    CHART_MAX_POINTS = int(os.getenv('CHART_MAX_POINTS', '400'))
+    INDICATOR_ENGINE = os.getenv('INDICATOR_ENGINE', 'numpy')
+    INDICATOR_CACHE_TAIL = int(os.getenv('INDICATOR_CACHE_TAIL', '30'))
+    SOURCE_HEALTH_WINDOW = int(os.getenv('SOURCE_HEALTH_WINDOW', '50'))
+    SOURCE_FAILURE_THRESHOLD = int(os.getenv('SOURCE_FAILURE_THRESHOLD', '3'))
+    SOURCE_COOLDOWN_SECONDS = float(os.getenv('SOURCE_COOLDOWN_SECONDS', '300'))
+    INTRADAY_BASE_INTERVAL = os.getenv('INTRADAY_BASE_INTERVAL', '1h')
+    INTRADAY_INITIAL_DAYS = int(os.getenv('INTRADAY_INITIAL_DAYS', '5'))
+    REALTIME_RACE = os.getenv('REALTIME_RACE', 'true').lower() == 'true'
+    REALTIME_LATENCY_BUDGET_SECONDS = float(os.getenv('REALTIME_LATENCY_BUDGET_SECONDS', '1.0'))
+    REALTIME_MEDIAN_OF = int(os.getenv('REALTIME_MEDIAN_OF', '1'))
+    TICK_SOURCE = os.getenv('TICK_SOURCE', 'sina')
+    TICK_POLL_INTERVAL_SECONDS = float(os.getenv('TICK_POLL_INTERVAL_SECONDS', '3'))
+    TICK_BUFFER_SIZE = int(os.getenv('TICK_BUFFER_SIZE', '2048'))
+    TICK_IDLE_TIMEOUT_SECONDS = float(os.getenv('TICK_IDLE_TIMEOUT_SECONDS', '60'))
+    TICK_STREAM_MAX_SECONDS = float(os.getenv('TICK_STREAM_MAX_SECONDS', '30'))
+    TICK_STREAM_MAX_CLIENTS = int(os.getenv('TICK_STREAM_MAX_CLIENTS', '4'))
+    HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '8'))
+    HTTP_TIMEOUT_SECONDS = float(os.getenv('HTTP_TIMEOUT_SECONDS', '10'))
+    HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', '2'))
+    HTTP_BACKOFF_FACTOR = float(os.getenv('HTTP_BACKOFF_FACTOR', '0.5'))
+    HTTP_CACHE = os.getenv('HTTP_CACHE', 'true').lower() == 'true'
+    HTTP_CACHE_DIR = os.getenv('HTTP_CACHE_DIR', 'data_cache/http_cache')
+    HTTP_CACHE_TTLS = os.getenv('HTTP_CACHE_TTLS', '')
+    HTTP_CACHE_DEFAULT_TTL = float(os.getenv('HTTP_CACHE_DEFAULT_TTL', '0'))
+    HTTP_CACHE_MEMORY_MB = float(os.getenv('HTTP_CACHE_MEMORY_MB', '32'))
+    HTTP_CACHE_MAX_AGE_SECONDS = float(os.getenv('HTTP_CACHE_MAX_AGE_SECONDS', '172800'))
+    RATE_LIMIT = os.getenv('RATE_LIMIT', 'true').lower() == 'true'
+    RATE_LIMITS = os.getenv('RATE_LIMITS', 'alpha_vantage=5/60+25/86400,finnhub=30/60,eastmoney=20/60,sina=120/60,investing=20/60,kitco=30/60')
+    RATE_LIMIT_MAX_WAIT_SECONDS = float(os.getenv('RATE_LIMIT_MAX_WAIT_SECONDS', '2'))
+    HTTP_CASSETTE = os.getenv('HTTP_CASSETTE', '')
+    HTTP_CASSETTE_MODE = os.getenv('HTTP_CASSETTE_MODE', 'replay')
+    HTTP_CASSETTE_LATENCY_MS = float(os.getenv('HTTP_CASSETTE_LATENCY_MS', '-1'))
     PREDICTION_DAYS = int(os.getenv('PREDICTION_DAYS', '7'))
     MODEL_TYPE = os.getenv('MODEL_TYPE', 'ensemble')
     SENTIMENT_THRESHOLD = float(os.getenv('SENTIMENT_THRESHOLD', '0.1'))
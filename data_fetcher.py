@@ -1,16 +1,86 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Optional, Dict, List
-import requests
+from typing import Optional, Dict, List, Callable
 import json
 import time
 import os
+import re
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from config import Config
+from price_store import create_price_store, migrate_price_store, CSVPriceStore
+from http_client import get_http_client
+from http_cache import cached_call
+from rate_limiter import acquire_quota
+from stale_cache import STALE, EXPIRED, cache_state, get_background_refresher
+from quote_engine import RealtimeQuoteEngine
+from source_health import get_source_health
+from fetch_context import memoized
+from data_quality import DataQualityValidator
+from synthetic_market import generate_ohlc
+from price_pyramid import COARSE_LEVELS, PricePyramid
+from intraday_store import (IntradayBarStore, BAR_COLUMNS, DOWNLOAD_LIMIT_DAYS, INTERVAL_MINUTES,
+                            interval_delta, normalize_interval, resample_bars)
+
+# 已验证的缓存数据统计（按缓存路径），用于缓存追加新数据后的增量验证
+_validated_caches = {}
+
+# 各品种在不同数据源中的代码；未列出的数据源不支持该品种
+TICKER_SYMBOLS = {
+    # 黄金
+    'XAUUSD=X': {
+        'akshare': 'GC',
+        'kitco': 'gold',
+        'investing': 'commodities/gold-historical-data',
+        'alpha_vantage': 'XAUUSD',
+        'finnhub': 'OANDA:XAUUSD',
+        'yfinance': ['GC=F', 'GLD'],
+        'sina': 'hf_XAU'
+    },
+    # 白银
+    'XAGUSD=X': {
+        'akshare': 'SI',
+        'investing': 'commodities/silver-historical-data',
+        'alpha_vantage': 'XAGUSD',
+        'finnhub': 'OANDA:XAGUSD',
+        'yfinance': ['SI=F', 'SLV'],
+        'sina': 'hf_XAG'
+    },
+    # 铂金
+    'XPTUSD=X': {
+        'investing': 'commodities/platinum-historical-data',
+        'finnhub': 'OANDA:XPTUSD',
+        'yfinance': ['PL=F', 'PPLT']
+    },
+    # 美元指数
+    'DX-Y.NYB': {
+        'investing': 'indices/usdollar-historical-data',
+        'yfinance': ['DX-Y.NYB', 'UUP']
+    }
+}
+
+
+def ticker_symbols(ticker: str) -> Dict:
+    """品种在各数据源中的代码；配置的黄金代码总是使用黄金数据源，未知品种只用 yfinance"""
+    if ticker in TICKER_SYMBOLS:
+        return TICKER_SYMBOLS[ticker]
+    if ticker == Config.GOLD_TICKER:
+        return TICKER_SYMBOLS['XAUUSD=X']
+    return {'yfinance': [ticker]}
+
+
+def ticker_cache_name(ticker: str) -> str:
+    """品种的缓存名称；黄金沿用原来的 gold_price_cache"""
+    if ticker == Config.GOLD_TICKER:
+        return 'gold_price_cache'
+    return 'price_cache_' + re.sub(r'[^0-9a-z]+', '_', ticker.lower()).strip('_')
+
 
 class GoldDataFetcher:
-    def __init__(self):
-        self.ticker = Config.GOLD_TICKER
+    def __init__(self, ticker: Optional[str] = None, cache_dir: str = 'data_cache'):
+        self.ticker = ticker or Config.GOLD_TICKER
+        self.symbols = ticker_symbols(self.ticker)
         self.historical_days = Config.HISTORICAL_DAYS
         self.max_retries = 3
         self.retry_delay = 2
@@ -18,6 +88,9 @@ class GoldDataFetcher:
         self.alpha_vantage_key = Config.ALPHA_VANTAGE_KEY if hasattr(Config, 'ALPHA_VANTAGE_KEY') else 'demo'
         self.finnhub_key = Config.FINNHUB_KEY if hasattr(Config, 'FINNHUB_KEY') else ''
         
+        # 共享连接池的HTTP客户端
+        self.http = get_http_client()
+        
         # 优化数据源优先级
         self.data_sources = [
             'akshare',   # 优先级1：国内数据源
@@ -27,17 +100,58 @@ class GoldDataFetcher:
             'mock'       # 优先级5：模拟数据（后备方案）
         ]
         
+        # 只保留支持当前品种的数据源
+        self.data_sources = [source for source in self.data_sources if source == 'mock' or source in self.symbols]
+        
         # 实时价格数据源（独立于历史数据）
-        self.realtime_sources = ['sina', 'alpha_vantage', 'finnhub', 'yfinance']
+        self.realtime_sources = [source for source in ['sina', 'alpha_vantage', 'finnhub', 'yfinance']
+                                 if source in self.symbols]
+        self.realtime_race = Config.REALTIME_RACE
+        
+        # 数据源健康登记表：按成功率和延迟动态排序，连续失败的数据源熔断跳过
+        # 非黄金品种单独统计，避免某个品种的失败熔断其他品种
+        self.source_health = get_source_health()
+        is_gold = self.ticker == Config.GOLD_TICKER
+        self.historical_kind = 'historical' if is_gold else f'historical:{self.ticker}'
+        self.realtime_kind = 'realtime' if is_gold else f'realtime:{self.ticker}'
+        
+        # 并发获取配置：所有真实数据源同时请求，先返回高质量数据者胜出
+        self.concurrent_fetch = Config.CONCURRENT_FETCH
+        self.fetch_max_workers = Config.FETCH_MAX_WORKERS
+        self.source_timeout = Config.SOURCE_TIMEOUT_SECONDS
+        self.fetch_deadline = Config.FETCH_DEADLINE_SECONDS
+        
+        # 增量获取配置：缓存过期后只请求最后缓存日期之后的新数据
+        self.incremental_fetch = Config.INCREMENTAL_FETCH
+        self.delta_context_rows = 10  # 验证新数据时附带的缓存尾部行数
+        
+        # 向量化数据质量验证器
+        self.quality_validator = DataQualityValidator()
         
         # 本地缓存配置
-        self.cache_dir = 'data_cache'
-        self.cache_file = os.path.join(self.cache_dir, 'gold_price_cache.csv')
+        self.cache_dir = cache_dir
         self.cache_expiry_hours = 24
+        # 缓存过期但未超过该时长时先返回旧数据并在后台刷新（stale-while-revalidate）
+        self.cache_max_stale_hours = Config.PRICE_CACHE_MAX_STALE_HOURS
+        self.refresher = get_background_refresher()
+        self.last_cache_status = None
+        self.revalidation = None
         
         # 确保缓存目录存在
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir)
+        
+        # 价格存储后端（默认内存映射列式存储，可选 csv / feather / parquet）
+        self.price_store = create_price_store(Config.PRICE_STORE, self.cache_dir, ticker_cache_name(self.ticker))
+        self.cache_file = self.price_store.path
+        self._migrate_legacy_cache()
+        
+        # 日内K线存储（每个间隔一个分区）
+        self.intraday_store = IntradayBarStore(self.cache_dir, ticker_cache_name(self.ticker) + '_intraday')
+        
+        # 周线/月线/季线金字塔，随日线缓存增量维护
+        self.price_pyramid_enabled = Config.PRICE_PYRAMID
+        self._price_pyramid = None
     
     def validate_data_quality(self, df: pd.DataFrame) -> tuple:
         """
@@ -48,116 +162,168 @@ class GoldDataFetcher:
         - quality_score: 质量分数 (0-100)
         - issues: 发现的问题列表
         """
-        if df.empty:
-            return False, 0, ['数据为空']
-        
-        issues = []
-        quality_score = 100
+        return self.quality_validator.validate(df).as_tuple()
+    
+    def _validate_cached(self, df: pd.DataFrame) -> tuple:
+        """
+        验证缓存数据
         
-        # 检查数据完整性
-        required_cols = ['Date', 'Open', 'High', 'Low', 'Close']
-        missing_cols = [col for col in required_cols if col not in df.columns]
-        if missing_cols:
-            issues.append(f'缺少必要列: {", ".join(missing_cols)}')
-            quality_score -= 30
+        缓存自上次验证后只追加了新行时，只验证新行（与已验证数据的尾部衔接），
+        不再重新扫描完整历史。缓存被整体重写或内容不一致时回退到完整验证。
+        """
+        entry = _validated_caches.get(self.cache_file)
+        report = None
+        if entry is not None:
+            state, fingerprint = entry
+            if (state.columns == tuple(df.columns) and 0 < state.rows <= len(df)
+                    and self._row_fingerprint(df, state.rows - 1) == fingerprint):
+                report = self.quality_validator.validate_appended(state.copy(), df.iloc[state.rows:])
         
-        # 检查缺失值比例
-        if not df.empty:
-            null_ratio = df.isnull().sum().sum() / (len(df) * len(df.columns))
-            if null_ratio > 0.1:  # 超过10%缺失值
-                issues.append(f'缺失值过多: {null_ratio*100:.1f}%')
-                quality_score -= 20
-            elif null_ratio > 0.05:  # 超过5%缺失值
-                issues.append(f'缺失值较多: {null_ratio*100:.1f}%')
-                quality_score -= 10
-        
-        # 检查价格合理性
-        if 'Close' in df.columns:
-            if (df['Close'] <= 0).any():
-                issues.append('存在非正价格')
-                quality_score -= 20
-            
-            if (df['Close'] > 100000).any():
-                issues.append('存在异常高价')
-                quality_score -= 15
-            
-            # 检查价格波动是否合理
-            price_changes = df['Close'].pct_change().abs()
-            if (price_changes > 0.5).any():  # 单日波动超过50%
-                issues.append('存在异常价格波动')
-                quality_score -= 10
-        
-        # 检查价格逻辑关系
-        if all(col in df.columns for col in ['High', 'Low', 'Open', 'Close']):
-            # High应该 >= Open, Close
-            invalid_high = (df['High'] < df['Open']) | (df['High'] < df['Close'])
-            if invalid_high.any():
-                issues.append(f'存在{invalid_high.sum()}条数据最高价低于开盘价或收盘价')
-                quality_score -= 10
-            
-            # Low应该 <= Open, Close
-            invalid_low = (df['Low'] > df['Open']) | (df['Low'] > df['Close'])
-            if invalid_low.any():
-                issues.append(f'存在{invalid_low.sum()}条数据最低价高于开盘价或收盘价')
-                quality_score -= 10
-        
-        # 检查数据量
-        if len(df) < 10:
-            issues.append(f'数据量不足: 仅{len(df)}条')
-            quality_score -= 15
-        
-        # 检查日期连续性
-        if 'Date' in df.columns and len(df) > 1:
-            date_diffs = df['Date'].diff().dt.days
-            if date_diffs.max() > 7:  # 存在超过7天的间隔
-                issues.append('数据存在较大时间间隔')
-                quality_score -= 5
-        
-        # 确保质量分数在0-100之间
-        quality_score = max(0, min(100, quality_score))
-        
-        is_valid = quality_score >= 60  # 质量分数达到60分以上才认为有效
-        
-        return is_valid, quality_score, issues
+        if report is None:
+            report = self.quality_validator.validate(df)
+        if report.state is not None:
+            _validated_caches[self.cache_file] = (report.state, self._row_fingerprint(df, len(df) - 1))
+        return report.as_tuple()
+    
+    @staticmethod
+    def _row_fingerprint(df: pd.DataFrame, index: int) -> tuple:
+        row = df.iloc[index]
+        return tuple(row.get(col) for col in ['Date', 'Open', 'High', 'Low', 'Close'])
     
     def fetch_historical_data(self, period: Optional[str] = None) -> pd.DataFrame:
         if period is None:
             period = self.historical_days
-        
+        # 同一刷新周期内只读取/请求一次
+        return memoized(('historical', self.ticker, period), lambda: self._fetch_historical_data(period))
+    
+    def _fetch_historical_data(self, period: int) -> pd.DataFrame:
         # 首先检查本地缓存
         cached_df = self._load_from_cache()
         if not cached_df.empty:
-            is_valid, quality_score, issues = self.validate_data_quality(cached_df)
+            is_valid, quality_score, issues = self._validate_cached(cached_df)
             if is_valid:
-                print(f"使用缓存的真实数据 (质量分数: {quality_score})")
+                if cached_df.attrs.get('stale'):
+                    # 先返回旧数据，由后台线程刷新缓存
+                    print(f"缓存已过期，先使用旧数据并在后台刷新 (质量分数: {quality_score})")
+                    self.revalidation = self.refresher.schedule(
+                        ('historical', self.ticker), lambda: self._revalidate_historical_data(period))
+                else:
+                    print(f"使用缓存的真实数据 (质量分数: {quality_score})")
                 return cached_df
             else:
                 print(f"缓存数据质量不足 (质量分数: {quality_score})，重新获取")
+                return self._refresh_historical_data(period, incremental=False)
+        
+        return self._refresh_historical_data(period)
+    
+    def _revalidate_historical_data(self, period: int) -> pd.DataFrame:
+        df = self._refresh_historical_data(period)
+        if df.empty:
+            raise RuntimeError("所有数据源均失败")
+        return df
+    
+    def _refresh_historical_data(self, period: int, incremental: bool = True) -> pd.DataFrame:
+        """从上游获取数据并更新缓存（缓存存在时优先增量获取）"""
+        if incremental and self.incremental_fetch:
+            # 只获取最后缓存日期之后的新数据
+            try:
+                delta_df = self._fetch_incremental(period)
+            except Exception as e:
+                print(f"增量获取出错: {e}")
+                delta_df = pd.DataFrame()
+            if not delta_df.empty:
+                return delta_df
         
         # 尝试从外部数据源获取（排除模拟数据）
+        real_sources = self._historical_sources()
+        if self.concurrent_fetch and len(real_sources) > 1:
+            best_df, best_quality_score = self._fetch_sources_concurrently(real_sources, period)
+        else:
+            best_df, best_quality_score = self._fetch_sources_sequentially(real_sources, period)
+        
+        # 如果找到了高质量数据，缓存并返回
+        if not best_df.empty:
+            print(f"使用最佳数据源，质量分数: {best_quality_score}")
+            self._save_to_cache(best_df)
+            return best_df
+        
+        print("所有真实数据源均失败，返回空数据...")
+        return pd.DataFrame()
+    
+    def _historical_sources(self) -> List[str]:
+        """按健康状态排序的真实历史数据源（排除模拟数据和熔断中的数据源）"""
         real_sources = [source for source in self.data_sources if source != 'mock']
+        ordered = self.source_health.order(self.historical_kind, real_sources)
+        skipped = [source for source in real_sources if source not in ordered]
+        if skipped:
+            print(f"数据源熔断中，跳过: {', '.join(skipped)}")
+        return ordered
+    
+    def _fetch_and_validate(self, source: str, fetch_fn: Callable[[str], pd.DataFrame],
+                            timeout: Optional[float] = None) -> tuple:
+        """
+        调用单个数据源并验证数据质量，同时记录该数据源的健康状态
+        
+        返回: (df, is_valid, quality_score, issues)
+        """
+        # 真正调用前才占用熔断器的探测资格
+        if not self.source_health.allow(self.historical_kind, source):
+            print(f"数据源熔断中，跳过: {source}")
+            return pd.DataFrame(), False, 0, []
+        start = time.monotonic()
+        try:
+            df = fetch_fn(source)
+        except Exception as e:
+            self.source_health.record_failure(self.historical_kind, source, time.monotonic() - start, str(e))
+            raise
+        latency = time.monotonic() - start
+        
+        if df is None or df.empty:
+            self.source_health.record_failure(self.historical_kind, source, latency, '未返回数据')
+            return pd.DataFrame(), False, 0, []
+        
+        is_valid, quality_score, issues = self.validate_data_quality(df)
+        if not is_valid:
+            self.source_health.record_failure(self.historical_kind, source, latency, f"数据质量不足: {', '.join(issues)}")
+        elif timeout is not None and latency > timeout:
+            self.source_health.record_failure(self.historical_kind, source, latency, f"超过 {timeout} 秒才返回")
+        else:
+            self.source_health.record_success(self.historical_kind, source, latency)
+        return df, is_valid, quality_score, issues
+    
+    def _fetch_sources_sequentially(self, sources: List[str], period: int,
+                                    fetch_fn: Optional[Callable[[str], pd.DataFrame]] = None,
+                                    is_complete: Optional[Callable[[pd.DataFrame], bool]] = None) -> tuple:
+        """
+        依次尝试各数据源，返回 (最佳数据, 质量分数)
+        
+        is_complete 判断结果是否足以提前结束（见 _fetch_sources_concurrently）。
+        """
+        if fetch_fn is None:
+            fetch_fn = lambda source: self._fetch_from_source(source, period)
+        
         best_df = pd.DataFrame()
         best_quality_score = 0
+        best_complete = False
         
-        for source in real_sources:
+        for source in sources:
             try:
                 print(f"尝试使用数据源: {source}")
-                df = self._fetch_from_source(source, period)
+                df, is_valid, quality_score, issues = self._fetch_and_validate(source, fetch_fn)
                 
                 if not df.empty:
-                    # 验证数据质量
-                    is_valid, quality_score, issues = self.validate_data_quality(df)
-                    
                     if is_valid:
                         print(f"成功从 {source} 获取数据 (质量分数: {quality_score})")
                         
-                        # 如果质量分数更高，则替换当前最佳数据
-                        if quality_score > best_quality_score:
+                        # 完整的结果优先，其次比较质量分数
+                        complete = is_complete is None or is_complete(df)
+                        if (complete, quality_score) > (best_complete, best_quality_score):
                             best_df = df
                             best_quality_score = quality_score
+                            best_complete = complete
                             
                             # 如果质量分数很高，直接使用
-                            if quality_score >= 90:
+                            if complete and quality_score >= 90:
                                 break
                     else:
                         print(f"{source} 数据质量不足: {', '.join(issues)}")
@@ -165,28 +331,201 @@ class GoldDataFetcher:
                 print(f"从 {source} 获取数据失败: {e}")
                 continue
         
-        # 如果找到了高质量数据，缓存并返回
-        if not best_df.empty:
-            print(f"使用最佳数据源，质量分数: {best_quality_score}")
-            self._save_to_cache(best_df)
-            return best_df
+        return best_df, best_quality_score
+    
+    def _fetch_sources_concurrently(self, sources: List[str], period: int,
+                                    fetch_fn: Optional[Callable[[str], pd.DataFrame]] = None,
+                                    is_complete: Optional[Callable[[pd.DataFrame], bool]] = None) -> tuple:
+        """
+        并发竞速获取历史数据
         
-        print("所有真实数据源均失败，返回空数据...")
-        return pd.DataFrame()
+        所有数据源同时提交到有界线程池，第一个质量分数 >= 90 的结果立即返回。
+        每个数据源从开始执行起有独立的截止时间（source_timeout），整个调用
+        另有总截止时间（fetch_deadline）；超时或落后的请求会被取消或忽略。
+        
+        fetch_fn 可替换单个数据源的获取方式（默认 _fetch_from_source）。
+        is_complete 为 False 的结果（如增量获取时没有新数据）只作为后备：
+        不会提前结束竞速，任何完整的结果都优先于它。
+        
+        返回: (best_df, best_quality_score)
+        """
+        if fetch_fn is None:
+            fetch_fn = lambda source: self._fetch_from_source(source, period)
+        
+        best_df = pd.DataFrame()
+        best_quality_score = 0
+        best_complete = False
+        
+        call_deadline = time.monotonic() + self.fetch_deadline
+        started_at = {}
+        
+        def run_source(source: str) -> tuple:
+            started_at[source] = time.monotonic()
+            # 在工作线程中完成验证，被忽略的慢请求结束后也会记录健康状态
+            return self._fetch_and_validate(source, fetch_fn, timeout=self.source_timeout)
+        
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, min(self.fetch_max_workers, len(sources))),
+            thread_name_prefix='gold-fetch'
+        )
+        futures = {}
+        for source in sources:
+            print(f"尝试使用数据源: {source}")
+            futures[executor.submit(run_source, source)] = source
+        
+        pending = set(futures)
+        try:
+            while pending:
+                now = time.monotonic()
+                if now >= call_deadline:
+                    print(f"历史数据获取已达总截止时间 ({self.fetch_deadline}秒)，忽略剩余数据源: "
+                          f"{', '.join(futures[f] for f in pending)}")
+                    break
+                
+                # 丢弃已超过单源截止时间的请求
+                for future in list(pending):
+                    source = futures[future]
+                    if source in started_at and now - started_at[source] >= self.source_timeout:
+                        print(f"{source} 超过 {self.source_timeout} 秒未返回，已忽略")
+                        future.cancel()
+                        pending.discard(future)
+                if not pending:
+                    break
+                
+                # 等待到最近的一个截止时间
+                next_deadline = call_deadline
+                for future in pending:
+                    source = futures[future]
+                    if source in started_at:
+                        next_deadline = min(next_deadline, started_at[source] + self.source_timeout)
+                done, _ = wait(pending, timeout=max(0.0, next_deadline - now),
+                               return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    pending.discard(future)
+                    source = futures[future]
+                    try:
+                        df, is_valid, quality_score, issues = future.result()
+                    except Exception as e:
+                        print(f"从 {source} 获取数据失败: {e}")
+                        continue
+                    
+                    if df.empty:
+                        continue
+                    
+                    if not is_valid:
+                        print(f"{source} 数据质量不足: {', '.join(issues)}")
+                        continue
+                    
+                    print(f"成功从 {source} 获取数据 (质量分数: {quality_score})")
+                    complete = is_complete is None or is_complete(df)
+                    if (complete, quality_score) > (best_complete, best_quality_score):
+                        best_df = df
+                        best_quality_score = quality_score
+                        best_complete = complete
+                
+                if best_complete and best_quality_score >= 90:
+                    break
+        finally:
+            # 不等待仍在执行的请求，未开始的请求直接取消
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        return best_df, best_quality_score
     
-    def _fetch_from_source(self, source: str, period: int) -> pd.DataFrame:
+    def _fetch_incremental(self, period: int) -> pd.DataFrame:
+        """
+        增量获取：读取已过期的缓存，只向数据源请求最后缓存日期之后的数据，
+        验证新数据后追加到缓存。网络、解析和验证开销与新数据量成正比。
+        
+        返回合并后的完整数据；无法增量更新时返回空DataFrame（由调用方全量获取）。
+        """
+        base_df = self._read_cache()
+        if base_df.empty:
+            return pd.DataFrame()
+        
+        if base_df['Date'].dt.tz is not None:
+            base_df['Date'] = base_df['Date'].dt.tz_localize(None)
+        
+        last_date = base_df['Date'].max()
+        if (datetime.now() - last_date).days >= period:
+            print("缓存数据过旧，执行全量获取")
+            return pd.DataFrame()
+        
+        print(f"增量获取 {last_date.strftime('%Y-%m-%d')} 之后的数据")
+        context_df = base_df.tail(self.delta_context_rows)
+        
+        def fetch_delta(source: str) -> pd.DataFrame:
+            new_rows = self._fetch_delta_from_source(source, period, last_date)
+            if new_rows is None:
+                return pd.DataFrame()
+            # 带上缓存尾部一起验证，使价格波动和日期间隔检查覆盖新旧数据衔接处
+            return pd.concat([context_df, new_rows], ignore_index=True)
+        
+        # 只有缓存尾部、没有新数据的结果可能来自更新滞后的数据源：不让它提前胜出，
+        # 等其他数据源都没有新数据时才认为缓存已是最新
+        def has_new_rows(df: pd.DataFrame) -> bool:
+            return len(df) > len(context_df)
+        
+        real_sources = self._historical_sources()
+        if self.concurrent_fetch and len(real_sources) > 1:
+            best_df, best_quality_score = self._fetch_sources_concurrently(real_sources, period, fetch_delta,
+                                                                           has_new_rows)
+        else:
+            best_df, best_quality_score = self._fetch_sources_sequentially(real_sources, period, fetch_delta,
+                                                                           has_new_rows)
+        
+        if best_df.empty:
+            print("增量获取失败")
+            return pd.DataFrame()
+        
+        new_rows = best_df.iloc[len(context_df):]
+        if new_rows.empty:
+            # 没有任何数据源返回新数据，且至少一个数据源确认了缓存尾部
+            print("数据源暂无新数据，缓存已是最新")
+        else:
+            print(f"增量获取 {len(new_rows)} 条新数据 (质量分数: {best_quality_score})")
+        
+        # 与全量获取一样只保留最近的K线（不少于配置的历史天数），缓存不会无限增长
+        max_rows = max(period, self.historical_days)
+        if len(base_df) + len(new_rows) > max_rows:
+            merged = pd.concat([base_df, new_rows], ignore_index=True).tail(max_rows).reset_index(drop=True)
+            self._save_to_cache(merged)
+            return merged
+        
+        self._append_to_cache(new_rows)
+        return pd.concat([base_df, new_rows], ignore_index=True)
+    
+    def _fetch_delta_from_source(self, source: str, period: int, since: datetime) -> Optional[pd.DataFrame]:
+        """
+        从数据源获取 since 之后的新数据
+        
+        支持按时间范围请求的数据源只请求新数据，其余数据源在解析后裁剪。
+        返回 None 表示获取失败；返回空DataFrame表示数据源没有新数据。
+        """
+        df = self._fetch_from_source(source, period, since=since)
+        if df is None or df.empty or 'Date' not in df.columns:
+            return None
+        
+        dates = pd.to_datetime(df['Date'])
+        if dates.dt.tz is not None:
+            dates = dates.dt.tz_localize(None)
+        df = df.assign(Date=dates)
+        
+        return df[df['Date'].dt.normalize() > since.normalize()].reset_index(drop=True)
+    
+    def _fetch_from_source(self, source: str, period: int, since: Optional[datetime] = None) -> pd.DataFrame:
         if source == 'akshare':
             return self._fetch_akshare(period)
         elif source == 'kitco':
             return self._fetch_from_kitco(period)
         elif source == 'investing':
-            return self._fetch_from_investing(period)
+            return self._fetch_from_investing(period, since)
         elif source == 'alpha_vantage':
-            return self._fetch_alpha_vantage(period)
+            return self._fetch_alpha_vantage(period, since)
         elif source == 'finnhub':
-            return self._fetch_finnhub(period)
+            return self._fetch_finnhub(period, since)
         elif source == 'yfinance':
-            return self._fetch_yfinance(period)
+            return self._fetch_yfinance(period, since)
         elif source == 'mock':
             return self._generate_mock_data()
         
@@ -196,11 +535,18 @@ class GoldDataFetcher:
         try:
             import akshare as ak
             
-            # 获取COMEX黄金的历史数据
-            gold_df = ak.futures_foreign_hist(symbol="GC")
+            # 获取外盘期货（COMEX黄金等）的历史数据
+            symbol = self.symbols['akshare']
+            
+            def download():
+                # 外盘期货历史数据来自新浪财经，与新浪报价共用配额
+                acquire_quota('sina')
+                return ak.futures_foreign_hist(symbol=symbol)
+            
+            gold_df = cached_call('akshare:futures_foreign_hist', {'symbol': symbol}, download)
             
             if gold_df.empty:
-                raise ValueError("AkShare 黄金数据为空")
+                raise ValueError(f"AkShare {self.ticker} 数据为空")
             
             # 确保数据格式正确
             gold_df = gold_df.sort_values('date')
@@ -235,28 +581,37 @@ class GoldDataFetcher:
             print(f"AkShare 错误: {e}")
             return pd.DataFrame()
     
-    def _fetch_alpha_vantage(self, period: int) -> pd.DataFrame:
+    def _fetch_alpha_vantage(self, period: int, since: Optional[datetime] = None) -> pd.DataFrame:
         try:
+            # compact 只返回最近100条，增量获取时足够覆盖新数据
+            outputsize = 'full'
+            if since is not None and (datetime.now() - since).days < 100:
+                outputsize = 'compact'
+            
             url = "https://www.alphavantage.co/query"
             params = {
                 'function': 'TIME_SERIES_DAILY',
-                'symbol': 'XAUUSD',
-                'outputsize': 'full',
+                'symbol': self.symbols['alpha_vantage'],
+                'outputsize': outputsize,
                 'apikey': self.alpha_vantage_key
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self.http.get(url, params=params, timeout=10)
             data = response.json()
             
             if 'Time Series (Daily)' not in data:
+                self.http.evict(url, params=params)
                 raise ValueError("Alpha Vantage API返回数据格式错误")
             
             time_series = data['Time Series (Daily)']
             df_data = []
             
             for date, values in list(time_series.items())[:period]:
+                date = datetime.strptime(date, '%Y-%m-%d')
+                if since is not None and date <= since:
+                    break  # 数据按日期倒序排列
                 df_data.append({
-                    'Date': datetime.strptime(date, '%Y-%m-%d'),
+                    'Date': date,
                     'Open': float(values['1. open']),
                     'High': float(values['2. high']),
                     'Low': float(values['3. low']),
@@ -272,27 +627,32 @@ class GoldDataFetcher:
             print(f"Alpha Vantage 错误: {e}")
             return pd.DataFrame()
     
-    def _fetch_finnhub(self, period: int) -> pd.DataFrame:
+    def _fetch_finnhub(self, period: int, since: Optional[datetime] = None) -> pd.DataFrame:
         if not self.finnhub_key or self.finnhub_key == '':
             return pd.DataFrame()
         
         try:
             end_date = datetime.now()
             start_date = end_date - timedelta(days=period)
+            if since is not None:
+                start_date = max(start_date, since + timedelta(days=1))
             
+            # 起止时间取整到天（UTC），同一天内的请求 URL 相同，可以命中响应缓存
+            day = 86400
             url = "https://finnhub.io/api/v1/forex/candle"
             params = {
-                'symbol': 'OANDA:XAUUSD',
+                'symbol': self.symbols['finnhub'],
                 'resolution': 'D',
-                'from': int(start_date.timestamp()),
-                'to': int(end_date.timestamp()),
+                'from': int(start_date.timestamp()) // day * day,
+                'to': (int(end_date.timestamp()) // day + 1) * day,
                 'token': self.finnhub_key
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self.http.get(url, params=params, timeout=10)
             data = response.json()
             
             if 's' not in data or data['s'] != 'ok':
+                self.http.evict(url, params=params)
                 raise ValueError("Finnhub API返回错误")
             
             df_data = []
@@ -314,16 +674,18 @@ class GoldDataFetcher:
             print(f"Finnhub 错误: {e}")
             return pd.DataFrame()
     
-    def _fetch_yfinance(self, period: int) -> pd.DataFrame:
+    def _fetch_yfinance(self, period: int, since: Optional[datetime] = None) -> pd.DataFrame:
         try:
             import yfinance as yf
             
-            gold = yf.Ticker('GC=F')
-            df = gold.history(period=f"{period}d")
+            if since is not None:
+                period = min(period, max(1, (datetime.now() - since).days + 1))
             
-            if df.empty:
-                gold = yf.Ticker('GLD')
-                df = gold.history(period=f"{period}d")
+            df = pd.DataFrame()
+            for symbol in self.symbols['yfinance']:
+                df = yf.Ticker(symbol).history(period=f"{period}d")
+                if not df.empty:
+                    break
             
             if df.empty:
                 raise ValueError("yFinance 数据为空")
@@ -355,17 +717,18 @@ class GoldDataFetcher:
             import json
             
             # Kitco API URL for gold prices
-            url = "https://www.kitco.com/graph/kitco-gold.json"
+            metal = self.symbols['kitco']
+            url = f"https://www.kitco.com/graph/kitco-{metal}.json"
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
             
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self.http.get(url, headers=headers, timeout=10)
             if response.status_code == 200:
                 data = response.json()
                 
-                if 'gold' in data and 'prices' in data['gold']:
-                    prices = data['gold']['prices']
+                if metal in data and 'prices' in data[metal]:
+                    prices = data[metal]['prices']
                     df_data = []
                     
                     for price_data in prices:
@@ -400,23 +763,24 @@ class GoldDataFetcher:
             print(f"Kitco 错误: {e}")
             return pd.DataFrame()
     
-    def _fetch_from_investing(self, period: int) -> pd.DataFrame:
+    def _fetch_from_investing(self, period: int, since: Optional[datetime] = None) -> pd.DataFrame:
         try:
             from bs4 import BeautifulSoup
             
             end_date = datetime.now()
             start_date = end_date - timedelta(days=period)
             
-            url = f"https://www.investing.com/commodities/gold-historical-data"
+            url = f"https://www.investing.com/{self.symbols['investing']}"
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
             
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self.http.get(url, headers=headers, timeout=10)
             soup = BeautifulSoup(response.content, 'html.parser')
             
             table = soup.find('table', {'data-test': 'historical-data-table'})
             if not table:
+                self.http.evict(url)
                 raise ValueError("无法找到数据表")
             
             rows = table.find_all('tr')[1:]
@@ -432,8 +796,11 @@ class GoldDataFetcher:
                     low = cols[4].text.strip().replace(',', '')
                     
                     try:
+                        date = datetime.strptime(date_str, '%m/%d/%Y')
+                        if since is not None and date <= since:
+                            break  # 表格按日期倒序排列
                         df_data.append({
-                            'Date': datetime.strptime(date_str, '%m/%d/%Y'),
+                            'Date': date,
                             'Close': float(price),
                             'Open': float(open_p),
                             'High': float(high),
@@ -452,34 +819,7 @@ class GoldDataFetcher:
             return pd.DataFrame()
     
     def _generate_mock_data(self) -> pd.DataFrame:
-        base_price = 2650.0
-        dates = pd.date_range(end=datetime.now(), periods=self.historical_days)
-        
-        np.random.seed(int(datetime.now().timestamp()))
-        
-        data = []
-        for i, date in enumerate(dates):
-            price_change = np.random.normal(0, 0.008)
-            open_price = base_price * (1 + price_change)
-            close_price = open_price * (1 + np.random.normal(0, 0.004))
-            high_price = max(open_price, close_price) * (1 + abs(np.random.normal(0, 0.0015)))
-            low_price = min(open_price, close_price) * (1 - abs(np.random.normal(0, 0.0015)))
-            volume = np.random.randint(50000, 150000)
-            
-            data.append({
-                'Date': date,
-                'Open': round(open_price, 2),
-                'High': round(high_price, 2),
-                'Low': round(low_price, 2),
-                'Close': round(close_price, 2),
-                'Volume': volume
-            })
-            
-            base_price = close_price
-        
-        df = pd.DataFrame(data)
-        df['Date'] = pd.to_datetime(df['Date'])
-        df = df.sort_values('Date')
+        df = generate_ohlc(self.historical_days, freq='D', end=datetime.now(), start_price=2650.0)
         print(f"已生成 {len(df)} 条模拟数据")
         return df
     
@@ -498,15 +838,32 @@ class GoldDataFetcher:
         return {}
     
     def fetch_realtime_price(self) -> Dict:
-        for source in self.realtime_sources:
-            try:
-                price_data = self._fetch_realtime_from_source(source)
-                if price_data and price_data.get('price', 0) > 0:
-                    print(f"成功从 {source} 获取实时价格")
-                    return price_data
-            except Exception as e:
-                print(f"从 {source} 获取实时价格失败: {e}")
-                continue
+        # 同一刷新周期内只请求一次
+        return memoized(('realtime', self.ticker), self._fetch_realtime_price)
+    
+    def _fetch_realtime_price(self) -> Dict:
+        if self.realtime_race:
+            # 同时请求所有实时数据源，在延迟预算内取第一个有效报价
+            price_data = RealtimeQuoteEngine(self).fetch_quote()
+            if price_data:
+                print(f"成功从 {price_data['source']} 获取实时价格")
+                return price_data
+        else:
+            for source in self.source_health.order(self.realtime_kind, self.realtime_sources):
+                if not self.source_health.allow(self.realtime_kind, source):
+                    continue
+                start = time.monotonic()
+                try:
+                    price_data = self._fetch_realtime_from_source(source)
+                    if price_data and price_data.get('price', 0) > 0:
+                        self.source_health.record_success(self.realtime_kind, source, time.monotonic() - start)
+                        print(f"成功从 {source} 获取实时价格")
+                        return price_data
+                    self.source_health.record_failure(self.realtime_kind, source, time.monotonic() - start, '无有效报价')
+                except Exception as e:
+                    self.source_health.record_failure(self.realtime_kind, source, time.monotonic() - start, str(e))
+                    print(f"从 {source} 获取实时价格失败: {e}")
+                    continue
         
         print("使用最新历史数据作为实时价格")
         df = self.fetch_historical_data()
@@ -538,14 +895,15 @@ class GoldDataFetcher:
             url = "https://www.alphavantage.co/query"
             params = {
                 'function': 'GLOBAL_QUOTE',
-                'symbol': 'XAUUSD',
+                'symbol': self.symbols['alpha_vantage'],
                 'apikey': self.alpha_vantage_key
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self.http.get(url, params=params, timeout=10)
             data = response.json()
             
             if 'Global Quote' not in data:
+                self.http.evict(url, params=params)
                 raise ValueError("Alpha Vantage 实时数据格式错误")
             
             quote = data['Global Quote']
@@ -574,14 +932,15 @@ class GoldDataFetcher:
         try:
             url = "https://finnhub.io/api/v1/quote"
             params = {
-                'symbol': 'OANDA:XAUUSD',
+                'symbol': self.symbols['finnhub'],
                 'token': self.finnhub_key
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self.http.get(url, params=params, timeout=10)
             data = response.json()
             
             if 'c' not in data:
+                self.http.evict(url, params=params)
                 raise ValueError("Finnhub 实时数据格式错误")
             
             current = data['c']
@@ -603,12 +962,12 @@ class GoldDataFetcher:
     
     def _fetch_realtime_sina(self) -> Dict:
         try:
-            url = "http://hq.sinajs.cn/list=hf_XAU"
+            url = f"http://hq.sinajs.cn/list={self.symbols['sina']}"
             headers = {
                 "Referer": "https://finance.sina.com.cn/"
             }
             
-            response = requests.get(url, headers=headers, timeout=5)
+            response = self.http.get(url, headers=headers, timeout=5)
             if response.status_code == 200:
                 # 返回的数据格式是：var hq_str_hf_XAU="最新价,涨跌幅,买价,卖价,..."
                 text = response.text
@@ -662,7 +1021,7 @@ class GoldDataFetcher:
         try:
             import yfinance as yf
             
-            for ticker in ['GC=F', 'GLD']:
+            for ticker in self.symbols['yfinance']:
                 try:
                     gold = yf.Ticker(ticker)
                     info = gold.info
@@ -687,33 +1046,91 @@ class GoldDataFetcher:
             print(f"yFinance 实时价格错误: {e}")
             return {}
     
-    def fetch_intraday_data(self, interval: str = '1h') -> pd.DataFrame:
+    def fetch_intraday_data(self, interval: str = '1h', days: Optional[int] = None) -> pd.DataFrame:
+        """
+        获取日内K线
+        
+        K线保存在本地日内存储中，每次只下载最后一根已存储K线之后的数据并追加，
+        历史长度随使用时间增长。比基础间隔（INTRADAY_BASE_INTERVAL）更粗的间隔
+        （如 4h、1d）由基础间隔的K线重采样得到，不单独下载。
+        
+        只存储和返回已走完的K线；days 限制返回最近多少天的数据（默认全部）。
+        """
         try:
-            import yfinance as yf
+            interval = normalize_interval(interval)
+            base_interval = normalize_interval(Config.INTRADAY_BASE_INTERVAL)
+            if INTERVAL_MINUTES[interval] > INTERVAL_MINUTES[base_interval]:
+                bars = resample_bars(self._update_intraday_bars(base_interval), interval)
+            else:
+                bars = self._update_intraday_bars(interval)
             
-            for ticker in ['GC=F', 'GLD']:
-                try:
-                    gold = yf.Ticker(ticker)
-                    df = gold.history(period='5d', interval=interval)
-                    
-                    if not df.empty:
-                        df.reset_index(inplace=True)
-                        if 'Datetime' in df.columns:
-                            df['Datetime'] = pd.to_datetime(df['Datetime'])
-                        elif 'Date' in df.columns:
-                            df['Datetime'] = pd.to_datetime(df['Date'])
-                        
-                        df = df.sort_values('Datetime')
-                        return df
-                except:
-                    continue
+            if days is not None and not bars.empty:
+                cutoff = bars['Date'].iloc[-1] - timedelta(days=days)
+                bars = bars[bars['Date'] > cutoff].reset_index(drop=True)
             
-            return pd.DataFrame()
+            bars = bars.copy()
+            bars['Datetime'] = bars['Date']
+            return bars
             
         except Exception as e:
             print(f"获取日内数据时出错: {e}")
             return pd.DataFrame()
     
+    def _update_intraday_bars(self, interval: str) -> pd.DataFrame:
+        """下载最后一根已存储K线之后的已完成K线并追加到日内存储，返回该间隔的全部K线"""
+        step = interval_delta(interval)
+        now = self._utcnow()
+        last = self.intraday_store.last_timestamp(interval)
+        
+        # 下一根K线尚未走完时无需下载
+        if last is not None and now < last + 2 * step:
+            return self.intraday_store.load(interval)
+        
+        if last is None:
+            days = Config.INTRADAY_INITIAL_DAYS
+        else:
+            days = (now - last).days + 1
+        days = min(days, DOWNLOAD_LIMIT_DAYS[interval])
+        
+        bars = self._download_intraday_bars(interval, days)
+        if not bars.empty:
+            # 最后一根K线可能仍在进行中，不写入只追加的存储
+            bars = bars[bars['Date'] + step <= now]
+            added = self.intraday_store.append(interval, bars)
+            if added:
+                print(f"已追加 {added} 根 {interval} K线到日内存储")
+        return self.intraday_store.load(interval)
+    
+    @staticmethod
+    def _utcnow() -> pd.Timestamp:
+        """当前 UTC 时间（不带时区），与日内存储的时间一致"""
+        return pd.Timestamp.now(tz='UTC').tz_localize(None)
+    
+    def _download_intraday_bars(self, interval: str, days: int) -> pd.DataFrame:
+        """从 yfinance 下载最近 days 天的K线（时间转换为不带时区的 UTC）"""
+        import yfinance as yf
+        
+        for ticker in self.symbols.get('yfinance', []):
+            try:
+                df = yf.Ticker(ticker).history(period=f'{days}d', interval=interval)
+                if df.empty:
+                    continue
+                
+                df.reset_index(inplace=True)
+                time_col = 'Datetime' if 'Datetime' in df.columns else 'Date'
+                dates = pd.to_datetime(df[time_col])
+                if dates.dt.tz is not None:
+                    dates = dates.dt.tz_convert('UTC').dt.tz_localize(None)
+                df['Date'] = dates
+                if 'Volume' not in df.columns:
+                    df['Volume'] = 0
+                return df[BAR_COLUMNS].sort_values('Date').reset_index(drop=True)
+            except Exception as e:
+                print(f"从 yFinance 下载 {ticker} {interval} K线失败: {e}")
+                continue
+        
+        return pd.DataFrame(columns=BAR_COLUMNS)
+    
     def calculate_returns(self, df: pd.DataFrame) -> pd.DataFrame:
         if df.empty:
             return df
@@ -741,9 +1158,10 @@ class GoldDataFetcher:
                 # 获取实时价格
                 realtime_data = self.fetch_realtime_price()
                 if realtime_data and realtime_data.get('price', 0) > 0:
-                    # 添加今天的数据到历史数据中
+                    # 添加今天的数据到历史数据中（时间戳取日期，同一天内报价不变时
+                    # 数据内容不变，技术指标缓存可以命中）
                     today_data = {
-                        'Date': datetime.now(),
+                        'Date': pd.Timestamp(today),
                         'Open': realtime_data.get('price', 0),
                         'High': realtime_data.get('high', realtime_data.get('price', 0)),
                         'Low': realtime_data.get('low', realtime_data.get('price', 0)),
@@ -756,39 +1174,88 @@ class GoldDataFetcher:
                     print(f"已添加今天({today})的数据到历史数据中")
         return df
     
-    def fetch_multiple_tickers(self, tickers: List[str]) -> Dict[str, pd.DataFrame]:
+    def fetch_multiple_tickers(self, tickers: List[str], period: Optional[int] = None) -> Dict[str, pd.DataFrame]:
+        """
+        并行获取多个品种的历史数据
+        
+        每个品种使用独立的 fetcher 实例（独立的数据源代码和缓存），在有界线程池中
+        同时获取，互不共享可变状态；总耗时约等于最慢的单个品种。
+        """
+        tickers = list(dict.fromkeys(tickers))
+        if not tickers:
+            return {}
+        
+        def fetch_one(ticker: str) -> pd.DataFrame:
+            return self._fetcher_for_ticker(ticker).fetch_historical_data(period)
+        
         data = {}
-        for ticker in tickers:
-            try:
-                temp_ticker = self.ticker
-                self.ticker = ticker
-                df = self.fetch_historical_data()
-                if not df.empty:
-                    data[ticker] = df
-                self.ticker = temp_ticker
-            except Exception as e:
-                print(f"获取 {ticker} 数据时出错: {e}")
+        with ThreadPoolExecutor(max_workers=max(1, min(Config.TICKER_MAX_WORKERS, len(tickers))),
+                                thread_name_prefix='ticker-fetch') as executor:
+            # 复制当前上下文，使刷新周期内的请求去重在工作线程中同样生效
+            futures = {
+                executor.submit(contextvars.copy_context().run, fetch_one, ticker): ticker
+                for ticker in tickers
+            }
+            for future in futures:
+                ticker = futures[future]
+                try:
+                    df = future.result()
+                    if not df.empty:
+                        data[ticker] = df
+                except Exception as e:
+                    print(f"获取 {ticker} 数据时出错: {e}")
         return data
     
+    def _fetcher_for_ticker(self, ticker: str) -> 'GoldDataFetcher':
+        """同一品种复用当前实例，其他品种创建共享缓存目录的新实例"""
+        if ticker == self.ticker:
+            return self
+        return self.__class__(ticker, cache_dir=self.cache_dir)
+    
+    def _migrate_legacy_cache(self) -> None:
+        """首次使用新的存储后端时，导入原有的 gold_price_cache.csv"""
+        if isinstance(self.price_store, CSVPriceStore) or self.ticker != Config.GOLD_TICKER:
+            return
+        
+        try:
+            legacy_store = CSVPriceStore(self.cache_dir, 'gold_price_cache')
+            if migrate_price_store(legacy_store, self.price_store):
+                print(f"已将 {legacy_store.path} 迁移到 {self.price_store.path}")
+        except Exception as e:
+            print(f"迁移旧缓存失败: {e}")
+    
     def _load_from_cache(self) -> pd.DataFrame:
-        """从本地缓存加载数据"""
-        if not os.path.exists(self.cache_file):
+        """
+        从本地缓存加载数据
+        
+        未过期的缓存直接返回；已过期但未超过最大陈旧时间的缓存同样返回，并标记
+        df.attrs['stale'] = True；超过最大陈旧时间时返回空数据，调用方必须同步获取。
+        """
+        cache_mtime = self.price_store.mtime()
+        if cache_mtime is None:
+            self.last_cache_status = None
+            return pd.DataFrame()
+        
+        # 检查缓存文件的修改时间
+        cache_age_hours = (datetime.now().timestamp() - cache_mtime) / 3600
+        state = cache_state(cache_age_hours, self.cache_expiry_hours, self.cache_max_stale_hours)
+        self.last_cache_status = {'state': state, 'age_hours': round(cache_age_hours, 2)}
+        if state == EXPIRED:
+            print("缓存已过期")
             return pd.DataFrame()
         
+        df = self._read_cache()
+        if state == STALE and not df.empty:
+            df.attrs['stale'] = True
+        return df
+    
+    def _read_cache(self) -> pd.DataFrame:
+        """读取缓存数据（不检查是否过期）"""
         try:
-            # 检查缓存文件的修改时间
-            cache_mtime = os.path.getmtime(self.cache_file)
-            cache_age_hours = (datetime.now().timestamp() - cache_mtime) / 3600
-            
-            if cache_age_hours > self.cache_expiry_hours:
-                print("缓存已过期")
-                return pd.DataFrame()
-            
-            # 加载缓存数据
-            df = pd.read_csv(self.cache_file)
+            df = self.price_store.load()
             if not df.empty and 'Date' in df.columns:
-                df['Date'] = pd.to_datetime(df['Date'])
-                df = df.sort_values('Date')
+                if not df['Date'].is_monotonic_increasing:
+                    df = df.sort_values('Date')
                 return df
         except Exception as e:
             print(f"从缓存加载数据失败: {e}")
@@ -799,7 +1266,62 @@ class GoldDataFetcher:
         """将数据保存到本地缓存"""
         if not df.empty:
             try:
-                df.to_csv(self.cache_file, index=False)
+                self.price_store.save(df)
+                # 缓存被整体重写，下次加载时重新完整验证
+                _validated_caches.pop(self.cache_file, None)
                 print(f"数据已缓存到 {self.cache_file}")
             except Exception as e:
                 print(f"保存数据到缓存失败: {e}")
+                return
+            
+            if self.price_pyramid_enabled:
+                try:
+                    self.price_pyramid.rebuild(df)
+                except Exception as e:
+                    print(f"重建多周期K线失败: {e}")
+    
+    def _append_to_cache(self, new_rows: pd.DataFrame) -> None:
+        """将新数据追加到本地缓存末尾；没有新数据时只刷新缓存时间"""
+        try:
+            self.price_store.append(new_rows)
+            if not new_rows.empty:
+                print(f"已追加 {len(new_rows)} 条数据到 {self.cache_file}")
+        except Exception as e:
+            print(f"追加数据到缓存失败: {e}")
+            return
+        
+        if self.price_pyramid_enabled:
+            try:
+                if not self.price_pyramid.update(new_rows):
+                    self.price_pyramid.rebuild(self._read_cache())
+            except Exception as e:
+                print(f"更新多周期K线失败: {e}")
+    
+    @property
+    def price_pyramid(self) -> PricePyramid:
+        """多周期K线金字塔，与当前价格存储放在同一目录"""
+        root = os.path.join(self.price_store.cache_dir, self.price_store.name + '_pyramid')
+        if self._price_pyramid is None or self._price_pyramid.root != root:
+            self._price_pyramid = PricePyramid(self.price_store.cache_dir, self.price_store.name + '_pyramid')
+        return self._price_pyramid
+    
+    def load_price_levels(self, df: Optional[pd.DataFrame] = None) -> Dict[str, pd.DataFrame]:
+        """
+        读取周线、月线、季线
+        
+        金字塔尚未建立时由日线缓存重建；df 中比缓存更新的日线（如实时报价补上的
+        今天数据）并入返回结果，但不写入存储。
+        """
+        if not self.price_pyramid_enabled:
+            return {}
+        try:
+            pyramid = self.price_pyramid
+            if not pyramid.exists():
+                daily = self._read_cache()
+                if daily.empty:
+                    return {}
+                pyramid.rebuild(daily)
+            return {level: pyramid.load(level, pending=df) for level in COARSE_LEVELS}
+        except Exception as e:
+            print(f"读取多周期K线失败: {e}")
+            return {}
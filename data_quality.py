@@ -0,0 +1,255 @@
+import copy
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# 每行数据的问题位掩码
+ISSUE_MISSING_VALUE = 1 << 0    # 存在缺失值
+ISSUE_NON_POSITIVE = 1 << 1     # 收盘价非正
+ISSUE_PRICE_TOO_HIGH = 1 << 2   # 收盘价异常高
+ISSUE_PRICE_JUMP = 1 << 3       # 相对上一条收盘价波动超过50%
+ISSUE_INVALID_HIGH = 1 << 4     # 最高价低于开盘价或收盘价
+ISSUE_INVALID_LOW = 1 << 5      # 最低价高于开盘价或收盘价
+ISSUE_DATE_GAP = 1 << 6         # 与上一条数据间隔超过7天
+
+REQUIRED_COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close']
+
+MAX_PRICE = 100000
+MAX_PRICE_CHANGE = 0.5
+MAX_GAP_DAYS = 7
+MIN_ROWS = 10
+VALID_SCORE = 60
+
+_NS_PER_DAY = 86400 * 10**9
+
+
+class QualityState:
+    """
+    已验证数据的累计统计
+
+    记录已验证的行数、缺失值个数、各类问题的行数、最大日期间隔，以及最后一行的
+    收盘价和日期，使追加的新数据可以只与已验证数据的尾部衔接验证。
+    """
+
+    def __init__(self, columns: List[str]):
+        self.columns = tuple(columns)
+        self.rows = 0
+        self.null_cells = 0
+        self.counts = {
+            ISSUE_NON_POSITIVE: 0,
+            ISSUE_PRICE_TOO_HIGH: 0,
+            ISSUE_PRICE_JUMP: 0,
+            ISSUE_INVALID_HIGH: 0,
+            ISSUE_INVALID_LOW: 0
+        }
+        self.max_gap_days = None
+        self.last_close = np.nan   # 前向填充后的最后收盘价（与 pct_change 一致）
+        self.last_date = None      # 最后一行的日期（int64 纳秒，NaT 时为 None）
+        self.has_last_date = False
+
+    def copy(self) -> 'QualityState':
+        return copy.deepcopy(self)
+
+
+class QualityReport:
+    """验证结果：是否有效、质量分数、问题列表，以及每行的问题位掩码"""
+
+    def __init__(self, is_valid: bool, quality_score: int, issues: List[str],
+                 flags: np.ndarray, state: Optional[QualityState]):
+        self.is_valid = is_valid
+        self.quality_score = quality_score
+        self.issues = issues
+        self.flags = flags
+        self.state = state
+
+    def as_tuple(self) -> Tuple[bool, int, List[str]]:
+        return self.is_valid, self.quality_score, self.issues
+
+
+class DataQualityValidator:
+    """
+    向量化数据质量验证器
+
+    对 OHLC 数组做一次 numpy 扫描，得到每行的问题位掩码，再由累计统计计算
+    质量分数。评分规则与原 validate_data_quality 完全一致。
+
+    validate_appended() 只扫描追加的新行，借助 QualityState 中保存的上一条
+    收盘价和日期完成衔接处的波动与间隔检查，结果与对完整数据重新验证相同。
+    """
+
+    def validate(self, df: pd.DataFrame) -> QualityReport:
+        if df.empty:
+            return QualityReport(False, 0, ['数据为空'], np.zeros(0, dtype=np.uint8), None)
+
+        state = QualityState(df.columns)
+        flags = self._scan(df, state)
+        return self._report(state, flags)
+
+    def validate_appended(self, state: QualityState, new_rows: pd.DataFrame) -> QualityReport:
+        """在已验证数据的基础上验证追加的新行（列必须与已验证数据一致）"""
+        if tuple(new_rows.columns) != state.columns:
+            raise ValueError(f"追加数据的列与已验证数据不一致: {list(new_rows.columns)}")
+        if state.rows == 0:
+            return self.validate(new_rows)
+
+        flags = self._scan(new_rows, state)
+        return self._report(state, flags)
+
+    def _scan(self, df: pd.DataFrame, state: QualityState) -> np.ndarray:
+        n = len(df)
+        flags = np.zeros(n, dtype=np.uint8)
+        columns = df.columns
+
+        null_per_row = np.zeros(n, dtype=np.int64)
+        for col in columns:
+            null_per_row += pd.isna(df[col].to_numpy())
+        _mark(flags, null_per_row > 0, ISSUE_MISSING_VALUE)
+        state.null_cells += int(null_per_row.sum())
+
+        if 'Close' in columns:
+            close = pd.to_numeric(df['Close'], errors='coerce').to_numpy(dtype=np.float64)
+
+            with np.errstate(invalid='ignore', divide='ignore'):
+                _mark(flags, close <= 0, ISSUE_NON_POSITIVE, state)
+                _mark(flags, close > MAX_PRICE, ISSUE_PRICE_TOO_HIGH, state)
+
+                # 与 pct_change() 相同：先前向填充缺失值，再与上一条比较
+                filled = _ffill(close, state.last_close)
+                change = np.empty(n)
+                change[0] = filled[0] / state.last_close
+                np.divide(filled[1:], filled[:-1], out=change[1:])
+                change -= 1
+                np.abs(change, out=change)
+                _mark(flags, change > MAX_PRICE_CHANGE, ISSUE_PRICE_JUMP, state)
+            state.last_close = filled[-1]
+
+        if all(col in columns for col in ['High', 'Low', 'Open', 'Close']):
+            open_, high, low, close = (df[col].to_numpy(dtype=np.float64)
+                                       for col in ['Open', 'High', 'Low', 'Close'])
+            with np.errstate(invalid='ignore'):
+                _mark(flags, (high < open_) | (high < close), ISSUE_INVALID_HIGH, state)
+                _mark(flags, (low > open_) | (low > close), ISSUE_INVALID_LOW, state)
+
+        if 'Date' in columns:
+            self._scan_dates(df['Date'], state, flags)
+
+        state.rows += n
+        return flags
+
+    @staticmethod
+    def _scan_dates(dates: pd.Series, state: QualityState, flags: np.ndarray) -> None:
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            raise TypeError(f"Date 列必须是日期类型，实际为 {dates.dtype}")
+        if dates.dt.tz is not None:
+            dates = dates.dt.tz_convert('UTC').dt.tz_localize(None)
+
+        values = dates.to_numpy(dtype='datetime64[ns]').view(np.int64)
+        valid = ~np.isnat(values.view('datetime64[ns]'))
+
+        # 与 Series.diff().dt.days 一致：相邻两行之差，向下取整到天，NaT 忽略
+        gap_days = np.empty(len(values), dtype=np.int64)
+        gap_days[0] = (values[0] - state.last_date) // _NS_PER_DAY if state.has_last_date and valid[0] else 0
+        np.floor_divide(values[1:] - values[:-1], _NS_PER_DAY, out=gap_days[1:])
+        both = valid.copy()
+        both[0] &= state.has_last_date
+        both[1:] &= valid[:-1]
+
+        if both.any():
+            gaps = gap_days[both] if not both.all() else gap_days
+            _mark(flags, both & (gap_days > MAX_GAP_DAYS), ISSUE_DATE_GAP)
+            chunk_max = int(gaps.max())
+            if state.max_gap_days is None or chunk_max > state.max_gap_days:
+                state.max_gap_days = chunk_max
+
+        state.has_last_date = bool(valid[-1])
+        state.last_date = int(values[-1]) if valid[-1] else None
+
+    @staticmethod
+    def _report(state: QualityState, flags: np.ndarray) -> QualityReport:
+        quality_score, issues = score_state(state)
+        return QualityReport(quality_score >= VALID_SCORE, quality_score, issues, flags, state)
+
+
+def score_state(state: QualityState) -> Tuple[int, List[str]]:
+    """根据累计统计计算质量分数和问题列表"""
+    issues = []
+    quality_score = 100
+    columns = state.columns
+
+    missing_cols = [col for col in REQUIRED_COLUMNS if col not in columns]
+    if missing_cols:
+        issues.append(f'缺少必要列: {", ".join(missing_cols)}')
+        quality_score -= 30
+
+    null_ratio = state.null_cells / (state.rows * len(columns))
+    if null_ratio > 0.1:
+        issues.append(f'缺失值过多: {null_ratio*100:.1f}%')
+        quality_score -= 20
+    elif null_ratio > 0.05:
+        issues.append(f'缺失值较多: {null_ratio*100:.1f}%')
+        quality_score -= 10
+
+    counts = state.counts
+    if 'Close' in columns:
+        if counts[ISSUE_NON_POSITIVE]:
+            issues.append('存在非正价格')
+            quality_score -= 20
+        if counts[ISSUE_PRICE_TOO_HIGH]:
+            issues.append('存在异常高价')
+            quality_score -= 15
+        if counts[ISSUE_PRICE_JUMP]:
+            issues.append('存在异常价格波动')
+            quality_score -= 10
+
+    if all(col in columns for col in ['High', 'Low', 'Open', 'Close']):
+        if counts[ISSUE_INVALID_HIGH]:
+            issues.append(f'存在{counts[ISSUE_INVALID_HIGH]}条数据最高价低于开盘价或收盘价')
+            quality_score -= 10
+        if counts[ISSUE_INVALID_LOW]:
+            issues.append(f'存在{counts[ISSUE_INVALID_LOW]}条数据最低价高于开盘价或收盘价')
+            quality_score -= 10
+
+    if state.rows < MIN_ROWS:
+        issues.append(f'数据量不足: 仅{state.rows}条')
+        quality_score -= 15
+
+    if 'Date' in columns and state.rows > 1:
+        if state.max_gap_days is not None and state.max_gap_days > MAX_GAP_DAYS:
+            issues.append('数据存在较大时间间隔')
+            quality_score -= 5
+
+    quality_score = max(0, min(100, quality_score))
+    return quality_score, issues
+
+
+def _mark(flags: np.ndarray, mask: np.ndarray, bit: int, state: Optional[QualityState] = None) -> None:
+    """把 mask 为真的行标记上 bit，并累计该类问题的行数"""
+    np.bitwise_or(flags, bit, out=flags, where=mask)
+    if state is not None:
+        state.counts[bit] += int(np.count_nonzero(mask))
+
+
+def _ffill(values: np.ndarray, initial: float) -> np.ndarray:
+    """前向填充 NaN，开头的 NaN 用 initial 填充"""
+    mask = np.isnan(values)
+    if not mask.any():
+        return values
+    index = np.where(~mask, np.arange(len(values)), -1)
+    np.maximum.accumulate(index, out=index)
+    filled = np.where(index >= 0, values[np.maximum(index, 0)], initial)
+    return filled
+
+
+def describe_flags(flags: np.ndarray) -> Dict[str, int]:
+    """统计各类问题的行数"""
+    labels = {
+        ISSUE_MISSING_VALUE: 'missing_value',
+        ISSUE_NON_POSITIVE: 'non_positive',
+        ISSUE_PRICE_TOO_HIGH: 'price_too_high',
+        ISSUE_PRICE_JUMP: 'price_jump',
+        ISSUE_INVALID_HIGH: 'invalid_high',
+        ISSUE_INVALID_LOW: 'invalid_low',
+        ISSUE_DATE_GAP: 'date_gap'
+    }
+    return {name: int(np.count_nonzero(flags & bit)) for bit, name in labels.items()}
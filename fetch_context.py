@@ -0,0 +1,88 @@
+import contextvars
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional
+
+_current_context = contextvars.ContextVar('fetch_context', default=None)
+
+
+class _Entry:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class FetchContext:
+    """
+    单个刷新周期内的请求去重上下文
+
+    在 with 块内，通过 memoized() 发起的相同请求（历史数据、实时报价、新闻等）
+    只执行一次，之后直接返回第一次的结果；多个线程同时请求同一个键时，只有
+    第一个线程真正执行，其余线程等待并共享其结果（single-flight）。失败同样
+    在本周期内缓存，避免同一周期反复请求已失败的上游。
+
+    返回给调用方的 DataFrame / dict / list 是副本，调用方可以放心修改。
+    """
+
+    def __init__(self, name: str = 'fetch'):
+        self.name = name
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._token = None
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self) -> 'FetchContext':
+        self._token = _current_context.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _current_context.reset(self._token)
+        self._token = None
+
+    def get_or_fetch(self, key: Hashable, fetch_fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            owner = entry is None
+            if owner:
+                entry = _Entry()
+                self._entries[key] = entry
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if owner:
+            try:
+                entry.value = fetch_fn()
+            except Exception as e:
+                entry.error = e
+            finally:
+                entry.done.set()
+        else:
+            entry.done.wait()
+
+        if entry.error is not None:
+            raise entry.error
+        return _copy(entry.value)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'name': self.name, 'keys': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+def _copy(value: Any) -> Any:
+    if hasattr(value, 'copy') and callable(value.copy):
+        return value.copy()
+    return value
+
+
+def current_fetch_context() -> Optional[FetchContext]:
+    return _current_context.get()
+
+
+def memoized(key: Hashable, fetch_fn: Callable[[], Any]) -> Any:
+    """在当前刷新周期内去重执行 fetch_fn；不在周期内时直接执行"""
+    context = _current_context.get()
+    if context is None:
+        return fetch_fn()
+    return context.get_or_fetch(key, fetch_fn)
@@ -0,0 +1,92 @@
+"""
+测试共用的数据和对象
+
+各 test_*.py 既可以用 pytest 运行，也可以直接 python 运行，所以共用部分放在
+普通模块里按需导入，而不是 conftest 的 pytest fixture。
+"""
+
+import shutil
+import tempfile
+import threading
+import weakref
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Optional, Tuple, Type
+
+import numpy as np
+import pandas as pd
+
+from data_fetcher import GoldDataFetcher
+from source_health import SourceHealthRegistry
+
+
+def make_price_df(rows: int = 100, end: Optional[datetime] = None, start: Optional[datetime] = None,
+                  base: float = 2000.0, step: float = 0.5) -> pd.DataFrame:
+    """
+    平稳上涨的日线：收盘价从 base 起每天上涨 step，最高/最低价为收盘价 ±10
+
+    给定 start 时从 start 开始，否则截止到 end（默认当前时间）。
+    """
+    if start is not None:
+        dates = pd.date_range(start=start, periods=rows)
+    else:
+        dates = pd.date_range(end=end if end is not None else datetime.now(), periods=rows)
+    close = base + np.arange(rows) * step
+    return pd.DataFrame({
+        'Date': dates,
+        'Open': close,
+        'High': close + 10,
+        'Low': close - 10,
+        'Close': close,
+        'Volume': np.full(rows, 100000, dtype=np.int64)
+    })
+
+
+def make_fetcher(cache_dir: Optional[str] = None, sources: Iterable[str] = ('akshare',), **attrs) -> GoldDataFetcher:
+    """
+    不访问网络的 GoldDataFetcher
+
+    缓存写在 cache_dir（未指定时新建临时目录，fetcher 回收时删除），构造时的旧版
+    缓存迁移等也不会写入仓库的 data_cache/。历史数据源为 sources 加模拟数据，
+    顺序获取，使用独立的数据源健康登记表；attrs 覆盖其他属性（如 incremental_fetch）。
+    """
+    owned_dir = cache_dir is None
+    if owned_dir:
+        cache_dir = tempfile.mkdtemp()
+    fetcher = GoldDataFetcher(cache_dir=cache_dir)
+    if owned_dir:
+        weakref.finalize(fetcher, shutil.rmtree, cache_dir, True)
+    fetcher.data_sources = list(sources) + ['mock']
+    fetcher.concurrent_fetch = False
+    fetcher.source_health = SourceHealthRegistry()
+    for name, value in attrs.items():
+        setattr(fetcher, name, value)
+    return fetcher
+
+
+class LocalHandler(BaseHTTPRequestHandler):
+    """本地测试服务器的请求处理基类：支持 keep-alive，不打印访问日志"""
+    protocol_version = 'HTTP/1.1'
+
+    def send_body(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(handler: Type[BaseHTTPRequestHandler], path: str = '/') -> Tuple[ThreadingHTTPServer, str]:
+    """在后台线程启动本地 HTTP 服务器（随机端口），返回 (server, path 对应的 URL)"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}{path}'
+
+
+def stop_server(server: ThreadingHTTPServer) -> None:
+    server.shutdown()
+    server.server_close()
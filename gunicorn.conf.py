@@ -0,0 +1,9 @@
+from config import Config
+
+
+def post_worker_init(worker):
+    """worker 加载应用后立即恢复数据快照并启动后台刷新（gunicorn 不会执行 __main__）"""
+    if not Config.FAST_STARTUP:
+        return
+    import backend_optimized
+    backend_optimized.start_background_startup()
@@ -0,0 +1,347 @@
+import gzip
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from config import Config
+
+# 各上游的缓存有效期（秒）。规则为 "主机/路径前缀[?参数=值]"，匹配最长的规则；
+# akshare 接口以 "akshare:函数名" 表示。有效期为0时不直接使用缓存，但上游提供
+# ETag/Last-Modified 时仍会发送条件请求，未变化时只返回 304。
+DEFAULT_CACHE_TTLS = {
+    'www.kitco.com/graph/': 900,
+    'www.kitco.com/news/': 300,
+    'www.investing.com/commodities/': 900,
+    'www.investing.com/commodities/gold-news': 300,
+    'www.alphavantage.co/query?function=TIME_SERIES_DAILY': 3600,
+    'www.alphavantage.co/query?function=GLOBAL_QUOTE': 0,
+    'finnhub.io/api/v1/forex/candle': 900,
+    'finnhub.io/api/v1/quote': 0,
+    'hq.sinajs.cn/': 0,
+    'data.eastmoney.com/': 3600,
+    'newsapi.org/v2/': 600,
+    'www.google.com/search': 600,
+    'api.alternative.me/fng/': 3600,
+    'akshare:futures_foreign_hist': 900,
+    'akshare:stock_news_em': 300,
+}
+
+# 缓存条目中保存的响应头
+_STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+# 上游以 200 返回的错误：Alpha Vantage 限流/错误提示、Finnhub 错误等 JSON 顶层字段，
+# 以及反爬验证页面的标题
+_ERROR_JSON_KEYS = ('Note', 'Information', 'Error Message', 'error')
+_CHALLENGE_TITLES = ('captcha', 'just a moment', 'attention required', 'access denied')
+# 只检查较小的 JSON 响应体，正常的行情数据不必整体解析
+_ERROR_JSON_MAX_BYTES = 4096
+# 两次清理磁盘过期文件的最短间隔（秒）
+_PRUNE_INTERVAL = 3600
+
+
+def parse_cache_ttls(value: str) -> Dict[str, float]:
+    """解析 "规则=秒数,规则=秒数" 格式的有效期配置"""
+    ttls = {}
+    for item in value.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        rule, _, seconds = item.rpartition('=')
+        if not rule:
+            raise ValueError(f"无效的缓存有效期配置: {item}")
+        ttls[rule.strip()] = float(seconds)
+    return ttls
+
+
+def is_cacheable(response: requests.Response) -> bool:
+    """200 响应是否可以缓存：上游以 200 返回的限流提示、错误信息和验证码页面不缓存"""
+    body = response.content or b''
+    head = body[:_ERROR_JSON_MAX_BYTES].lstrip()
+    if head.startswith(b'{') and len(body) <= _ERROR_JSON_MAX_BYTES:
+        try:
+            data = json.loads(body)
+        except ValueError:
+            data = None
+        if isinstance(data, dict) and any(key in data for key in _ERROR_JSON_KEYS):
+            return False
+
+    if 'html' in response.headers.get('Content-Type', '') or head[:1] == b'<':
+        lowered = body[:16384].lower()
+        start = lowered.find(b'<title')
+        end = lowered.find(b'</title>', start)
+        if start >= 0 and end > start:
+            title = lowered[start:end].decode('utf-8', 'ignore')
+            if any(marker in title for marker in _CHALLENGE_TITLES):
+                return False
+    return True
+
+
+class CacheEntry:
+    """一条已缓存的响应：状态码、部分响应头、响应体和写入时间"""
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes, stored_at: float):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.stored_at = stored_at
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.headers.get('ETag'):
+            headers['If-None-Match'] = self.headers['ETag']
+        if self.headers.get('Last-Modified'):
+            headers['If-Modified-Since'] = self.headers['Last-Modified']
+        return headers
+
+    def to_response(self, url: str) -> requests.Response:
+        response = requests.Response()
+        response.status_code = self.status
+        response.reason = 'OK'
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.body
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = url
+        response.from_cache = True
+        return response
+
+
+class HttpResponseCache:
+    """
+    磁盘 HTTP 响应缓存
+
+    以完整 URL（含查询参数）的哈希为键，每条响应 gzip 压缩后保存为一个文件，
+    文件中只记录主机和路径，不保存查询参数中的 API key。进程内同时保留一份
+    内存副本，避免重复解压。
+
+    在有效期内直接返回缓存；过期后若上游提供了 ETag/Last-Modified，则发送
+    条件请求，304 时沿用缓存并重新计时。同样的有效期规则也用于 akshare 等
+    不经过共享 HTTP 客户端的接口（见 cached_call）。
+
+    内存副本按最近使用保留，响应体总大小不超过 max_memory_bytes；磁盘上超过
+    max_age 秒未写入或刷新的文件在写入新缓存时定期清理（不短于最长的有效期）。
+    """
+
+    def __init__(self, cache_dir: str, ttls: Optional[Dict[str, float]] = None, default_ttl: float = 0,
+                 max_memory_bytes: int = 32 * 1024 * 1024, max_age: float = 2 * 86400):
+        self.cache_dir = cache_dir
+        self.default_ttl = default_ttl
+        self.ttls = dict(DEFAULT_CACHE_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self._rules = self._parse_rules(self.ttls)
+        self.max_memory_bytes = max_memory_bytes
+        self.max_age = max([max_age, default_ttl] + list(self.ttls.values()))
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self._memory_bytes = 0
+        self._next_prune = 0.0
+
+    @classmethod
+    def from_config(cls) -> 'HttpResponseCache':
+        return cls(Config.HTTP_CACHE_DIR, parse_cache_ttls(Config.HTTP_CACHE_TTLS), Config.HTTP_CACHE_DEFAULT_TTL,
+                   int(Config.HTTP_CACHE_MEMORY_MB * 1024 * 1024), Config.HTTP_CACHE_MAX_AGE_SECONDS)
+
+    @staticmethod
+    def _parse_rules(ttls: Dict[str, float]) -> List[Tuple[str, Dict[str, str], float, int]]:
+        rules = []
+        for rule, ttl in ttls.items():
+            if '://' in rule or rule.startswith('akshare:'):
+                continue
+            prefix, _, query = rule.partition('?')
+            rules.append((prefix, dict(parse_qsl(query)), ttl, len(rule)))
+        # 最长（最具体）的规则优先
+        rules.sort(key=lambda r: r[3], reverse=True)
+        return rules
+
+    def ttl_for(self, target: str) -> float:
+        """URL 或 "akshare:函数名" 对应的缓存有效期"""
+        if '://' not in target:
+            return self.ttls.get(target, self.default_ttl)
+
+        parts = urlsplit(target)
+        location = parts.netloc + parts.path
+        params = dict(parse_qsl(parts.query))
+        for prefix, required, ttl, _ in self._rules:
+            if location.startswith(prefix) and all(params.get(k) == v for k, v in required.items()):
+                return ttl
+        return self.default_ttl
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode('utf-8')).hexdigest() + suffix)
+
+    def _write(self, path: str, payload: bytes) -> None:
+        if time.time() >= self._next_prune:
+            self.prune()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix='.tmp_', suffix='.gz')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(gzip.compress(payload, compresslevel=6))
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _remember(self, url: str, entry: CacheEntry) -> None:
+        """保存内存副本，超出大小上限时丢弃最久未使用的条目（调用方持有 _lock）"""
+        previous = self._entries.pop(url, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous.body)
+        self._entries[url] = entry
+        self._memory_bytes += len(entry.body)
+        while self._memory_bytes > self.max_memory_bytes and len(self._entries) > 1:
+            _, dropped = self._entries.popitem(last=False)
+            self._memory_bytes -= len(dropped.body)
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                self._entries.move_to_end(url)
+        if entry is not None:
+            return entry
+
+        path = self._path(url, '.gz')
+        if not os.path.exists(path):
+            return None
+        try:
+            with gzip.open(path, 'rb') as f:
+                meta_line, _, body = f.read().partition(b'\n')
+            meta = json.loads(meta_line)
+            entry = CacheEntry(meta['status'], meta['headers'], body, meta['stored_at'])
+        except Exception as e:
+            print(f"读取HTTP缓存失败: {e}")
+            return None
+
+        with self._lock:
+            self._remember(url, entry)
+        return entry
+
+    def store(self, url: str, response: requests.Response) -> Optional[CacheEntry]:
+        """保存 200 响应（Cache-Control: no-store 的响应和限流、验证码等错误页面不保存）"""
+        if response.status_code != 200 or 'no-store' in response.headers.get('Cache-Control', ''):
+            return None
+        if not is_cacheable(response):
+            # 之前缓存的正常响应保留到过期，错误页面不覆盖它
+            return None
+        headers = {name: response.headers[name] for name in _STORED_HEADERS if name in response.headers}
+        entry = CacheEntry(200, headers, response.content, time.time())
+        self._save(url, entry)
+        return entry
+
+    def refresh(self, url: str, entry: CacheEntry, response: requests.Response) -> None:
+        """条件请求返回 304：沿用缓存的响应体，更新验证头并重新计时"""
+        for name in ('ETag', 'Last-Modified'):
+            if name in response.headers:
+                entry.headers[name] = response.headers[name]
+        entry.stored_at = time.time()
+        self._save(url, entry)
+
+    def evict(self, url: str) -> None:
+        """删除一条缓存（调用方发现响应内容无法使用时调用）"""
+        with self._lock:
+            entry = self._entries.pop(url, None)
+            if entry is not None:
+                self._memory_bytes -= len(entry.body)
+        try:
+            os.remove(self._path(url, '.gz'))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"删除HTTP缓存失败: {e}")
+
+    def _save(self, url: str, entry: CacheEntry) -> None:
+        parts = urlsplit(url)
+        meta = {
+            'location': parts.netloc + parts.path,
+            'status': entry.status,
+            'headers': entry.headers,
+            'stored_at': entry.stored_at
+        }
+        with self._lock:
+            self._remember(url, entry)
+        try:
+            self._write(self._path(url, '.gz'), json.dumps(meta).encode('utf-8') + b'\n' + entry.body)
+        except Exception as e:
+            print(f"写入HTTP缓存失败: {e}")
+
+    def cached_call(self, name: str, params: Dict[str, Any], fn: Callable[[], Any]) -> Any:
+        """
+        按有效期缓存第三方库接口（如 akshare）的返回值
+
+        结果以 pickle 压缩保存在磁盘上；空结果和异常不缓存。
+        """
+        ttl = self.ttl_for(name)
+        if ttl <= 0:
+            return fn()
+
+        key = f"{name}?{json.dumps(params, sort_keys=True, ensure_ascii=False)}"
+        path = self._path(key, '.pkl.gz')
+        try:
+            if os.path.exists(path) and time.time() - os.path.getmtime(path) < ttl:
+                with gzip.open(path, 'rb') as f:
+                    return pickle.load(f)
+        except Exception as e:
+            print(f"读取接口缓存失败: {e}")
+
+        result = fn()
+        if result is None or (hasattr(result, 'empty') and result.empty):
+            return result
+        try:
+            self._write(path, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception as e:
+            print(f"写入接口缓存失败: {e}")
+        return result
+
+    def prune(self) -> int:
+        """删除超过 max_age 秒未写入或刷新的缓存文件，返回删除的文件数"""
+        self._next_prune = time.time() + _PRUNE_INTERVAL
+        if not os.path.isdir(self.cache_dir):
+            return 0
+        cutoff = time.time() - self.max_age
+        removed = 0
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.gz'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._memory_bytes = 0
+        if os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.endswith('.gz'):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+
+def cached_call(name: str, params: Dict[str, Any], fn: Callable[[], Any]) -> Any:
+    """通过共享 HTTP 客户端的响应缓存执行接口调用（未启用缓存时直接调用）"""
+    from http_client import get_http_client
+
+    cache = get_http_client().cache
+    if cache is None:
+        return fn()
+    return cache.cached_call(name, params, fn)
@@ -0,0 +1,228 @@
+import base64
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from config import Config
+
+CASSETTE_MODES = ('record', 'replay', 'auto')
+
+# 录制时从 URL 中去掉的敏感参数（API key 等），不会写入 cassette 文件
+REDACTED_PARAMS = {'apikey', 'api_key', 'token', 'key', 'access_key'}
+
+# 响应体已解压保存，这些头部不再适用
+_DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection', 'set-cookie'}
+
+
+def _normalize_url(url: str) -> str:
+    """按参数名排序并去掉敏感参数，使相同请求得到相同的键"""
+    parts = urlsplit(url)
+    params = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+              if k.lower() not in REDACTED_PARAMS]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(sorted(params)), ''))
+
+
+def _request_key(request: requests.PreparedRequest) -> str:
+    body = request.body or b''
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    body_hash = hashlib.sha1(body).hexdigest()[:12] if body else ''
+    return f"{request.method} {_normalize_url(request.url)} {body_hash}".rstrip()
+
+
+class HttpCassette:
+    """
+    HTTP 录制/回放文件
+
+    以 JSON 文件保存请求键到响应（状态码、头部、响应体、录制时的延迟）的映射。
+    同一请求录制多次时按顺序循环回放，可用来重现报价随时间变化的序列。
+
+    mode:
+    - record：总是访问网络并录制（覆盖同一请求之前的录制）
+    - replay：只回放，没有录制的请求抛出 ConnectionError，绝不访问网络
+    - auto：有录制时回放，否则访问网络并录制
+
+    latency: 回放时每个请求的固定延迟（秒）；为 None 时使用录制时的真实延迟
+    乘以 latency_scale。
+    """
+
+    def __init__(self, path: str, mode: str = 'replay', latency: Optional[float] = None,
+                 latency_scale: float = 1.0):
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"不支持的 cassette 模式: {mode}")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.latency_scale = latency_scale
+
+        self._lock = threading.Lock()
+        self._interactions: Dict[str, List[Dict]] = {}
+        self._recorded_keys = set()
+        self._replay_positions: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self._interactions = data.get('interactions', {})
+
+    def save(self) -> None:
+        with self._lock:
+            data = {'version': 1, 'interactions': self._interactions}
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.cassette.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, indent=1)
+                os.replace(tmp_path, self.path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(v) for v in self._interactions.values())
+
+    def lookup(self, request: requests.PreparedRequest) -> Optional[Dict]:
+        key = _request_key(request)
+        with self._lock:
+            entries = self._interactions.get(key)
+            if not entries:
+                self.misses += 1
+                return None
+            position = self._replay_positions.get(key, 0)
+            self._replay_positions[key] = position + 1
+            self.hits += 1
+            return entries[position % len(entries)]
+
+    def record(self, request: requests.PreparedRequest, response: requests.Response, latency: float) -> None:
+        key = _request_key(request)
+        entry = {
+            'url': _normalize_url(request.url),
+            'status': response.status_code,
+            'reason': response.reason,
+            'headers': {k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS},
+            'body': base64.b64encode(response.content).decode('ascii'),
+            'latency': round(latency, 4)
+        }
+        with self._lock:
+            # 本次录制中第一次遇到该请求时覆盖旧录制，之后的录制追加为序列
+            if key not in self._recorded_keys:
+                self._interactions[key] = []
+                self._recorded_keys.add(key)
+            self._interactions[key].append(entry)
+            self.recorded += 1
+
+    def replay_latency(self, entry: Dict) -> float:
+        if self.latency is not None:
+            return self.latency
+        return entry.get('latency', 0.0) * self.latency_scale
+
+    def stats(self) -> Dict:
+        return {
+            'path': self.path,
+            'mode': self.mode,
+            'interactions': len(self),
+            'hits': self.hits,
+            'misses': self.misses,
+            'recorded': self.recorded
+        }
+
+
+class CassetteAdapter(BaseAdapter):
+    """挂载在 requests Session 上的传输层：按 cassette 模式回放或录制真实请求"""
+
+    def __init__(self, cassette: HttpCassette, real_adapter: BaseAdapter):
+        super().__init__()
+        self.cassette = cassette
+        self.real_adapter = real_adapter
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if self.cassette.mode != 'record':
+            entry = self.cassette.lookup(request)
+            if entry is not None:
+                time.sleep(self.cassette.replay_latency(entry))
+                return self._build_response(request, entry)
+            if self.cassette.mode == 'replay':
+                raise requests.exceptions.ConnectionError(
+                    f"cassette 中没有该请求的录制: {_request_key(request)}", request=request)
+
+        start = time.perf_counter()
+        response = self.real_adapter.send(request, stream=False, timeout=timeout, verify=verify,
+                                          cert=cert, proxies=proxies)
+        response.content  # 读取完整响应体后再计时
+        self.cassette.record(request, response, time.perf_counter() - start)
+        return response
+
+    def _build_response(self, request: requests.PreparedRequest, entry: Dict) -> requests.Response:
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.reason = entry.get('reason')
+        response.headers = CaseInsensitiveDict(entry.get('headers', {}))
+        response._content = base64.b64decode(entry['body'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        self.real_adapter.close()
+
+
+@contextlib.contextmanager
+def use_cassette(path: str, mode: str = 'replay', latency: Optional[float] = None,
+                 latency_scale: float = 1.0, patch_requests: bool = True) -> Iterator[HttpCassette]:
+    """
+    在 with 块内让共享 HTTP 客户端通过 cassette 录制或回放
+
+    patch_requests=True 时同时接管直接使用 requests 的第三方库（如 akshare）
+    发出的请求。录制模式下退出时写回 cassette 文件。
+    """
+    from http_client import get_http_client
+
+    cassette = HttpCassette(path, mode=mode, latency=latency, latency_scale=latency_scale)
+    client = get_http_client()
+    previous = client.set_transport(CassetteAdapter(cassette, client.adapter))
+
+    original_get_adapter = requests.Session.get_adapter
+    if patch_requests:
+        fallback = CassetteAdapter(cassette, requests.adapters.HTTPAdapter())
+
+        def get_adapter(session, url):
+            adapter = original_get_adapter(session, url)
+            return adapter if isinstance(adapter, CassetteAdapter) else fallback
+
+        requests.Session.get_adapter = get_adapter
+    try:
+        yield cassette
+    finally:
+        requests.Session.get_adapter = original_get_adapter
+        client.set_transport(previous)
+        if cassette.mode != 'replay':
+            cassette.save()
+
+
+def cassette_from_config() -> Optional[HttpCassette]:
+    """根据 HTTP_CASSETTE 配置创建 cassette（未配置时返回 None）"""
+    if not Config.HTTP_CASSETTE:
+        return None
+    latency = Config.HTTP_CASSETTE_LATENCY_MS / 1000 if Config.HTTP_CASSETTE_LATENCY_MS >= 0 else None
+    return HttpCassette(Config.HTTP_CASSETTE, mode=Config.HTTP_CASSETTE_MODE, latency=latency)
@@ -0,0 +1,253 @@
+import atexit
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import numpy as np
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import Config
+from http_cache import HttpResponseCache
+from http_cassette import CassetteAdapter, cassette_from_config
+from rate_limiter import RateLimiter, RateLimitExceeded, get_rate_limiter
+
+
+class HttpClient:
+    """
+    共享的HTTP客户端
+
+    所有数据获取模块共用同一个连接池：按主机复用 keep-alive 连接、限制每个主机的
+    连接数，并提供默认超时和带退避的重试。每个线程使用独立的 Session（避免共享
+    cookie 等状态），但挂载同一个 HTTPAdapter，因此并发刷新也能复用连接。
+    """
+
+    def __init__(self, pool_maxsize: Optional[int] = None, timeout: Optional[float] = None,
+                 max_retries: Optional[int] = None, backoff_factor: Optional[float] = None,
+                 cache: Optional[HttpResponseCache] = None, use_cache: Optional[bool] = None,
+                 rate_limiter: Optional[RateLimiter] = None):
+        self.timeout = timeout if timeout is not None else Config.HTTP_TIMEOUT_SECONDS
+        pool_maxsize = pool_maxsize if pool_maxsize is not None else Config.HTTP_POOL_MAXSIZE
+        max_retries = max_retries if max_retries is not None else Config.HTTP_MAX_RETRIES
+        backoff_factor = backoff_factor if backoff_factor is not None else Config.HTTP_BACKOFF_FACTOR
+
+        # 连接失败和 429/5xx 时退避重试；读超时不重试，避免单次调用耗时成倍增加
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=0,
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'HEAD']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        self.adapter = HTTPAdapter(pool_connections=16, pool_maxsize=pool_maxsize, max_retries=retry)
+
+        # 实际挂载到 Session 上的传输层，默认就是连接池；录制/回放时替换为 CassetteAdapter
+        self.transport = self.adapter
+        self._transport_generation = 0
+
+        # GET 请求的磁盘响应缓存（有效期内直接返回，过期后发送条件请求）
+        use_cache = use_cache if use_cache is not None else Config.HTTP_CACHE
+        if cache is None and use_cache:
+            cache = HttpResponseCache.from_config()
+        self.cache = cache if use_cache else None
+
+        # 按上游服务的请求配额（缓存命中不消耗配额）
+        if rate_limiter is None and Config.RATE_LIMIT:
+            rate_limiter = get_rate_limiter()
+        self.rate_limiter = rate_limiter
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._host_stats = {}
+
+        cassette = cassette_from_config()
+        if cassette is not None:
+            self.set_transport(CassetteAdapter(cassette, self.adapter))
+            if cassette.mode != 'replay':
+                atexit.register(cassette.save)
+            print(f"HTTP请求使用 cassette: {cassette.path} ({cassette.mode})")
+
+    @property
+    def session(self) -> requests.Session:
+        """当前线程的 Session（共享连接池）"""
+        session = getattr(self._local, 'session', None)
+        generation = getattr(self._local, 'generation', None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+        if generation != self._transport_generation:
+            session.mount('http://', self.transport)
+            session.mount('https://', self.transport)
+            self._local.generation = self._transport_generation
+        return session
+
+    def set_transport(self, transport: BaseAdapter) -> BaseAdapter:
+        """替换所有线程 Session 使用的传输层，返回原来的传输层"""
+        with self._lock:
+            previous = self.transport
+            self.transport = transport
+            self._transport_generation += 1
+        return previous
+
+    def request(self, method: str, url: str, cache_ttl: Optional[float] = None, **kwargs) -> requests.Response:
+        """发送请求；cache_ttl 覆盖该 URL 的缓存有效期（秒）"""
+        kwargs.setdefault('timeout', self.timeout)
+        host = urlparse(url).netloc
+        if self.cache is not None and method.upper() == 'GET':
+            return self._cached_get(url, host, cache_ttl, **kwargs)
+        return self._send(method, url, host, **kwargs)
+
+    def evict(self, url: str, params: Optional[Dict] = None) -> None:
+        """响应内容无法使用（格式错误、限流提示等）时删除其缓存，下次请求重新下载"""
+        if self.cache is not None:
+            self.cache.evict(self._full_url(url, params))
+
+    @staticmethod
+    def _full_url(url: str, params: Optional[Dict] = None) -> str:
+        return requests.Request('GET', url, params=params).prepare().url
+
+    def _cached_get(self, url: str, host: str, cache_ttl: Optional[float], **kwargs) -> requests.Response:
+        full_url = self._full_url(url, kwargs.get('params'))
+        ttl = cache_ttl if cache_ttl is not None else self.cache.ttl_for(full_url)
+
+        entry = self.cache.get(full_url)
+        if entry is not None and entry.age < ttl:
+            self._count(host, 'cache_hits')
+            return entry.to_response(full_url)
+
+        if entry is not None:
+            conditional = entry.conditional_headers()
+            if conditional:
+                kwargs['headers'] = {**(kwargs.get('headers') or {}), **conditional}
+
+        response = self._send('GET', url, host, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            self._count(host, 'not_modified')
+            self.cache.refresh(full_url, entry, response)
+            return entry.to_response(full_url)
+
+        # 有效期为0且上游不支持条件请求时缓存没有意义
+        if ttl > 0 or response.headers.get('ETag') or response.headers.get('Last-Modified'):
+            self.cache.store(full_url, response)
+        return response
+
+    def _send(self, method: str, url: str, host: str, **kwargs) -> requests.Response:
+        if self.rate_limiter is not None:
+            try:
+                self.rate_limiter.acquire_for_host(host)
+            except RateLimitExceeded:
+                self._count(host, 'throttled')
+                raise
+
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except Exception as e:
+            self._record(host, time.perf_counter() - start, error=e)
+            raise
+
+        self._record(host, time.perf_counter() - start, status_code=response.status_code)
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def _host_entry(self, host: str) -> Dict:
+        stats = self._host_stats.get(host)
+        if stats is None:
+            stats = {
+                'requests': 0,
+                'errors': 0,
+                'cache_hits': 0,
+                'not_modified': 0,
+                'throttled': 0,
+                'latencies': deque(maxlen=200),
+                'last_status': None,
+                'last_error': None
+            }
+            self._host_stats[host] = stats
+        return stats
+
+    def _count(self, host: str, field: str) -> None:
+        with self._lock:
+            self._host_entry(host)[field] += 1
+
+    def _record(self, host: str, latency: float, status_code: Optional[int] = None,
+                error: Optional[Exception] = None) -> None:
+        with self._lock:
+            stats = self._host_entry(host)
+            stats['requests'] += 1
+            stats['latencies'].append(latency)
+            if error is not None:
+                stats['errors'] += 1
+                stats['last_error'] = str(error)
+            else:
+                stats['last_status'] = status_code
+                if status_code >= 400:
+                    stats['errors'] += 1
+
+    def _pool_counters(self) -> Dict[str, Dict]:
+        """从 urllib3 连接池读取每个主机新建的连接数和经过的请求数"""
+        counters = {}
+        try:
+            pools = self.adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                host = key.key_host if key.key_port in (None, 80, 443) else f'{key.key_host}:{key.key_port}'
+                entry = counters.setdefault(host, {'connections_opened': 0, 'pool_requests': 0})
+                entry['connections_opened'] += pool.num_connections
+                entry['pool_requests'] += pool.num_requests
+        except Exception as e:
+            print(f"读取连接池统计失败: {e}")
+        return counters
+
+    def stats(self) -> Dict[str, Dict]:
+        """每个主机的请求数、错误数、延迟分位数和连接复用情况"""
+        pool_counters = self._pool_counters()
+
+        result = {}
+        with self._lock:
+            for host, stats in self._host_stats.items():
+                latencies = np.array(stats['latencies']) * 1000
+                entry = {
+                    'requests': stats['requests'],
+                    'errors': stats['errors'],
+                    'cache_hits': stats['cache_hits'],
+                    'not_modified': stats['not_modified'],
+                    'throttled': stats['throttled'],
+                    'latency_p50_ms': round(float(np.percentile(latencies, 50)), 1) if len(latencies) else None,
+                    'latency_p95_ms': round(float(np.percentile(latencies, 95)), 1) if len(latencies) else None,
+                    'last_status': stats['last_status'],
+                    'last_error': stats['last_error']
+                }
+                counters = pool_counters.get(host.split(':')[0] if host.endswith((':80', ':443')) else host)
+                if counters:
+                    entry.update(counters)
+                    if counters['pool_requests']:
+                        reused = counters['pool_requests'] - counters['connections_opened']
+                        entry['connection_reuse_ratio'] = round(max(0, reused) / counters['pool_requests'], 3)
+                result[host] = entry
+        return result
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """进程内共享的HTTP客户端"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient()
+    return _client
@@ -0,0 +1,135 @@
+"""
+技术指标结果缓存
+
+以 OHLCV 各列内容和指标参数的哈希为键：输入与上次完全相同（周末、价格缓存
+命中且没有新K线）时直接返回上次的结果；只有末尾若干根K线被修改或追加了新K线时，
+从保存的流式指标检查点开始只重算变化的部分（见 TechnicalAnalyzer.update_indicators）。
+"""
+
+import hashlib
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+from indicator_stream import IndicatorStream
+
+INPUT_COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
+HIT = 'hit'
+TAIL = 'tail'
+FULL = 'full'
+
+
+def input_arrays(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """df 中参与缓存键计算的列"""
+    return {col: df[col].to_numpy() for col in INPUT_COLUMNS if col in df.columns}
+
+
+def frame_digest(arrays: Dict[str, np.ndarray], params: Optional[Dict] = None) -> str:
+    """
+    输入数组和参数的内容哈希
+
+    数值和日期列直接对内存字节做 blake2b（几年的日线约几十微秒），
+    其他类型的列先用 pandas 逐元素哈希。
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(sorted((params or {}).items())).encode())
+    for col, values in arrays.items():
+        digest.update(f'{col}:{values.dtype}:{len(values)};'.encode())
+        if values.dtype.kind in 'biufcmM':
+            digest.update(np.ascontiguousarray(values).view(np.uint8))
+        else:
+            digest.update(pd.util.hash_array(values).view(np.uint8))
+    return digest.hexdigest()
+
+
+def first_changed_row(old: Dict[str, np.ndarray], new: Dict[str, np.ndarray]) -> int:
+    """
+    新旧输入第一处不同的行号
+
+    公共部分完全相同时返回较短一方的长度；列不一致时返回 0。
+    """
+    if old.keys() != new.keys():
+        return 0
+    rows = min(len(values) for values in new.values()) if new else 0
+    rows = min([rows] + [len(values) for values in old.values()])
+    first = rows
+    for col, values in new.items():
+        a, b = old[col][:first], values[:first]
+        try:
+            changed = a != b
+            if a.dtype.kind == 'f':
+                changed &= ~(np.isnan(a) & np.isnan(b))
+        except TypeError:
+            changed = ~pd.Series(a).eq(pd.Series(b)).to_numpy()
+        positions = np.flatnonzero(changed)
+        if len(positions):
+            first = int(positions[0])
+    return first
+
+
+class IndicatorCache:
+    """
+    上一次指标计算的输入、结果和流式指标检查点
+
+    checkpoint 是提交了前 checkpoint_position 根K线的 IndicatorStream，
+    第一处变化不早于检查点时只需从检查点重放之后的K线。tail_window
+    控制检查点距离末尾的K线数：越大，能增量处理的历史修改越靠前，
+    但每次需要重放的K线也越多。
+    """
+
+    def __init__(self, tail_window: Optional[int] = None):
+        self.tail_window = max(1, tail_window if tail_window is not None else Config.INDICATOR_CACHE_TAIL)
+        self.hits = 0
+        self.tail_updates = 0
+        self.full_updates = 0
+        self.clear()
+
+    def clear(self) -> None:
+        self.digest: Optional[str] = None
+        self.arrays: Optional[Dict[str, np.ndarray]] = None
+        self.result: Optional[pd.DataFrame] = None
+        self.checkpoint: Optional[IndicatorStream] = None
+        self.checkpoint_position = 0
+        self.last_status: Optional[str] = None
+
+    def lookup(self, digest: str) -> Optional[pd.DataFrame]:
+        """键命中时返回上次的结果（与上次返回的是同一个对象，不要原地修改）"""
+        if self.result is not None and digest == self.digest:
+            self.hits += 1
+            self.last_status = HIT
+            return self.result
+        return None
+
+    def tail_start(self, arrays: Dict[str, np.ndarray]) -> Optional[int]:
+        """可以从检查点增量重算时返回第一处变化的行号，否则返回 None"""
+        if self.checkpoint is None or self.arrays is None:
+            return None
+        rows = len(next(iter(arrays.values()))) if arrays else 0
+        start = first_changed_row(self.arrays, arrays)
+        # 变化早于检查点，或新数据只是旧数据截短后的结果
+        if start < self.checkpoint_position or start >= rows:
+            return None
+        return start
+
+    def store(self, digest: str, arrays: Dict[str, np.ndarray], result: pd.DataFrame, status: str) -> None:
+        self.digest = digest
+        # 复制一份，调用方之后原地修改 DataFrame 不会影响与下次输入的比较
+        self.arrays = {col: values.copy() for col, values in arrays.items()}
+        self.result = result
+        self.last_status = status
+        if status == TAIL:
+            self.tail_updates += 1
+        else:
+            self.full_updates += 1
+
+    def stats(self) -> Dict:
+        return {
+            'hits': self.hits,
+            'tail_updates': self.tail_updates,
+            'full_updates': self.full_updates,
+            'last_status': self.last_status,
+            'rows': len(self.result) if self.result is not None else 0,
+            'checkpoint_position': self.checkpoint_position if self.checkpoint is not None else None
+        }
@@ -0,0 +1,392 @@
+"""
+NumPy 向量化技术指标内核
+
+一次计算 TechnicalAnalyzer 使用的全部指标，写入预分配的二维 float 数组
+（每个指标一列），结果与 ta 库逐列一致（未填充 NaN）：
+
+- SMA：累加和差分
+- EMA / RSI / MACD / ATR：scipy.signal.lfilter 一阶递推（等价于 ewm(adjust=False)）
+- 滚动最大/最小值：van Herk/Gil-Werman 分块前缀/后缀极值，与窗口长度无关
+- 布林带：错位切片两遍求方差（长窗口分块累加），窗口内价格不变时与 pandas 一样取 0
+
+缺失值的处理与 ta（pandas rolling / ewm(adjust=False)）一致：窗口内有 NaN 时
+SMA、滚动极值和标准差为 NaN；EMA 遇到中间的 NaN 时按 pandas 的权重规则继续递推。
+
+也可以只计算指定的列或分组，依赖的列自动加入（见 resolve_indicators）。
+"""
+
+import inspect
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+MA_PERIODS = (5, 10, 20, 50, 200)
+SIGNAL_COLUMNS = ['MA_Cross_Signal', 'RSI_Signal', 'MACD_Cross_Signal', 'BB_Signal', 'Stoch_Signal']
+# rolling_std 按错位切片两遍求方差的最大窗口，以及更长窗口按块累加时每块的K线数
+_STD_SLICE_WINDOW = 32
+_STD_BLOCK = 4096
+
+
+def indicator_groups(ma_periods: Iterable[int] = MA_PERIODS) -> Dict[str, List[str]]:
+    """按 TechnicalAnalyzer.calculate_xxx 方法分组的指标列"""
+    moving_averages = []
+    for period in ma_periods:
+        moving_averages += [f'SMA_{period}', f'EMA_{period}']
+    return {
+        'moving_averages': moving_averages + ['MA_Cross_Signal'],
+        'rsi': ['RSI', 'RSI_Signal'],
+        'macd': ['MACD', 'MACD_Signal', 'MACD_Diff', 'MACD_Cross_Signal'],
+        'bollinger_bands': ['BB_High', 'BB_Mid', 'BB_Low', 'BB_Width', 'BB_Pct', 'BB_Signal'],
+        'stochastic': ['Stoch_K', 'Stoch_D', 'Stoch_Signal'],
+        'atr': ['ATR', 'ATR_Pct']
+    }
+
+
+def indicator_columns(ma_periods: Iterable[int] = MA_PERIODS) -> List[str]:
+    """指标列名（顺序与 calculate_all_indicators 逐项计算时一致）"""
+    columns = []
+    for group in indicator_groups(ma_periods).values():
+        columns += group
+    return columns + ['Overall_Signal']
+
+
+def indicator_dependencies(ma_periods: Iterable[int] = MA_PERIODS) -> Dict[str, List[str]]:
+    """每个指标列直接依赖的其他指标列"""
+    ma_periods = list(ma_periods)
+    dependencies = {column: [] for column in indicator_columns(ma_periods)}
+    if 20 in ma_periods and 50 in ma_periods:
+        dependencies['MA_Cross_Signal'] = ['SMA_20', 'SMA_50']
+    dependencies.update({
+        'RSI_Signal': ['RSI'],
+        'MACD_Signal': ['MACD'],
+        'MACD_Diff': ['MACD', 'MACD_Signal'],
+        'MACD_Cross_Signal': ['MACD', 'MACD_Signal'],
+        'BB_High': ['BB_Mid'],
+        'BB_Low': ['BB_Mid'],
+        'BB_Width': ['BB_High', 'BB_Mid', 'BB_Low'],
+        'BB_Pct': ['BB_High', 'BB_Low'],
+        'BB_Signal': ['BB_High', 'BB_Low'],
+        'Stoch_D': ['Stoch_K'],
+        'Stoch_Signal': ['Stoch_K'],
+        'ATR_Pct': ['ATR'],
+        'Overall_Signal': list(SIGNAL_COLUMNS)
+    })
+    return dependencies
+
+
+def resolve_indicators(indicators: Optional[Iterable[str]] = None,
+                       ma_periods: Iterable[int] = MA_PERIODS) -> List[str]:
+    """
+    把需要的指标展开为要计算的全部列（含依赖），按 indicator_columns 的顺序返回
+
+    indicators 可以是列名（如 'RSI'、'MA_Cross_Signal'）或分组名（见 indicator_groups，
+    如 'macd'、'bollinger_bands'），为 None 时返回全部列。未知名称抛出 ValueError。
+    """
+    columns = indicator_columns(ma_periods)
+    if indicators is None:
+        return columns
+    if isinstance(indicators, str):
+        indicators = [indicators]
+
+    groups = indicator_groups(ma_periods)
+    dependencies = indicator_dependencies(ma_periods)
+    needed = set()
+    pending = []
+    for name in indicators:
+        if name in dependencies:
+            pending.append(name)
+        elif name in groups:
+            pending += groups[name]
+        else:
+            raise ValueError(f"未知的技术指标: {name}")
+    while pending:
+        name = pending.pop()
+        if name not in needed:
+            needed.add(name)
+            pending += dependencies[name]
+    return [column for column in columns if column in needed]
+
+
+def _missing_windows(missing: np.ndarray, window: int) -> np.ndarray:
+    """每个完整窗口（从第 window 个起）内是否有缺失值"""
+    counts = np.concatenate(([0], np.cumsum(missing)))
+    return counts[window:] != counts[:-window]
+
+
+def rolling_sum(x: np.ndarray, window: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """滚动求和，前 window-1 个为 NaN；窗口内有 NaN 时为 NaN（同 rolling(window).sum()）"""
+    if out is None:
+        out = np.empty(len(x))
+    out[:window - 1] = np.nan
+    if len(x) >= window:
+        missing = np.isnan(x)
+        has_missing = missing.any()
+        # 减去首个有效值后再累加，减小大数相减的舍入误差；缺失值按 0 累加，最后标记为 NaN
+        offset = x[np.argmin(missing)] if has_missing else x[0]
+        centred = x - offset
+        if has_missing:
+            centred[missing] = 0.0
+        csum = np.concatenate(([0.0], np.cumsum(centred)))
+        out[window - 1:] = csum[window:] - csum[:-window] + offset * window
+        if has_missing:
+            out[window - 1:][_missing_windows(missing, window)] = np.nan
+    return out
+
+
+def sma(x: np.ndarray, window: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    out = rolling_sum(x, window, out)
+    out /= window
+    return out
+
+
+def ewma(x: np.ndarray, alpha: float, min_periods: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    等价于 pd.Series(x).ewm(alpha=alpha, adjust=False, min_periods=min_periods).mean()
+
+    开头的 NaN 被跳过（第一条有效数据作为初始值）。中间有 NaN 时 pandas 会按经过的
+    K线数衰减旧值的权重，不是固定系数的递推，这种少见的情况直接交给 pandas 计算。
+    """
+    from scipy.signal import lfilter
+
+    if out is None:
+        out = np.empty(len(x))
+    out[:] = np.nan
+    missing = np.isnan(x)
+    start = np.argmin(missing)
+    if missing[start]:
+        return out
+    values = x[start:]
+    if missing[start:].any():
+        out[:] = pd.Series(x).ewm(alpha=alpha, adjust=False, min_periods=min_periods).mean().to_numpy()
+        return out
+    filtered, _ = lfilter([alpha], [1.0, alpha - 1.0], values, zi=[(1.0 - alpha) * values[0]])
+    out[start:] = filtered
+    out[:start + min_periods - 1] = np.nan
+    return out
+
+
+def ema(x: np.ndarray, window: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    return ewma(x, 2.0 / (window + 1), window, out)
+
+
+def rolling_extreme(x: np.ndarray, window: int, is_max: bool = True) -> np.ndarray:
+    """
+    滚动最大/最小值（van Herk/Gil-Werman）
+
+    把序列按 window 分块，块内前缀极值和后缀极值各算一次，每个窗口的极值是
+    起点所在块的后缀极值与终点所在块的前缀极值中的较大（小）者，
+    每个元素只需常数次比较。
+    """
+    n = len(x)
+    out = np.full(n, np.nan)
+    if n < window:
+        return out
+
+    ufunc = np.maximum if is_max else np.minimum
+    fill = -np.inf if is_max else np.inf
+    blocks = -(-n // window)
+    padded = np.full(blocks * window, fill)
+    padded[:n] = x
+    padded = padded.reshape(blocks, window)
+
+    prefix = ufunc.accumulate(padded, axis=1).ravel()
+    suffix = ufunc.accumulate(padded[:, ::-1], axis=1)[:, ::-1].ravel()
+    out[window - 1:] = ufunc(suffix[:n - window + 1], prefix[window - 1:n])
+    return out
+
+
+def rolling_std(x: np.ndarray, window: int, flat: Optional[np.ndarray] = None,
+                out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    滚动总体标准差（ddof=0），前 window-1 个为 NaN，直接写入 out
+
+    短窗口（布林带常用的 20）：先求滚动均值，再把窗口内每个错位切片与均值之差的平方
+    累加到 out（两遍法，精确）。长窗口：按块用累加和与平方累加和相减，每块先减去本块
+    均值以减小相减误差。临时数组只有一列或一块长，不会生成 n × window 的窗口数组。
+    flat 标记窗口内数据全部相同的位置，与 pandas 一样取 0；含 NaN 的窗口为 NaN。
+    """
+    n = len(x)
+    if out is None:
+        out = np.empty(n)
+    out[:window - 1] = np.nan
+    missing = np.isnan(x)
+    has_missing = n >= window and missing.any()
+    if has_missing:
+        # 缺失值用有效数据的均值占位，不影响分块累加的精度，对应窗口最后标记为 NaN
+        x = np.where(missing, x[~missing].mean() if not missing.all() else 0.0, x)
+    if n >= window and window <= _STD_SLICE_WINDOW:
+        mean = sma(x, window)[window - 1:]
+        total = out[window - 1:]
+        total[:] = 0.0
+        diff = np.empty_like(mean)
+        for shift in range(window):
+            np.subtract(x[shift:n - window + 1 + shift], mean, out=diff)
+            diff *= diff
+            total += diff
+        total /= window
+        np.sqrt(total, out=total)
+    elif n >= window:
+        block = max(_STD_BLOCK, window)
+        for start in range(window - 1, n, block):
+            stop = min(start + block, n)
+            centred = x[start - window + 1:stop] - x[start - window + 1:stop].mean()
+            csum = np.zeros(len(centred) + 1)
+            np.cumsum(centred, out=csum[1:])
+            csum2 = np.zeros(len(centred) + 1)
+            np.cumsum(np.square(centred, out=centred), out=csum2[1:])
+            window_sum = csum[window:] - csum[:-window]
+            variance = csum2[window:] - csum2[:-window]
+            variance -= window_sum * window_sum / window
+            variance /= window
+            np.sqrt(np.maximum(variance, 0.0, out=variance), out=out[start:stop])
+    if has_missing:
+        out[window - 1:][_missing_windows(missing, window)] = np.nan
+    if flat is not None:
+        out[flat] = 0.0
+    return out
+
+
+def wilder_atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int) -> np.ndarray:
+    """ATR（与 ta 一致：前 window-1 个为 0，第 window 个取真实波幅均值，之后 Wilder 平滑）"""
+    from scipy.signal import lfilter
+
+    n = len(close)
+    prev_close = np.empty(n)
+    prev_close[0] = np.nan
+    prev_close[1:] = close[:-1]
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+    atr = np.zeros(n)
+    if n < window:
+        return atr
+    first = true_range[:window].mean()
+    alpha = 1.0 / window
+    tail, _ = lfilter([alpha], [1.0, alpha - 1.0], true_range[window:], zi=[(1.0 - alpha) * first])
+    atr[window - 1] = first
+    atr[window:] = tail
+    return atr
+
+
+def compute_indicator_array(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                            ma_periods: Iterable[int] = MA_PERIODS, rsi_period: int = 14,
+                            macd_fast: int = 12, macd_slow: int = 26, macd_signal: int = 9,
+                            bb_period: int = 20, bb_dev: float = 2, stoch_period: int = 14,
+                            stoch_smooth: int = 3, atr_period: int = 14,
+                            indicators: Optional[Iterable[str]] = None) -> Tuple[List[str], np.ndarray]:
+    """
+    计算指标，返回 (列名, n × 列数 数组)
+
+    indicators 为需要的列名或分组名（见 resolve_indicators），只计算这些列及其依赖；
+    为 None 时计算全部指标。
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    close = np.asarray(close, dtype=float)
+    ma_periods = list(ma_periods)
+    columns = resolve_indicators(indicators, ma_periods)
+    col = {name: i for i, name in enumerate(columns)}
+    n = len(close)
+    # 列优先存储：每个指标写入连续内存，转成 DataFrame 时无需转置复制
+    out = np.empty((n, len(columns)), order='F')
+
+    def put(name: str, values) -> None:
+        if name in col:
+            out[:, col[name]] = values
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # 移动平均
+        for period in ma_periods:
+            if f'SMA_{period}' in col:
+                sma(close, period, out[:, col[f'SMA_{period}']])
+            if f'EMA_{period}' in col:
+                ema(close, period, out[:, col[f'EMA_{period}']])
+        if 'MA_Cross_Signal' in col:
+            ma_cross = out[:, col['MA_Cross_Signal']]
+            ma_cross[:] = 0
+            if 20 in ma_periods and 50 in ma_periods:
+                sma20, sma50 = out[:, col['SMA_20']], out[:, col['SMA_50']]
+                ma_cross[sma20 > sma50] = 1
+                ma_cross[sma20 < sma50] = -1
+
+        # RSI（ta 中第一根K线的涨跌按 0 计入）
+        if 'RSI' in col:
+            diff = np.zeros(n)
+            diff[1:] = np.diff(close)
+            up = ewma(np.where(diff > 0, diff, 0.0), 1.0 / rsi_period, rsi_period)
+            down = ewma(np.where(diff < 0, -diff, 0.0), 1.0 / rsi_period, rsi_period)
+            rsi = np.where(down == 0, 100.0, 100 - 100 / (1 + up / down))
+            put('RSI', rsi)
+            put('RSI_Signal', np.where(rsi > 70, -1, np.where(rsi < 30, 1, 0)))
+
+        # MACD
+        if 'MACD' in col:
+            macd = ema(close, macd_fast) - ema(close, macd_slow)
+            put('MACD', macd)
+            if 'MACD_Signal' in col:
+                signal = ema(macd, macd_signal)
+                put('MACD_Signal', signal)
+                put('MACD_Diff', macd - signal)
+                put('MACD_Cross_Signal', np.where(macd > signal, 1, np.where(macd < signal, -1, 0)))
+
+        # 布林带
+        if 'BB_Mid' in col:
+            mid = sma(close, bb_period)
+            flat = rolling_extreme(close, bb_period, True) == rolling_extreme(close, bb_period, False)
+            mid[flat] = close[flat]
+            put('BB_Mid', mid)
+            if 'BB_High' in col or 'BB_Low' in col:
+                std = rolling_std(close, bb_period, flat)
+                upper = mid + bb_dev * std
+                lower = mid - bb_dev * std
+                put('BB_High', upper)
+                put('BB_Low', lower)
+                put('BB_Width', (upper - lower) / mid * 100)
+                put('BB_Pct', np.where(upper != lower, (close - lower) / (upper - lower), np.nan))
+                put('BB_Signal', np.where(close < lower, 1, np.where(close > upper, -1, 0)))
+
+        # 随机指标
+        if 'Stoch_K' in col:
+            lowest = rolling_extreme(low, stoch_period, is_max=False)
+            highest = rolling_extreme(high, stoch_period, is_max=True)
+            stoch_k = 100 * (close - lowest) / (highest - lowest)
+            put('Stoch_K', stoch_k)
+            if 'Stoch_D' in col:
+                stoch_d = np.full(n, np.nan)
+                if n >= stoch_smooth:
+                    stoch_d[stoch_smooth - 1:] = np.lib.stride_tricks.sliding_window_view(
+                        stoch_k, stoch_smooth).mean(axis=1)
+                put('Stoch_D', stoch_d)
+            put('Stoch_Signal', np.where(stoch_k < 20, 1, np.where(stoch_k > 80, -1, 0)))
+
+        # ATR
+        if 'ATR' in col:
+            atr = wilder_atr(high, low, close, atr_period)
+            put('ATR', atr)
+            put('ATR_Pct', atr / close * 100)
+
+    if 'Overall_Signal' in col:
+        signal_index = [col[name] for name in SIGNAL_COLUMNS]
+        out[:, col['Overall_Signal']] = out[:, signal_index].sum(axis=1) * 0.2
+    return columns, out
+
+
+def default_params() -> Dict:
+    """compute_indicator_array 的默认指标参数"""
+    parameters = inspect.signature(compute_indicator_array).parameters.values()
+    return {p.name: p.default for p in parameters
+            if p.default is not inspect.Parameter.empty and p.name != 'indicators'}
+
+
+def indicator_frame(df: pd.DataFrame, **params) -> pd.DataFrame:
+    """
+    按 df 的 High/Low/Close 计算指标，返回与 df 同索引的 DataFrame（信号列为整数）
+
+    params 为 compute_indicator_array 的参数，可以用 indicators 只计算部分指标。
+    """
+    columns, values = compute_indicator_array(df['High'].to_numpy(), df['Low'].to_numpy(),
+                                              df['Close'].to_numpy(), **params)
+    frame = pd.DataFrame(values, index=df.index, columns=columns)
+    signals = [name for name in SIGNAL_COLUMNS if name in frame.columns]
+    frame[signals] = frame[signals].astype(np.int64)
+    return frame
@@ -0,0 +1,270 @@
+import math
+from collections import deque
+from typing import Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+
+NAN = float('nan')
+
+
+def _divide(a: float, b: float) -> float:
+    """与 pandas 一致的除法：0/0 为 NaN，非零/0 为 ±inf"""
+    if b == 0:
+        if a == 0 or math.isnan(a):
+            return NAN
+        return math.copysign(math.inf, a)
+    return a / b
+
+
+class _EMA:
+    """
+    指数移动平均（等价于 ewm(alpha, adjust=False, min_periods)）
+
+    开头的 NaN 输入被跳过，第一条有效数据作为初始值，有效数据不足
+    min_periods 条时输出 NaN。
+    """
+
+    def __init__(self, alpha: float, min_periods: int):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = NAN
+        self.count = 0
+
+    def step(self, x: float, commit: bool = True) -> float:
+        if math.isnan(x):
+            value, count = self.value, self.count
+        elif self.count == 0:
+            value, count = x, 1
+        else:
+            value, count = self.value + self.alpha * (x - self.value), self.count + 1
+        if commit:
+            self.value, self.count = value, count
+        return value if count >= self.min_periods else NAN
+
+
+class _RollingMoments:
+    """
+    滑动窗口均值和总体标准差（ddof=0）
+
+    用 Welford 算法增删窗口两端的数据，每隔 resync 次更新按窗口重新求和，
+    避免长时间运行累积舍入误差。与 pandas 一样，窗口内全部数据相同时
+    直接返回该值和 0，不受舍入误差影响。
+    """
+
+    def __init__(self, window: int, resync: int = 1000):
+        self.window = window
+        self.resync = resync
+        self.values = deque()
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._updates = 0
+        self._same_run = 0
+
+    def _moments(self, x: float) -> Tuple[int, float, float]:
+        n, mean, m2 = len(self.values), self.mean, self.m2
+        if n == self.window:
+            y = self.values[0]
+            if n == 1:
+                n, mean, m2 = 0, 0.0, 0.0
+            else:
+                n -= 1
+                delta = y - mean
+                mean -= delta / n
+                m2 -= delta * (y - mean)
+        n += 1
+        delta = x - mean
+        mean += delta / n
+        m2 += delta * (x - mean)
+        return n, mean, max(m2, 0.0)
+
+    def step(self, x: float, commit: bool = True) -> Tuple[float, float]:
+        """返回 (均值, 标准差)，窗口未满时为 NaN"""
+        n, mean, m2 = self._moments(x)
+        same_run = self._same_run + 1 if self.values and self.values[-1] == x else 1
+        if commit:
+            self._same_run = same_run
+            if len(self.values) == self.window:
+                self.values.popleft()
+            self.values.append(x)
+            self._updates += 1
+            if self._updates % self.resync == 0:
+                mean = math.fsum(self.values) / n
+                m2 = math.fsum((v - mean) ** 2 for v in self.values)
+            self.mean, self.m2 = mean, m2
+        if n < self.window:
+            return NAN, NAN
+        if same_run >= self.window:
+            return x, 0.0
+        return mean, math.sqrt(m2 / n)
+
+
+class _RollingExtreme:
+    """滑动窗口最大/最小值（单调队列，均摊 O(1)）"""
+
+    def __init__(self, window: int, is_max: bool):
+        self.window = window
+        self.is_max = is_max
+        self.queue = deque()  # (序号, 值)，值单调
+        self.index = -1
+
+    def _better(self, a: float, b: float) -> bool:
+        return a >= b if self.is_max else a <= b
+
+    def step(self, x: float, commit: bool = True) -> float:
+        index = self.index + 1
+        if commit:
+            while self.queue and self._better(x, self.queue[-1][1]):
+                self.queue.pop()
+            self.queue.append((index, x))
+            if self.queue[0][0] <= index - self.window:
+                self.queue.popleft()
+            self.index = index
+            extreme = self.queue[0][1]
+        else:
+            # 新K线进入窗口时最多只有队首一个元素移出窗口
+            extreme = x
+            for position in range(min(2, len(self.queue))):
+                item_index, value = self.queue[position]
+                if item_index > index - self.window:
+                    extreme = value if self._better(value, x) else x
+                    break
+        return extreme if index + 1 >= self.window else NAN
+
+
+class IndicatorStream:
+    """
+    流式技术指标引擎
+
+    为 TechnicalAnalyzer 使用的每个指标保存滚动状态，每根新K线 O(1) 更新，
+    输出与 ta 库逐列一致（未填充 NaN）：
+    SMA/EMA、RSI、MACD、布林带、随机指标、ATR 以及各交易信号。
+
+    update() 提交一根已完成的K线；preview() 计算尚未完成的K线（如按实时报价
+    更新的今天K线）的指标，不改变状态，可以随每个报价反复调用。
+    """
+
+    def __init__(self, ma_periods: Iterable[int] = (5, 10, 20, 50, 200), rsi_period: int = 14,
+                 macd_fast: int = 12, macd_slow: int = 26, macd_signal: int = 9,
+                 bb_period: int = 20, bb_dev: float = 2, stoch_period: int = 14, stoch_smooth: int = 3,
+                 atr_period: int = 14):
+        self.ma_periods = list(ma_periods)
+        self.bb_dev = bb_dev
+        self.stoch_smooth = stoch_smooth
+        self.atr_period = atr_period
+
+        self._sma = {period: _RollingMoments(period) for period in self.ma_periods}
+        self._ema = {period: _EMA(2 / (period + 1), period) for period in self.ma_periods}
+        self._rsi_up = _EMA(1 / rsi_period, rsi_period)
+        self._rsi_down = _EMA(1 / rsi_period, rsi_period)
+        self._macd_fast = _EMA(2 / (macd_fast + 1), macd_fast)
+        self._macd_slow = _EMA(2 / (macd_slow + 1), macd_slow)
+        self._macd_signal = _EMA(2 / (macd_signal + 1), macd_signal)
+        self._bb = _RollingMoments(bb_period)
+        self._stoch_low = _RollingExtreme(stoch_period, is_max=False)
+        self._stoch_high = _RollingExtreme(stoch_period, is_max=True)
+        self._stoch_k = deque(maxlen=stoch_smooth)
+
+        self._prev_close: Optional[float] = None
+        self._atr = 0.0
+        self._tr_sum = 0.0
+        self.bars = 0
+
+    def update(self, high: float, low: float, close: float) -> Dict[str, float]:
+        """提交一根已完成的K线，返回该K线的指标"""
+        return self._step(float(high), float(low), float(close), commit=True)
+
+    def preview(self, high: float, low: float, close: float) -> Dict[str, float]:
+        """计算一根未完成K线的指标，不改变状态"""
+        return self._step(float(high), float(low), float(close), commit=False)
+
+    def warm_up(self, df: pd.DataFrame) -> pd.DataFrame:
+        """依次提交 df 中的全部K线，返回逐行指标"""
+        rows = [self.update(high, low, close)
+                for high, low, close in zip(df['High'].to_numpy(), df['Low'].to_numpy(), df['Close'].to_numpy())]
+        return pd.DataFrame(rows, index=df.index)
+
+    def _step(self, high: float, low: float, close: float, commit: bool) -> Dict[str, float]:
+        row = {}
+
+        # 移动平均
+        for period in self.ma_periods:
+            row[f'SMA_{period}'] = self._sma[period].step(close, commit)[0]
+            row[f'EMA_{period}'] = self._ema[period].step(close, commit)
+        row['MA_Cross_Signal'] = 0
+        if 'SMA_20' in row and 'SMA_50' in row:
+            if row['SMA_20'] > row['SMA_50']:
+                row['MA_Cross_Signal'] = 1
+            elif row['SMA_20'] < row['SMA_50']:
+                row['MA_Cross_Signal'] = -1
+
+        # RSI（ta 中第一根K线的涨跌按 0 计入）
+        diff = close - self._prev_close if self._prev_close is not None else 0.0
+        up = self._rsi_up.step(diff if diff > 0 else 0.0, commit)
+        down = self._rsi_down.step(-diff if diff < 0 else 0.0, commit)
+        row['RSI'] = 100.0 if down == 0 else 100 - 100 / (1 + _divide(up, down))
+        row['RSI_Signal'] = -1 if row['RSI'] > 70 else 1 if row['RSI'] < 30 else 0
+
+        # MACD
+        macd = self._macd_fast.step(close, commit) - self._macd_slow.step(close, commit)
+        signal = self._macd_signal.step(macd, commit)
+        row['MACD'] = macd
+        row['MACD_Signal'] = signal
+        row['MACD_Diff'] = macd - signal
+        row['MACD_Cross_Signal'] = 1 if macd > signal else -1 if macd < signal else 0
+
+        # 布林带
+        mid, std = self._bb.step(close, commit)
+        upper = mid + self.bb_dev * std
+        lower = mid - self.bb_dev * std
+        row['BB_High'] = upper
+        row['BB_Mid'] = mid
+        row['BB_Low'] = lower
+        row['BB_Width'] = _divide(upper - lower, mid) * 100
+        row['BB_Pct'] = NAN if upper == lower else _divide(close - lower, upper - lower)
+        row['BB_Signal'] = 1 if close < lower else -1 if close > upper else 0
+
+        # 随机指标
+        lowest = self._stoch_low.step(low, commit)
+        highest = self._stoch_high.step(high, commit)
+        stoch_k = _divide(100 * (close - lowest), highest - lowest)
+        recent = list(self._stoch_k)[-(self.stoch_smooth - 1):] if self.stoch_smooth > 1 else []
+        recent.append(stoch_k)
+        if len(recent) == self.stoch_smooth and not any(math.isnan(k) for k in recent):
+            stoch_d = math.fsum(recent) / self.stoch_smooth
+        else:
+            stoch_d = NAN
+        row['Stoch_K'] = stoch_k
+        row['Stoch_D'] = stoch_d
+        row['Stoch_Signal'] = 1 if stoch_k < 20 else -1 if stoch_k > 80 else 0
+
+        # ATR（与 ta 一致：前 period-1 根为 0，第 period 根取真实波幅均值，之后按 Wilder 平滑）
+        if self._prev_close is None:
+            true_range = high - low
+        else:
+            true_range = max(high - low, abs(high - self._prev_close), abs(low - self._prev_close))
+        period = self.atr_period
+        index = self.bars
+        tr_sum = self._tr_sum
+        if index < period:
+            tr_sum += true_range
+            atr = tr_sum / period if index == period - 1 else 0.0
+        else:
+            atr = (self._atr * (period - 1) + true_range) / period
+        row['ATR'] = atr
+        row['ATR_Pct'] = _divide(atr, close) * 100
+
+        row['Overall_Signal'] = (
+            row['MA_Cross_Signal'] * 0.2 +
+            row['RSI_Signal'] * 0.2 +
+            row['MACD_Cross_Signal'] * 0.2 +
+            row['BB_Signal'] * 0.2 +
+            row['Stoch_Signal'] * 0.2
+        )
+
+        if commit:
+            self._stoch_k.append(stoch_k)
+            self._prev_close = close
+            self._tr_sum = tr_sum
+            self._atr = atr
+            self.bars += 1
+        return row
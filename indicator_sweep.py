@@ -0,0 +1,226 @@
+"""
+技术指标参数批量扫描
+
+一次计算同一类指标在多组参数下的结果，每类指标返回 n × 参数个数 的二维数组
+（列顺序与传入的参数顺序一致，未填充 NaN，与 indicator_kernels 逐个参数计算的
+结果一致），用于调参时替代逐个参数调用 calculate_xxx：
+
+- SMA / 布林带：所有窗口共用一次累加和（布林带另加平方累加和），每个窗口只做一次切片相减
+- 随机指标：所有窗口共用一张稀疏表（2 的幂长度区间的极值），任意窗口的滚动极值
+  由两段重叠区间合并得到
+- 布林带的价格不变判断：连续相同价格的长度只算一次，与所有窗口长度一次比较
+- EMA / RSI / MACD：递推无法跨周期共享，同一平滑系数的所有列（RSI 的涨/跌、
+  不同 MACD 组合的信号线）合并为一次 lfilter 调用，不同 MACD 组合共用相同周期的 EMA
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from indicator_kernels import ema
+
+
+def _periods(values: Iterable[int]) -> List[int]:
+    periods = [int(value) for value in np.atleast_1d(values)]
+    if any(period < 1 for period in periods):
+        raise ValueError(f"指标周期必须为正整数: {periods}")
+    return periods
+
+
+def _ewma_columns(x: np.ndarray, alpha: float, min_periods: int, start: int = 0) -> np.ndarray:
+    """
+    对二维数组的每一列做 ewm(alpha, adjust=False, min_periods) 平滑
+
+    各列从 start 行开始有效（之前为 NaN），以第 start 行为初始值。
+    """
+    from scipy.signal import lfilter
+
+    out = np.full(x.shape, np.nan)
+    if start >= len(x):
+        return out
+    values = x[start:]
+    filtered, _ = lfilter([alpha], [1.0, alpha - 1.0], values, axis=0, zi=(1.0 - alpha) * values[:1])
+    out[start:] = filtered
+    out[:start + min_periods - 1] = np.nan
+    return out
+
+
+class SparseTable:
+    """
+    滚动最大/最小值的稀疏表
+
+    第 j 层保存长度为 2^j 的区间极值，建表 O(n log W)；之后任意窗口 w 的滚动极值
+    只需把两段长度为 2^floor(log2 w)、覆盖整个窗口的区间取极值，每个窗口 O(n)。
+    """
+
+    def __init__(self, x: np.ndarray, max_window: int, is_max: bool = True):
+        self.ufunc = np.maximum if is_max else np.minimum
+        self.n = len(x)
+        self.levels = [np.asarray(x, dtype=float)]
+        span = 1
+        while span * 2 <= max_window and span < self.n:
+            previous = self.levels[-1]
+            self.levels.append(self.ufunc(previous[:-span], previous[span:]))
+            span *= 2
+
+    def rolling(self, window: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """窗口 window 的滚动极值，前 window-1 个为 NaN（可以直接写入 out）"""
+        if out is None:
+            out = np.empty(self.n)
+        out[:window - 1] = np.nan
+        if self.n < window:
+            return out
+        level = window.bit_length() - 1
+        span = 1 << level
+        table = self.levels[level]
+        self.ufunc(table[:self.n - window + 1], table[window - span:self.n - span + 1], out=out[window - 1:])
+        return out
+
+
+def sma_sweep(x: np.ndarray, windows: Iterable[int]) -> np.ndarray:
+    """多个窗口的 SMA（共用一次累加和）"""
+    x = np.asarray(x, dtype=float)
+    windows = _periods(windows)
+    n = len(x)
+    out = np.full((n, len(windows)), np.nan, order='F')
+    if n == 0:
+        return out
+    # 减去首个值后再累加，减小大数相减的舍入误差
+    offset = x[0]
+    csum = np.concatenate(([0.0], np.cumsum(x - offset)))
+    for j, window in enumerate(windows):
+        if n >= window:
+            out[window - 1:, j] = (csum[window:] - csum[:-window]) / window + offset
+    return out
+
+
+def ema_sweep(x: np.ndarray, windows: Iterable[int]) -> np.ndarray:
+    """多个周期的 EMA（每个不同周期一次 lfilter）"""
+    x = np.asarray(x, dtype=float)
+    windows = _periods(windows)
+    out = np.empty((len(x), len(windows)), order='F')
+    for j, window in enumerate(windows):
+        ema(x, window, out[:, j])
+    return out
+
+
+def rsi_sweep(close: np.ndarray, periods: Iterable[int]) -> np.ndarray:
+    """多个周期的 RSI（涨跌幅只算一次，每个周期的涨/跌平滑合并为一次 lfilter）"""
+    close = np.asarray(close, dtype=float)
+    periods = _periods(periods)
+    n = len(close)
+    # ta 中第一根K线的涨跌按 0 计入
+    diff = np.zeros(n)
+    diff[1:] = np.diff(close)
+    moves = np.column_stack((np.where(diff > 0, diff, 0.0), np.where(diff < 0, -diff, 0.0)))
+
+    out = np.empty((n, len(periods)), order='F')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for j, period in enumerate(periods):
+            smoothed = _ewma_columns(moves, 1.0 / period, period)
+            up, down = smoothed[:, 0], smoothed[:, 1]
+            out[:, j] = np.where(down == 0, 100.0, 100 - 100 / (1 + up / down))
+    return out
+
+
+def macd_sweep(close: np.ndarray, params: Iterable[Tuple[int, int, int]]) -> Dict[str, np.ndarray]:
+    """
+    多组 (fast, slow, signal) 的 MACD
+
+    相同周期的 EMA 只算一次；信号线按 (signal, 有效起点) 分组，每组一次 lfilter。
+    返回 MACD、MACD_Signal、MACD_Diff 三个二维数组。
+    """
+    close = np.asarray(close, dtype=float)
+    params = [tuple(_periods(p)) for p in params]
+    if any(len(p) != 3 for p in params):
+        raise ValueError("MACD 参数应为 (fast, slow, signal)")
+    n = len(close)
+
+    emas = {}
+    for fast, slow, _ in params:
+        for period in (fast, slow):
+            if period not in emas:
+                emas[period] = ema(close, period)
+
+    macd = np.empty((n, len(params)), order='F')
+    groups: Dict[Tuple[int, int], List[int]] = {}
+    for j, (fast, slow, signal) in enumerate(params):
+        macd[:, j] = emas[fast] - emas[slow]
+        groups.setdefault((signal, max(fast, slow) - 1), []).append(j)
+
+    signal_line = np.empty_like(macd)
+    for (signal, start), columns in groups.items():
+        signal_line[:, columns] = _ewma_columns(macd[:, columns], 2.0 / (signal + 1), signal, start)
+    return {'MACD': macd, 'MACD_Signal': signal_line, 'MACD_Diff': macd - signal_line}
+
+
+def equal_run_length(x: np.ndarray) -> np.ndarray:
+    """每个位置结尾、数值连续相同的K线数（窗口 w 内价格全部相同等价于该值 >= w）"""
+    n = len(x)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    index = np.arange(n)
+    run_start = np.concatenate(([True], x[1:] != x[:-1]))
+    return index - np.maximum.accumulate(np.where(run_start, index, 0)) + 1
+
+
+def bollinger_sweep(close: np.ndarray, windows: Iterable[int], dev: float = 2) -> Dict[str, np.ndarray]:
+    """
+    多个窗口的布林带（均值和方差共用累加和与平方累加和）
+
+    窗口内价格全部相同时与 pandas 一样中轨取该价格、标准差取 0。
+    返回 BB_Mid、BB_Std、BB_High、BB_Low、BB_Width、BB_Pct。
+    """
+    close = np.asarray(close, dtype=float)
+    windows = _periods(windows)
+    n = len(close)
+    mid = sma_sweep(close, windows)
+    std = np.full_like(mid, np.nan)
+    if n:
+        centred = close - close.mean()
+        csum = np.concatenate(([0.0], np.cumsum(centred)))
+        csum2 = np.concatenate(([0.0], np.cumsum(centred * centred)))
+        for j, window in enumerate(windows):
+            if n >= window:
+                total = csum[window:] - csum[:-window]
+                variance = (csum2[window:] - csum2[:-window] - total * total / window) / window
+                np.sqrt(np.maximum(variance, 0.0), out=std[window - 1:, j])
+        flat = equal_run_length(close)[:, None] >= np.asarray(windows)[None, :]
+        std[flat] = 0.0
+        mid = np.where(flat, close[:, None], mid)
+
+    upper = mid + dev * std
+    lower = mid - dev * std
+    with np.errstate(divide='ignore', invalid='ignore'):
+        width = (upper - lower) / mid * 100
+        pct = np.where(upper != lower, (close[:, None] - lower) / (upper - lower), np.nan)
+    return {'BB_Mid': mid, 'BB_Std': std, 'BB_High': upper, 'BB_Low': lower, 'BB_Width': width, 'BB_Pct': pct}
+
+
+def stochastic_sweep(high: np.ndarray, low: np.ndarray, close: np.ndarray, periods: Iterable[int],
+                     smooth: int = 3) -> Dict[str, np.ndarray]:
+    """多个周期的随机指标（最高/最低价共用稀疏表），返回 Stoch_K、Stoch_D"""
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    close = np.asarray(close, dtype=float)
+    periods = _periods(periods)
+    n = len(close)
+    highest = SparseTable(high, max(periods, default=1), is_max=True)
+    lowest = SparseTable(low, max(periods, default=1), is_max=False)
+
+    floor = np.empty((n, len(periods)), order='F')
+    ceiling = np.empty((n, len(periods)), order='F')
+    for j, period in enumerate(periods):
+        lowest.rolling(period, floor[:, j])
+        highest.rolling(period, ceiling[:, j])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stoch_k = 100 * (close[:, None] - floor) / (ceiling - floor)
+    stoch_d = np.full_like(stoch_k, np.nan)
+    if n >= smooth:
+        # 平滑窗口很短，直接累加错位的切片
+        window_sum = stoch_d[smooth - 1:]
+        window_sum[:] = stoch_k[smooth - 1:]
+        for shift in range(1, smooth):
+            window_sum += stoch_k[smooth - 1 - shift:n - shift]
+        window_sum /= smooth
+    return {'Stoch_K': stoch_k, 'Stoch_D': stoch_d}
@@ -0,0 +1,114 @@
+import os
+from typing import Dict, Optional
+
+import pandas as pd
+
+from config import Config
+from price_store import PriceStore, create_price_store
+
+# 各间隔的分钟数
+INTERVAL_MINUTES = {
+    '1m': 1,
+    '2m': 2,
+    '5m': 5,
+    '15m': 15,
+    '30m': 30,
+    '1h': 60,
+    '90m': 90,
+    '4h': 240,
+    '1d': 1440
+}
+
+# yfinance 可直接下载的间隔及其最大回溯天数
+DOWNLOAD_LIMIT_DAYS = {
+    '1m': 7,
+    '2m': 60,
+    '5m': 60,
+    '15m': 60,
+    '30m': 60,
+    '1h': 730,
+    '90m': 60,
+    '1d': 36500
+}
+
+BAR_COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def normalize_interval(interval: str) -> str:
+    """统一间隔写法（60m -> 1h, 1H -> 1h 等），不支持的间隔抛出 ValueError"""
+    interval = interval.strip().lower()
+    aliases = {'60m': '1h', '240m': '4h', '24h': '1d', '1440m': '1d'}
+    interval = aliases.get(interval, interval)
+    if interval not in INTERVAL_MINUTES:
+        raise ValueError(f"不支持的K线间隔: {interval}")
+    return interval
+
+
+def interval_delta(interval: str) -> pd.Timedelta:
+    return pd.Timedelta(minutes=INTERVAL_MINUTES[interval])
+
+
+def resample_bars(bars: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """把细粒度K线重采样为更粗的间隔（左闭区间，以区间起点为时间戳）"""
+    if bars.empty:
+        return bars
+    rule = f"{INTERVAL_MINUTES[interval]}min"
+    resampled = bars.set_index('Date').resample(rule, label='left', closed='left').agg({
+        'Open': 'first',
+        'High': 'max',
+        'Low': 'min',
+        'Close': 'last',
+        'Volume': 'sum'
+    })
+    return resampled.dropna(subset=['Open']).reset_index()
+
+
+class IntradayBarStore:
+    """
+    日内K线存储
+
+    每个间隔一个独立分区（data_cache/<名称>/<间隔>），底层复用价格存储后端
+    （默认内存映射列式存储），只追加比已存储数据更新的K线。时间统一为不带
+    时区的 UTC 时间。
+    """
+
+    def __init__(self, cache_dir: str, name: str, backend: Optional[str] = None):
+        self.root = os.path.join(cache_dir, name)
+        self.backend = backend if backend is not None else Config.PRICE_STORE
+        self._partitions: Dict[str, PriceStore] = {}
+
+    def partition(self, interval: str) -> PriceStore:
+        interval = normalize_interval(interval)
+        store = self._partitions.get(interval)
+        if store is None:
+            store = create_price_store(self.backend, self.root, interval)
+            self._partitions[interval] = store
+        return store
+
+    def load(self, interval: str) -> pd.DataFrame:
+        store = self.partition(interval)
+        if not store.exists():
+            return pd.DataFrame(columns=BAR_COLUMNS)
+        bars = store.load()
+        if not bars['Date'].is_monotonic_increasing:
+            bars = bars.sort_values('Date').reset_index(drop=True)
+        return bars
+
+    def last_timestamp(self, interval: str) -> Optional[pd.Timestamp]:
+        bars = self.load(interval)
+        if bars.empty:
+            return None
+        return bars['Date'].iloc[-1]
+
+    def append(self, interval: str, bars: pd.DataFrame) -> int:
+        """追加比已存储数据更新的K线，返回实际追加的条数"""
+        if bars.empty:
+            return 0
+        bars = bars[BAR_COLUMNS].sort_values('Date').drop_duplicates('Date', keep='last')
+        last = self.last_timestamp(interval)
+        if last is not None:
+            bars = bars[bars['Date'] > last]
+        if bars.empty:
+            return 0
+        self.partition(interval).append(bars.reset_index(drop=True))
+        return len(bars)
@@ -5,6 +5,7 @@ from technical_analysis import TechnicalAnalyzer
 from sentiment_analysis import SentimentAnalyzer
 from predictor import GoldPricePredictor
 from config import Config
+from fetch_context import FetchContext
 import pandas as pd
 from datetime import datetime
 
@@ -41,7 +42,9 @@ def main():
     
     print("🔬 正在计算技术指标...")
     tech_analyzer = TechnicalAnalyzer()
-    df_tech = tech_analyzer.calculate_all_indicators(df)
+    # 只计算下面输出用到的指标（综合信号依赖的各项信号会自动加入）
+    df_tech = tech_analyzer.calculate_all_indicators(df, indicators=['RSI', 'MACD', 'SMA_20', 'SMA_50',
+                                                                     'Overall_Signal'])
     print("✅ 技术指标计算完成")
     print()
     
@@ -144,4 +147,6 @@ def main():
     print("=" * 60)
 
 if __name__ == "__main__":
-    main()
+    # 同一次运行中相同的数据请求只执行一次
+    with FetchContext('main'):
+        main()
@@ -1,9 +1,9 @@
-import requests
 from bs4 import BeautifulSoup
 import pandas as pd
 from datetime import datetime
 from typing import List, Dict
 import logging
+from http_client import get_http_client
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -12,6 +12,7 @@ class NewsFetcher:
     def __init__(self, api_key: str = ''):
         self.api_key = api_key
         self.base_url = 'https://newsapi.org/v2'
+        self.http = get_http_client()
 
     def fetch_gold_news(self, query: str = 'gold price', days: int = 7) -> List[Dict]:
         if not self.api_key:
@@ -32,7 +33,7 @@ class NewsFetcher:
                 'apiKey': self.api_key
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self.http.get(url, params=params, timeout=10)
             response.raise_for_status()
             
             data = response.json()
@@ -62,7 +63,7 @@ class NewsFetcher:
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
             
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self.http.get(url, headers=headers, timeout=10)
             soup = BeautifulSoup(response.text, 'html.parser')
             
             news_list = []
@@ -94,7 +95,7 @@ class NewsFetcher:
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
             
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self.http.get(url, headers=headers, timeout=10)
             soup = BeautifulSoup(response.text, 'html.parser')
             
             sentiment_data = {
@@ -112,7 +113,7 @@ class NewsFetcher:
     def _get_fear_greed_index(self) -> float:
         try:
             url = 'https://api.alternative.me/fng/'
-            response = requests.get(url, timeout=10)
+            response = self.http.get(url, timeout=10)
             data = response.json()
             return float(data['data'][0]['value'])
         except:
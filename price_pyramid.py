@@ -0,0 +1,199 @@
+import os
+import re
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import Config
+from price_store import PriceStore, create_price_store
+
+# 金字塔各层（由细到粗）及每根K线大致覆盖的天数
+LEVEL_DAYS = {
+    '1d': 1,
+    '1w': 7,
+    '1M': 30,
+    '1Q': 91
+}
+LEVELS = list(LEVEL_DAYS)
+COARSE_LEVELS = LEVELS[1:]
+
+# 各层对应的 pandas 周期（周从周一开始）
+LEVEL_PERIODS = {
+    '1w': 'W',
+    '1M': 'M',
+    '1Q': 'Q'
+}
+
+# LastDate：已汇总的最后一根日线日期；Bars：本周期包含的日线数
+LEVEL_COLUMNS = ['Date', 'Open', 'High', 'Low', 'Close', 'Volume', 'LastDate', 'Bars']
+
+_RESOLUTION_ALIASES = {
+    'd': '1d', 'day': '1d', 'daily': '1d',
+    'w': '1w', 'week': '1w', 'weekly': '1w',
+    'm': '1M', 'month': '1M', 'monthly': '1M',
+    'q': '1Q', 'quarter': '1Q', 'quarterly': '1Q'
+}
+_UNIT_DAYS = {'d': 1, 'w': 7, 'M': 30, 'm': 30, 'Q': 91, 'q': 91, 'y': 365, 'Y': 365}
+
+
+def resolution_days(resolution: str) -> float:
+    """把 "1w"、"2M"、"10d"、"week" 等写法换算为天数，无法识别时抛出 ValueError"""
+    value = resolution.strip()
+    value = _RESOLUTION_ALIASES.get(value.lower(), value)
+    match = re.fullmatch(r'(\d+)([dwMmQqYy])', value)
+    if not match:
+        raise ValueError(f"不支持的K线周期: {resolution}")
+    return int(match.group(1)) * _UNIT_DAYS[match.group(2)]
+
+
+def choose_level(row_counts: Dict[str, int], resolution: Optional[str] = None,
+                 max_points: Optional[int] = None) -> str:
+    """
+    选择满足要求的金字塔层
+
+    - resolution：不超过该周期的最粗一层（如请求 2w 返回 1w）
+    - max_points：行数不超过 max_points 的最细一层，都超过时返回最粗一层
+    只在 row_counts 中存在的层里选择，都未指定时返回日线。
+    """
+    available = [level for level in LEVELS if level in row_counts]
+    if not available:
+        return '1d'
+
+    if resolution:
+        days = resolution_days(resolution)
+        candidates = [level for level in available if LEVEL_DAYS[level] <= days]
+        return candidates[-1] if candidates else available[0]
+
+    if max_points:
+        for level in available:
+            if row_counts[level] <= max_points:
+                return level
+        return available[-1]
+
+    return available[0]
+
+
+def aggregate_bars(daily: pd.DataFrame, level: str) -> pd.DataFrame:
+    """把按日期排序的日线汇总为 level 周期的K线（以周期起始日期为时间戳）"""
+    if daily.empty:
+        return pd.DataFrame(columns=LEVEL_COLUMNS)
+
+    dates = pd.to_datetime(daily['Date']).reset_index(drop=True)
+    codes = pd.PeriodIndex(dates, freq=LEVEL_PERIODS[level]).asi8
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(codes)) + 1))
+    ends = np.concatenate((starts[1:], [len(codes)])) - 1
+
+    volume = daily['Volume'].to_numpy(dtype=float) if 'Volume' in daily.columns else np.zeros(len(daily))
+    return pd.DataFrame({
+        'Date': dates.iloc[starts].dt.to_period(LEVEL_PERIODS[level]).dt.start_time.to_numpy(),
+        'Open': daily['Open'].to_numpy(dtype=float)[starts],
+        'High': np.maximum.reduceat(daily['High'].to_numpy(dtype=float), starts),
+        'Low': np.minimum.reduceat(daily['Low'].to_numpy(dtype=float), starts),
+        'Close': daily['Close'].to_numpy(dtype=float)[ends],
+        'Volume': np.add.reduceat(volume, starts),
+        'LastDate': dates.iloc[ends].to_numpy(),
+        'Bars': np.diff(np.concatenate((starts, [len(codes)])))
+    })
+
+
+def merge_bars(existing: pd.DataFrame, new_bars: pd.DataFrame) -> pd.DataFrame:
+    """把新汇总的K线接到已有K线之后，首根与最后一根属于同一周期时合并"""
+    if existing.empty:
+        return new_bars.reset_index(drop=True)
+    if new_bars.empty:
+        return existing.reset_index(drop=True)
+
+    existing = existing[LEVEL_COLUMNS].copy()
+    if new_bars['Date'].iloc[0] != existing['Date'].iloc[-1]:
+        return pd.concat([existing, new_bars], ignore_index=True)
+
+    last = existing.index[-1]
+    first = new_bars.iloc[0]
+    existing.loc[last, 'High'] = max(existing.loc[last, 'High'], first['High'])
+    existing.loc[last, 'Low'] = min(existing.loc[last, 'Low'], first['Low'])
+    existing.loc[last, 'Close'] = first['Close']
+    existing.loc[last, 'Volume'] += first['Volume']
+    existing.loc[last, 'LastDate'] = first['LastDate']
+    existing.loc[last, 'Bars'] += first['Bars']
+    return pd.concat([existing, new_bars.iloc[1:]], ignore_index=True)
+
+
+class PricePyramid:
+    """
+    多周期K线金字塔
+
+    在日线之外保存周线、月线、季线，每层一个独立分区
+    （data_cache/<名称>/<周期>），底层复用价格存储后端。新日线到达时只汇总
+    新数据：属于最后一根K线所在周期的部分并入该K线，其余作为新K线追加，
+    不重新汇总全部日线。
+    """
+
+    def __init__(self, cache_dir: str, name: str, backend: Optional[str] = None):
+        self.root = os.path.join(cache_dir, name)
+        self.backend = backend if backend is not None else Config.PRICE_STORE
+        self._partitions: Dict[str, PriceStore] = {}
+
+    def partition(self, level: str) -> PriceStore:
+        store = self._partitions.get(level)
+        if store is None:
+            store = create_price_store(self.backend, self.root, level)
+            self._partitions[level] = store
+        return store
+
+    def exists(self) -> bool:
+        return all(self.partition(level).exists() for level in COARSE_LEVELS)
+
+    def rebuild(self, daily: pd.DataFrame) -> None:
+        """由完整日线重建所有层"""
+        for level in COARSE_LEVELS:
+            self.partition(level).save(aggregate_bars(daily, level))
+
+    def update(self, new_rows: pd.DataFrame) -> bool:
+        """
+        增量汇总新日线
+
+        只处理晚于各层 LastDate 的日线；某一层尚未建立时返回 False，
+        调用方应改用 rebuild。
+        """
+        if not self.exists():
+            return False
+        if new_rows.empty:
+            return True
+
+        new_rows = new_rows.sort_values('Date')
+        for level in COARSE_LEVELS:
+            store = self.partition(level)
+            existing = store.load()
+            if not existing.empty:
+                new_level_rows = new_rows[new_rows['Date'] > existing['LastDate'].iloc[-1]]
+            else:
+                new_level_rows = new_rows
+            if new_level_rows.empty:
+                continue
+
+            new_bars = aggregate_bars(new_level_rows, level)
+            if not existing.empty and new_bars['Date'].iloc[0] == existing['Date'].iloc[-1]:
+                # 最后一根K线的周期尚未结束，合并后整体重写（各层行数很少）
+                store.save(merge_bars(existing, new_bars))
+            else:
+                store.append(new_bars)
+        return True
+
+    def load(self, level: str, pending: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        读取一层K线
+
+        pending 为尚未写入存储的日线（如由实时报价补上的今天数据），
+        晚于该层 LastDate 的部分在内存中并入结果，不写回存储。
+        """
+        store = self.partition(level)
+        bars = store.load() if store.exists() else pd.DataFrame(columns=LEVEL_COLUMNS)
+        if pending is not None and not pending.empty:
+            if not bars.empty:
+                pending = pending[pending['Date'] > bars['LastDate'].iloc[-1]]
+            bars = merge_bars(bars, aggregate_bars(pending.sort_values('Date'), level))
+        return bars
+
+    def row_counts(self) -> Dict[str, int]:
+        return {level: len(self.load(level)) for level in COARSE_LEVELS}
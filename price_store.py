@@ -0,0 +1,333 @@
+import json
+import os
+import shutil
+import tempfile
+import uuid
+from datetime import datetime
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+def _fsync(path: str) -> None:
+    """把文件内容刷到磁盘，保证随后的原子替换不会指向未落盘的数据"""
+    with open(path, 'rb') as f:
+        os.fsync(f.fileno())
+
+
+class PriceStore:
+    """
+    价格数据存储后端基类
+
+    所有后端都保存按 Date 排序的 OHLCV 数据，写入时先写临时文件再原子重命名，
+    读写失败时由调用方（GoldDataFetcher）打印错误并回退到重新获取。
+    """
+
+    suffix = ''
+
+    def __init__(self, cache_dir: str, name: str):
+        self.cache_dir = cache_dir
+        self.name = name
+        self.path = os.path.join(cache_dir, name + self.suffix)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def mtime(self) -> Optional[float]:
+        """最后写入时间（时间戳），不存在时返回 None"""
+        try:
+            return os.path.getmtime(self.path)
+        except OSError:
+            return None
+
+    def touch(self, mtime: Optional[float] = None) -> None:
+        """只刷新写入时间（数据源没有新数据时使用），可指定时间戳"""
+        os.utime(self.path, None if mtime is None else (mtime, mtime))
+
+    def load(self) -> pd.DataFrame:
+        raise NotImplementedError
+
+    def save(self, df: pd.DataFrame) -> None:
+        raise NotImplementedError
+
+    def append(self, new_rows: pd.DataFrame) -> None:
+        """追加新数据，默认实现为读取后整体重写"""
+        if new_rows.empty:
+            self.touch()
+            return
+        self.save(pd.concat([self.load(), new_rows], ignore_index=True))
+
+    def _atomic_write(self, write_fn) -> None:
+        """将 write_fn(tmp_path) 写出的文件原子替换到 self.path"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f'.{self.name}.', suffix='.tmp')
+        os.close(fd)
+        try:
+            write_fn(tmp_path)
+            _fsync(tmp_path)
+            os.replace(tmp_path, self.path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+class CSVPriceStore(PriceStore):
+    """CSV 文件存储（原 gold_price_cache.csv 格式）"""
+
+    suffix = '.csv'
+
+    def load(self) -> pd.DataFrame:
+        if not self.exists():
+            return pd.DataFrame()
+        df = pd.read_csv(self.path)
+        if 'Date' in df.columns:
+            df['Date'] = pd.to_datetime(df['Date'])
+        return df
+
+    def save(self, df: pd.DataFrame) -> None:
+        self._atomic_write(lambda tmp_path: df.to_csv(tmp_path, index=False))
+
+    def append(self, new_rows: pd.DataFrame) -> None:
+        if new_rows.empty:
+            self.touch()
+            return
+        # 按文件已有的列顺序追加；在副本上追加后原子替换，中断时原文件保持完整
+        with open(self.path, 'r', encoding='utf-8') as f:
+            columns = f.readline().strip().split(',')
+
+        def write(tmp_path):
+            shutil.copyfile(self.path, tmp_path)
+            new_rows.reindex(columns=columns).to_csv(tmp_path, mode='a', header=False, index=False)
+
+        self._atomic_write(write)
+
+
+class ColumnarPriceStore(PriceStore):
+    """
+    内存映射的列式存储
+
+    目录结构:
+        <name>/meta.json          行数、列名、类型和当前文件代号
+        <name>/<列名>.<代号>.bin    每列一个原始二进制数组
+
+    Date 以 int64 纳秒保存，读取时直接 view 成 datetime64，无需解析日期字符串；
+    数值列通过写时复制的 np.memmap 映射，不经过文本解析也不复制数据，
+    调用方修改 DataFrame 不会写回文件。整体写入时生成新代号的列文件，
+    fsync 后再原子替换 meta.json；追加只在列文件末尾写入新行并 fsync 后原子更新行数，
+    读取方始终只看到 meta.json 中记录的完整行。
+    """
+
+    meta_name = 'meta.json'
+
+    def __init__(self, cache_dir: str, name: str):
+        super().__init__(cache_dir, name)
+        self.meta_path = os.path.join(self.path, self.meta_name)
+
+    def exists(self) -> bool:
+        return os.path.exists(self.meta_path)
+
+    def mtime(self) -> Optional[float]:
+        try:
+            return os.path.getmtime(self.meta_path)
+        except OSError:
+            return None
+
+    def touch(self, mtime: Optional[float] = None) -> None:
+        os.utime(self.meta_path, None if mtime is None else (mtime, mtime))
+
+    def _read_meta(self) -> Optional[Dict]:
+        if not self.exists():
+            return None
+        with open(self.meta_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write_meta(self, meta: Dict) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, prefix='.meta.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.meta_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def _column_path(self, column: str, generation: str) -> str:
+        return os.path.join(self.path, f'{column}.{generation}.bin')
+
+    @staticmethod
+    def _to_storage(series: pd.Series) -> Optional[np.ndarray]:
+        """转换为可直接落盘的定长数组，不支持的列（如字符串）返回 None"""
+        if pd.api.types.is_datetime64_any_dtype(series):
+            if getattr(series.dt, 'tz', None) is not None:
+                series = series.dt.tz_localize(None)
+            return series.to_numpy(dtype='datetime64[ns]').view('int64')
+        if pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+            return np.ascontiguousarray(series.to_numpy())
+        return None
+
+    def load(self) -> pd.DataFrame:
+        meta = self._read_meta()
+        if meta is None:
+            return pd.DataFrame()
+
+        rows = meta['rows']
+        data = {}
+        for column in meta['columns']:
+            dtype = np.dtype(column['dtype'])
+            if rows == 0:
+                values = np.empty(0, dtype=dtype)
+            else:
+                values = np.memmap(self._column_path(column['name'], meta['generation']),
+                                   dtype=dtype, mode='c', shape=(rows,))
+            if column.get('datetime'):
+                values = values.view('datetime64[ns]')
+            data[column['name']] = values
+        return pd.DataFrame(data, copy=False)
+
+    def save(self, df: pd.DataFrame) -> None:
+        os.makedirs(self.path, exist_ok=True)
+        old_meta = self._read_meta()
+        generation = uuid.uuid4().hex[:8]
+
+        columns = []
+        for name in df.columns:
+            values = self._to_storage(df[name])
+            if values is None:
+                print(f"列式存储跳过非数值列: {name}")
+                continue
+            with open(self._column_path(name, generation), 'wb') as f:
+                values.tofile(f)
+                f.flush()
+                os.fsync(f.fileno())
+            columns.append({
+                'name': name,
+                'dtype': values.dtype.str,
+                'datetime': bool(pd.api.types.is_datetime64_any_dtype(df[name]))
+            })
+
+        self._write_meta({
+            'rows': len(df),
+            'columns': columns,
+            'generation': generation,
+            'updated_at': datetime.now().isoformat()
+        })
+
+        if old_meta is not None:
+            self._remove_generation(old_meta)
+
+    def append(self, new_rows: pd.DataFrame) -> None:
+        meta = self._read_meta()
+        if meta is None:
+            self.save(new_rows)
+            return
+        if new_rows.empty:
+            self.touch()
+            return
+
+        rows = meta['rows']
+        appended = []
+        for column in meta['columns']:
+            dtype = np.dtype(column['dtype'])
+            if column['name'] in new_rows.columns:
+                values = self._to_storage(new_rows[column['name']])
+            else:
+                values = None
+            if values is None:
+                fill = np.iinfo(np.int64).min if column.get('datetime') else 0
+                values = np.full(len(new_rows), fill, dtype=dtype)
+            elif not np.can_cast(values.dtype, dtype, casting='safe'):
+                # 新数据放不进已有列的类型（如小数成交量追加到整数列）：整体重写，列类型随之放宽
+                print(f"列式存储追加的 {column['name']} 列（{values.dtype}）无法无损转换为 {dtype}，重写缓存")
+                self.save(pd.concat([self.load(), new_rows], ignore_index=True))
+                return
+            appended.append((column, dtype, values))
+
+        for column, dtype, values in appended:
+            path = self._column_path(column['name'], meta['generation'])
+            with open(path, 'r+b' if os.path.exists(path) else 'w+b') as f:
+                # 截掉上次未完成追加可能留下的尾部数据
+                f.seek(rows * dtype.itemsize)
+                f.truncate()
+                f.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+        meta['rows'] = rows + len(new_rows)
+        meta['updated_at'] = datetime.now().isoformat()
+        self._write_meta(meta)
+
+    def _remove_generation(self, meta: Dict) -> None:
+        for column in meta['columns']:
+            try:
+                os.remove(self._column_path(column['name'], meta['generation']))
+            except OSError:
+                pass
+
+
+class ArrowPriceStore(PriceStore):
+    """Feather / Parquet 存储（需要 pyarrow）"""
+
+    def __init__(self, cache_dir: str, name: str, file_format: str = 'feather'):
+        self.file_format = file_format
+        self.suffix = '.' + file_format
+        super().__init__(cache_dir, name)
+
+    def load(self) -> pd.DataFrame:
+        if not self.exists():
+            return pd.DataFrame()
+        if self.file_format == 'parquet':
+            return pd.read_parquet(self.path)
+        # feather 文件通过内存映射读取
+        import pyarrow.feather as feather
+        return feather.read_table(self.path, memory_map=True).to_pandas()
+
+    def save(self, df: pd.DataFrame) -> None:
+        df = df.reset_index(drop=True)
+        if self.file_format == 'parquet':
+            self._atomic_write(lambda tmp_path: df.to_parquet(tmp_path, index=False))
+        else:
+            self._atomic_write(lambda tmp_path: df.to_feather(tmp_path))
+
+
+PRICE_STORE_BACKENDS = ['npy', 'csv', 'feather', 'parquet']
+
+
+def create_price_store(backend: str, cache_dir: str, name: str) -> PriceStore:
+    """
+    按名称创建存储后端
+
+    backend: npy（内存映射列式，默认）、csv、feather、parquet。
+    feather/parquet 需要 pyarrow，未安装时回退到 npy。
+    """
+    backend = (backend or 'npy').lower()
+
+    if backend in ('feather', 'parquet'):
+        try:
+            import pyarrow  # noqa: F401
+            return ArrowPriceStore(cache_dir, name, backend)
+        except ImportError:
+            print(f"未安装 pyarrow，无法使用 {backend} 存储，改用 npy 列式存储")
+            backend = 'npy'
+
+    if backend == 'csv':
+        return CSVPriceStore(cache_dir, name)
+    if backend != 'npy':
+        print(f"未知的价格存储后端: {backend}，使用 npy 列式存储")
+    return ColumnarPriceStore(cache_dir, name)
+
+
+def migrate_price_store(source: PriceStore, target: PriceStore) -> bool:
+    """将旧存储中的数据迁移到新存储（保留原写入时间），成功返回 True"""
+    if target.exists() or not source.exists():
+        return False
+
+    df = source.load()
+    if df.empty:
+        return False
+
+    target.save(df)
+    target.touch(source.mtime())
+    return True
@@ -0,0 +1,158 @@
+import asyncio
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from config import Config
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """实时行情请求共用的有界线程池"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='quote')
+    return _executor
+
+
+class RealtimeQuoteEngine:
+    """
+    实时行情竞速引擎
+
+    同时向所有实时数据源发起请求（sina / alpha_vantage / finnhub / yfinance），
+    返回第一个有效报价，或取前 N 个有效报价的中位数。整个调用有硬性延迟预算，
+    超出预算仍未返回的数据源直接忽略。各数据源的获取函数本身是同步的，
+    由事件循环调度到共享线程池中执行。
+    """
+
+    def __init__(self, fetcher, sources: Optional[List[str]] = None,
+                 latency_budget: Optional[float] = None, median_of: Optional[int] = None):
+        self.fetcher = fetcher
+        # fetcher 带有数据源健康登记表时，跳过熔断中的数据源并记录每次请求结果
+        self.health = getattr(fetcher, 'source_health', None)
+        self.kind = getattr(fetcher, 'realtime_kind', 'realtime')
+        if sources is None:
+            sources = list(fetcher.realtime_sources)
+            if self.health is not None:
+                sources = self.health.order(self.kind, sources)
+        self.sources = sources
+        self.latency_budget = latency_budget if latency_budget is not None else Config.REALTIME_LATENCY_BUDGET_SECONDS
+        self.median_of = max(1, median_of if median_of is not None else Config.REALTIME_MEDIAN_OF)
+
+    @staticmethod
+    def _is_valid_quote(quote: Dict) -> bool:
+        if not quote:
+            return False
+        price = quote.get('price', 0)
+        try:
+            return price > 0 and math.isfinite(price)
+        except TypeError:
+            return False
+
+    def _fetch_source(self, source: str) -> Dict:
+        if self.health is not None and not self.health.allow(self.kind, source):
+            return {}
+        start = time.monotonic()
+        try:
+            quote = self.fetcher._fetch_realtime_from_source(source)
+        except Exception as e:
+            self._record(source, start, error=str(e))
+            raise
+        if self._is_valid_quote(quote):
+            self._record(source, start)
+            quote = dict(quote)
+            quote['source'] = source
+            return quote
+        self._record(source, start, error='无有效报价')
+        return {}
+
+    def _record(self, source: str, start: float, error: Optional[str] = None) -> None:
+        if self.health is None:
+            return
+        latency = time.monotonic() - start
+        if error is None:
+            self.health.record_success(self.kind, source, latency)
+        else:
+            self.health.record_failure(self.kind, source, latency, error)
+
+    async def fetch_quote_async(self) -> Dict:
+        """在延迟预算内返回第一个（或前 N 个取中位数的）有效报价，失败返回空字典"""
+        if not self.sources:
+            return {}
+
+        loop = asyncio.get_running_loop()
+        executor = _get_executor()
+        tasks = {
+            asyncio.ensure_future(loop.run_in_executor(executor, self._fetch_source, source)): source
+            for source in self.sources
+        }
+
+        quotes = []
+        pending = set(tasks)
+        deadline = loop.time() + self.latency_budget
+        try:
+            while pending and len(quotes) < self.median_of:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=timeout,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        quote = task.result()
+                    except Exception as e:
+                        print(f"从 {tasks[task]} 获取实时价格失败: {e}")
+                        continue
+                    if quote:
+                        quotes.append(quote)
+        finally:
+            # 超出预算的请求不再等待，线程中的请求在各自超时后自行结束
+            for task in pending:
+                task.cancel()
+
+        if pending and len(quotes) < self.median_of:
+            print(f"实时价格超出延迟预算 ({self.latency_budget}秒)，忽略: "
+                  f"{', '.join(tasks[t] for t in pending)}")
+
+        return self._combine(quotes)
+
+    def _combine(self, quotes: List[Dict]) -> Dict:
+        if not quotes:
+            return {}
+        if self.median_of == 1 or len(quotes) == 1:
+            return quotes[0]
+
+        # 以中位数价格对应的报价为基础，价格取中位数
+        ordered = sorted(quotes, key=lambda q: q['price'])
+        prices = [q['price'] for q in ordered]
+        mid = len(prices) // 2
+        median_price = prices[mid] if len(prices) % 2 else (prices[mid - 1] + prices[mid]) / 2
+
+        quote = dict(ordered[mid])
+        quote['price'] = median_price
+        quote['source'] = ','.join(q['source'] for q in quotes)
+        return quote
+
+    def fetch_quote(self) -> Dict:
+        """同步调用入口，可在普通线程（Flask 请求、后台更新线程）中直接使用"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.fetch_quote_async())
+
+        # 当前线程已有运行中的事件循环时，在独立线程中执行
+        result = {}
+
+        def run():
+            result['quote'] = asyncio.run(self.fetch_quote_async())
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        thread.join()
+        return result.get('quote', {})
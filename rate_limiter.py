@@ -0,0 +1,169 @@
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from config import Config
+
+# 按域名后缀识别上游服务
+PROVIDER_DOMAINS = {
+    'alphavantage.co': 'alpha_vantage',
+    'finnhub.io': 'finnhub',
+    'eastmoney.com': 'eastmoney',
+    'sinajs.cn': 'sina',
+    'sina.com.cn': 'sina',
+    'investing.com': 'investing',
+    'kitco.com': 'kitco',
+    'newsapi.org': 'newsapi'
+}
+
+
+class RateLimitExceeded(requests.exceptions.RequestException):
+    """配额不足且无法在允许的等待时间内恢复"""
+
+    def __init__(self, provider: str, retry_after: float):
+        super().__init__(f"{provider} 请求配额已用尽，约 {retry_after:.1f} 秒后恢复")
+        self.provider = provider
+        self.retry_after = retry_after
+
+
+def parse_rate_limits(value: str) -> Dict[str, List[Tuple[int, float]]]:
+    """解析 "服务=数量/秒数[+数量/秒数],..." 格式的配额配置"""
+    limits = {}
+    for item in value.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        provider, _, spec = item.partition('=')
+        buckets = []
+        for part in spec.split('+'):
+            count, _, seconds = part.partition('/')
+            buckets.append((int(count), float(seconds)))
+        limits[provider.strip()] = buckets
+    return limits
+
+
+class TokenBucket:
+    """令牌桶：容量 capacity，每 period 秒匀速补满"""
+
+    def __init__(self, capacity: int, period: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = capacity
+        self.period = period
+        self.rate = capacity / period
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def tokens(self) -> float:
+        self._refill()
+        return self._tokens
+
+    def wait_time(self) -> float:
+        """获得一个令牌还需等待的秒数"""
+        self._refill()
+        return max(0.0, (1 - self._tokens) / self.rate)
+
+    def take(self) -> None:
+        self._tokens -= 1
+
+
+class RateLimiter:
+    """
+    进程内共享的按上游服务限流器
+
+    每个服务可以有多个令牌桶（如每分钟和每天的配额），请求前必须每个桶都有
+    令牌。配额不足时，若能在 max_wait 秒内恢复则等待，否则立即抛出
+    RateLimitExceeded，而不是发出注定失败的请求、白白耗尽超时时间。
+    """
+
+    def __init__(self, limits: Optional[Dict[str, List[Tuple[int, float]]]] = None,
+                 max_wait: Optional[float] = None, hosts: Optional[Dict[str, str]] = None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        limits = limits if limits is not None else parse_rate_limits(Config.RATE_LIMITS)
+        self.max_wait = max_wait if max_wait is not None else Config.RATE_LIMIT_MAX_WAIT_SECONDS
+        self.hosts = dict(hosts or {})
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._buckets = {
+            provider: [TokenBucket(count, period, clock) for count, period in buckets]
+            for provider, buckets in limits.items()
+        }
+        self._stats = {provider: {'allowed': 0, 'throttled': 0, 'waited_seconds': 0.0} for provider in limits}
+
+    def provider_for(self, host: str) -> Optional[str]:
+        host = host.split(':')[0].lower()
+        if host in self.hosts:
+            return self.hosts[host]
+        for domain, provider in PROVIDER_DOMAINS.items():
+            if host == domain or host.endswith('.' + domain):
+                return provider
+        return None
+
+    def acquire(self, provider: Optional[str], max_wait: Optional[float] = None) -> None:
+        """为 provider 取得一次请求配额；未配置配额的服务直接放行"""
+        buckets = self._buckets.get(provider)
+        if not buckets:
+            return
+        max_wait = max_wait if max_wait is not None else self.max_wait
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                wait = max(bucket.wait_time() for bucket in buckets)
+                if wait <= 0:
+                    for bucket in buckets:
+                        bucket.take()
+                    stats = self._stats[provider]
+                    stats['allowed'] += 1
+                    stats['waited_seconds'] += waited
+                    return
+                if waited + wait > max_wait:
+                    self._stats[provider]['throttled'] += 1
+                    raise RateLimitExceeded(provider, wait)
+            self._sleep(wait)
+            waited += wait
+
+    def acquire_for_host(self, host: str) -> None:
+        self.acquire(self.provider_for(host))
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """各服务的剩余配额和限流统计"""
+        result = {}
+        with self._lock:
+            for provider, buckets in self._buckets.items():
+                stats = self._stats[provider]
+                result[provider] = {
+                    'remaining': min(int(bucket.tokens()) for bucket in buckets),
+                    'limits': [f"{bucket.capacity}/{bucket.period:g}s" for bucket in buckets],
+                    'retry_after_seconds': round(max(bucket.wait_time() for bucket in buckets), 1),
+                    'allowed': stats['allowed'],
+                    'throttled': stats['throttled'],
+                    'waited_seconds': round(stats['waited_seconds'], 2)
+                }
+        return result
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """进程内共享的限流器"""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter()
+    return _limiter
+
+
+def acquire_quota(provider: str) -> None:
+    """不经过共享 HTTP 客户端的请求（如 akshare 接口）在发送前取得配额；RATE_LIMIT=false 时不限流"""
+    if Config.RATE_LIMIT:
+        get_rate_limiter().acquire(provider)
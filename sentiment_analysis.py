@@ -1,16 +1,30 @@
-import requests
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 from typing import List, Dict
 import pandas as pd
 from config import Config
+from http_client import get_http_client
+from http_cache import cached_call
+from rate_limiter import acquire_quota
+from fetch_context import memoized
 
 class SentimentAnalyzer:
     def __init__(self):
         self.news_sources = Config.NEWS_SOURCES
         self.news_api_key = Config.NEWS_API_KEY
+        self.http = get_http_client()
         
     def fetch_gold_news(self, days_back: int = 7) -> List[Dict]:
+        # 同一刷新周期内只请求一次
+        return memoized(('news', days_back), lambda: self._fetch_gold_news(days_back))
+    
+    @staticmethod
+    def _eastmoney_news(ak, symbol: str):
+        # 东方财富接口与央行数据页面共用配额
+        acquire_quota('eastmoney')
+        return ak.stock_news_em(symbol=symbol)
+    
+    def _fetch_gold_news(self, days_back: int) -> List[Dict]:
         news_articles = []
         
         try:
@@ -23,7 +37,8 @@ class SentimentAnalyzer:
             cutoff_date = datetime.now() - timedelta(days=days_back)
             
             try:
-                news_df = ak.stock_news_em(symbol="黄金")
+                news_df = cached_call('akshare:stock_news_em', {'symbol': '黄金'},
+                                      lambda: self._eastmoney_news(ak, "黄金"))
                 if not news_df.empty:
                     for _, row in news_df.iterrows():
                         article_date = pd.to_datetime(row.get('新闻时间', datetime.now()))
@@ -40,7 +55,8 @@ class SentimentAnalyzer:
                 print(f"从东方财富获取新闻时出错: {e}")
             
             try:
-                news_df = ak.stock_news_em(symbol="贵金属")
+                news_df = cached_call('akshare:stock_news_em', {'symbol': '贵金属'},
+                                      lambda: self._eastmoney_news(ak, "贵金属"))
                 if not news_df.empty:
                     for _, row in news_df.iterrows():
                         article_date = pd.to_datetime(row.get('新闻时间', datetime.now()))
@@ -269,7 +285,7 @@ class SentimentAnalyzer:
             }
             
             url = 'https://www.kitco.com/news/'
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self.http.get(url, headers=headers, timeout=10)
             
             if response.status_code == 200:
                 soup = BeautifulSoup(response.content, 'html.parser')
@@ -337,7 +353,7 @@ class SentimentAnalyzer:
             }
             
             url = 'https://www.investing.com/commodities/gold-news'
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self.http.get(url, headers=headers, timeout=10)
             
             if response.status_code == 200:
                 soup = BeautifulSoup(response.content, 'html.parser')
@@ -0,0 +1,197 @@
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from config import Config
+
+# 熔断器状态
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class _SourceStats:
+    """单个数据源的滚动统计与熔断状态"""
+
+    def __init__(self, window: int):
+        self.outcomes = deque(maxlen=window)   # True/False
+        self.latencies = deque(maxlen=window)  # 秒
+        self.total_calls = 0
+        self.total_failures = 0
+        self.consecutive_failures = 0
+        self.last_error = None
+        self.last_error_at = None
+        self.last_success_at = None
+        self.state = CLOSED
+        self.opened_at = None
+        self.probe_started_at = None
+
+    def success_rate(self) -> Optional[float]:
+        if not self.outcomes:
+            return None
+        return sum(self.outcomes) / len(self.outcomes)
+
+    def latency_percentile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        return float(np.percentile(np.array(self.latencies), q))
+
+
+class SourceHealthRegistry:
+    """
+    数据源健康登记表
+
+    记录每个数据源（按类别区分，如 historical / realtime）最近 window 次调用的
+    成功率、p50/p95 延迟和最近错误，并为每个数据源维护熔断器：
+    - closed：正常调用；连续失败达到 failure_threshold 次后打开
+    - open：跳过该数据源，cooldown 秒后进入 half_open
+    - half_open：只放行一次探测调用，成功则关闭，失败则重新打开
+
+    order() 按预期代价（p50 延迟 / 成功率）对可用数据源排序，从未调用过的
+    数据源保持配置顺序并排在最前，以便尽快获得统计数据。order() 不改变熔断
+    状态；调用方在真正调用数据源之前通过 allow() 取得探测资格，排在后面、
+    最终没有被调用的数据源不会占用探测。
+    """
+
+    def __init__(self, window: Optional[int] = None, failure_threshold: Optional[int] = None,
+                 cooldown: Optional[float] = None):
+        self.window = window if window is not None else Config.SOURCE_HEALTH_WINDOW
+        self.failure_threshold = failure_threshold if failure_threshold is not None else Config.SOURCE_FAILURE_THRESHOLD
+        self.cooldown = cooldown if cooldown is not None else Config.SOURCE_COOLDOWN_SECONDS
+        self._lock = threading.Lock()
+        self._sources = {}
+
+    def _stats(self, kind: str, source: str) -> _SourceStats:
+        key = (kind, source)
+        stats = self._sources.get(key)
+        if stats is None:
+            stats = _SourceStats(self.window)
+            self._sources[key] = stats
+        return stats
+
+    def _available(self, stats: _SourceStats, now: float) -> bool:
+        """熔断器此刻是否会放行调用（不改变状态）"""
+        if stats.state == CLOSED:
+            return True
+        if stats.state == OPEN:
+            return now - stats.opened_at >= self.cooldown
+        return stats.probe_started_at is None or now - stats.probe_started_at >= self.cooldown
+
+    def _allow(self, stats: _SourceStats, now: float) -> bool:
+        if stats.state == CLOSED:
+            return True
+        if stats.state == OPEN:
+            if now - stats.opened_at < self.cooldown:
+                return False
+            stats.state = HALF_OPEN
+            stats.probe_started_at = now
+            return True
+        # half_open：已有探测在进行中时拒绝；探测长时间未回报（如调用卡住）则允许重新探测
+        if stats.probe_started_at is None or now - stats.probe_started_at >= self.cooldown:
+            stats.probe_started_at = now
+            return True
+        return False
+
+    def allow(self, kind: str, source: str) -> bool:
+        """即将调用该数据源时检查熔断器；冷却结束后的第一次调用作为探测"""
+        with self._lock:
+            return self._allow(self._stats(kind, source), time.monotonic())
+
+    def order(self, kind: str, sources: List[str]) -> List[str]:
+        """过滤掉熔断中的数据源，并按预期代价从低到高排序"""
+        now = time.monotonic()
+        ranked = []
+        with self._lock:
+            for index, source in enumerate(sources):
+                stats = self._stats(kind, source)
+                if not self._available(stats, now):
+                    continue
+                success_rate = stats.success_rate()
+                if success_rate is None:
+                    cost = 0.0
+                else:
+                    latency = stats.latency_percentile(50) or 0.0
+                    # 成功率为0的数据源排在最后
+                    cost = latency / success_rate if success_rate > 0 else float('inf')
+                ranked.append((cost, index, source))
+        ranked.sort()
+        return [source for _, _, source in ranked]
+
+    def record_success(self, kind: str, source: str, latency: float) -> None:
+        with self._lock:
+            stats = self._stats(kind, source)
+            stats.outcomes.append(True)
+            stats.latencies.append(latency)
+            stats.total_calls += 1
+            stats.consecutive_failures = 0
+            stats.last_success_at = time.time()
+            if stats.state != CLOSED:
+                print(f"数据源 {source} ({kind}) 已恢复，关闭熔断器")
+            stats.state = CLOSED
+            stats.opened_at = None
+            stats.probe_started_at = None
+
+    def record_failure(self, kind: str, source: str, latency: float, error: str) -> None:
+        with self._lock:
+            stats = self._stats(kind, source)
+            stats.outcomes.append(False)
+            stats.latencies.append(latency)
+            stats.total_calls += 1
+            stats.total_failures += 1
+            stats.consecutive_failures += 1
+            stats.last_error = error
+            stats.last_error_at = time.time()
+
+            if stats.state == HALF_OPEN or (stats.state == CLOSED and
+                                            stats.consecutive_failures >= self.failure_threshold):
+                print(f"数据源 {source} ({kind}) 连续失败 {stats.consecutive_failures} 次，"
+                      f"熔断 {self.cooldown} 秒")
+                stats.state = OPEN
+                stats.opened_at = time.monotonic()
+                stats.probe_started_at = None
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict]]:
+        """按类别返回各数据源的健康状态（用于 /api/health）"""
+        result = {}
+        with self._lock:
+            for (kind, source), stats in self._sources.items():
+                p50 = stats.latency_percentile(50)
+                p95 = stats.latency_percentile(95)
+                success_rate = stats.success_rate()
+                result.setdefault(kind, {})[source] = {
+                    'state': stats.state,
+                    'calls': stats.total_calls,
+                    'failures': stats.total_failures,
+                    'consecutive_failures': stats.consecutive_failures,
+                    'success_rate': round(success_rate, 3) if success_rate is not None else None,
+                    'latency_p50_ms': round(p50 * 1000, 1) if p50 is not None else None,
+                    'latency_p95_ms': round(p95 * 1000, 1) if p95 is not None else None,
+                    'last_error': stats.last_error,
+                    'last_error_at': _isoformat(stats.last_error_at),
+                    'last_success_at': _isoformat(stats.last_success_at)
+                }
+        return result
+
+
+def _isoformat(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp).isoformat()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_source_health() -> SourceHealthRegistry:
+    """进程内共享的数据源健康登记表"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = SourceHealthRegistry()
+    return _registry
@@ -0,0 +1,108 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from config import Config
+
+FRESH = 'fresh'
+STALE = 'stale'
+EXPIRED = 'expired'
+
+
+def cache_state(age_hours: Optional[float], ttl_hours: float, max_stale_hours: float) -> str:
+    """
+    根据缓存年龄判断缓存状态
+
+    - fresh：未过期，直接使用
+    - stale：已过期但未超过最大陈旧时间，可先返回旧数据并在后台刷新
+    - expired：超过最大陈旧时间（或未启用 stale-while-revalidate），必须同步刷新
+    """
+    if age_hours is None:
+        return EXPIRED
+    if age_hours <= ttl_hours:
+        return FRESH
+    if Config.STALE_WHILE_REVALIDATE and age_hours <= max_stale_hours:
+        return STALE
+    return EXPIRED
+
+
+class BackgroundRefresher:
+    """
+    后台缓存刷新器（stale-while-revalidate）
+
+    同一个键同时只有一个刷新任务：刷新进行中时再次请求刷新，返回正在进行的
+    任务。刷新失败后 retry_interval 秒内不再重试，避免上游故障时每次读取
+    缓存都发起请求。
+    """
+
+    def __init__(self, max_workers: int = 2, retry_interval: Optional[float] = None):
+        self.retry_interval = (retry_interval if retry_interval is not None
+                               else Config.REVALIDATE_RETRY_INTERVAL_SECONDS)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='revalidate')
+        self._lock = threading.Lock()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._last_failure: Dict[Hashable, float] = {}
+        self._stats: Dict[Hashable, Dict[str, Any]] = {}
+
+    def schedule(self, key: Hashable, refresh_fn: Callable[[], Any]) -> Optional[Future]:
+        """启动（或复用）key 的后台刷新，处于失败冷却期时返回 None"""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future
+            failed_at = self._last_failure.get(key)
+            if failed_at is not None and time.monotonic() - failed_at < self.retry_interval:
+                return None
+
+            stats = self._stats.setdefault(key, {'started': 0, 'succeeded': 0, 'failed': 0,
+                                                 'last_duration_seconds': None, 'last_error': None})
+            stats['started'] += 1
+            future = self._executor.submit(self._run, key, refresh_fn)
+            self._inflight[key] = future
+            return future
+
+    def _run(self, key: Hashable, refresh_fn: Callable[[], Any]) -> Any:
+        start = time.monotonic()
+        try:
+            result = refresh_fn()
+        except Exception as e:
+            print(f"后台刷新 {key} 失败: {e}")
+            with self._lock:
+                self._last_failure[key] = time.monotonic()
+                stats = self._stats[key]
+                stats['failed'] += 1
+                stats['last_error'] = str(e)
+                stats['last_duration_seconds'] = round(time.monotonic() - start, 3)
+                self._inflight.pop(key, None)
+            raise
+
+        with self._lock:
+            self._last_failure.pop(key, None)
+            stats = self._stats[key]
+            stats['succeeded'] += 1
+            stats['last_duration_seconds'] = round(time.monotonic() - start, 3)
+            self._inflight.pop(key, None)
+        return result
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                ':'.join(str(part) for part in key) if isinstance(key, tuple) else str(key):
+                    {**stats, 'in_progress': key in self._inflight}
+                for key, stats in self._stats.items()
+            }
+
+
+_refresher = None
+_refresher_lock = threading.Lock()
+
+
+def get_background_refresher() -> BackgroundRefresher:
+    """进程内共享的后台缓存刷新器"""
+    global _refresher
+    if _refresher is None:
+        with _refresher_lock:
+            if _refresher is None:
+                _refresher = BackgroundRefresher()
+    return _refresher
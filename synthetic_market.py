@@ -0,0 +1,182 @@
+from datetime import datetime
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+SYNTHETIC_MODELS = ('gbm', 'bootstrap')
+
+_NS_PER_DAY = 86400 * 10**9
+
+
+def generate_ohlc(rows: int, freq: str = 'D', end=None, start_price: float = 2650.0,
+                  model: str = 'gbm', drift: float = 0.0, volatility: float = 0.008,
+                  returns: Optional[Sequence[float]] = None, block_size: int = 1,
+                  open_volatility: float = 0.004, wick_volatility: float = 0.0015,
+                  regimes: Optional[Sequence[Tuple[float, float]]] = None, regime_length: float = 250,
+                  gap_probability: float = 0.0, gap_volatility: float = 0.02,
+                  missing_ratio: float = 0.0, mean_reversion: float = 0.0, volume_range: Tuple[int, int] = (50000, 150000),
+                  decimals: Optional[int] = 2, seed: Optional[int] = None) -> pd.DataFrame:
+    """
+    向量化生成模拟 OHLCV 数据
+
+    收盘价按对数收益率累加得到：
+    - model='gbm'：几何布朗运动，每期收益率 ~ N(drift - volatility²/2, volatility)
+    - model='bootstrap'：从 returns（如历史收盘价的 pct_change）中有放回地按
+      block_size 长度的连续区块抽样，保留收益率分布和短期自相关
+
+    regimes 为 [(drift, volatility 倍数), ...]，给出时按平均 regime_length 期
+    随机切换市场状态；gap_probability 为每期出现跳空的概率，跳空幅度
+    ~ N(0, gap_volatility)，开盘价和之后的收盘价都会跳空；missing_ratio 随机
+    删除部分K线以模拟数据缺失。mean_reversion > 0 时对数价格每期向初始价格回归
+    该比例（Ornstein-Uhlenbeck），生成超长序列时避免价格漂移到不合理的量级。
+
+    drift、volatility、open_volatility、wick_volatility 以及 regimes 中的
+    drift 均按日线给出，日内频率下漂移按 K线时长/1天、波动率按其平方根缩放。
+
+    开盘价在上一期收盘价附近波动，最高/最低价在开盘、收盘价基础上加影线，
+    四舍五入后保证 Low <= min(Open, Close) <= max(Open, Close) <= High。
+    给定 seed 时结果完全可复现。
+    """
+    if model not in SYNTHETIC_MODELS:
+        raise ValueError(f"不支持的模拟模型: {model}")
+    if rows <= 0:
+        return pd.DataFrame(columns=['Date', 'Open', 'High', 'Low', 'Close', 'Volume'])
+
+    rng = np.random.default_rng(seed)
+    bar_fraction = _bar_fraction(freq)
+    bar_scale = np.sqrt(bar_fraction)
+    drift *= bar_fraction
+    volatility *= bar_scale
+    open_volatility *= bar_scale
+    wick_volatility *= bar_scale
+
+    if model == 'gbm':
+        log_returns = rng.standard_normal(rows)
+        log_returns *= volatility
+        scale = np.ones(rows)
+        drifts = np.full(rows, drift)
+    else:
+        log_returns = _bootstrap_returns(rng, returns, rows, block_size)
+        scale = np.ones(rows)
+        drifts = np.zeros(rows)
+
+    if regimes:
+        states = _regime_states(rng, rows, len(regimes), regime_length)
+        regime_drift, regime_scale = (np.asarray(x, dtype=np.float64) for x in zip(*regimes))
+        drifts = drifts + regime_drift[states] * bar_fraction
+        scale = regime_scale[states]
+        log_returns *= scale
+
+    if model == 'gbm':
+        log_returns += drifts - 0.5 * (volatility * scale) ** 2
+    elif regimes:
+        log_returns += drifts
+
+    if gap_probability > 0:
+        gaps = np.where(rng.random(rows) < gap_probability, rng.normal(0, gap_volatility, rows), 0.0)
+        log_returns += gaps
+    else:
+        gaps = 0.0
+
+    if mean_reversion > 0:
+        # y[t] = (1 - k) * y[t-1] + r[t]，用 IIR 滤波代替逐行循环（scipy 导入较慢，按需导入）
+        from scipy.signal import lfilter
+        log_close = lfilter([1.0], [1.0, -(1.0 - mean_reversion)], log_returns)
+    else:
+        log_close = np.cumsum(log_returns)
+    log_close += np.log(start_price)
+    close = np.exp(log_close)
+
+    prev_close = np.empty(rows)
+    prev_close[0] = start_price
+    prev_close[1:] = close[:-1]
+    open_noise = rng.standard_normal(rows)
+    open_noise *= open_volatility * scale
+    open_ = prev_close * np.exp(gaps + open_noise)
+
+    wick_up = np.abs(rng.standard_normal(rows)) * wick_volatility
+    wick_down = np.abs(rng.standard_normal(rows)) * wick_volatility
+    high = np.maximum(open_, close) * (1 + wick_up)
+    low = np.minimum(open_, close) * (1 - wick_down)
+
+    if decimals is not None:
+        for values in (open_, high, low, close):
+            np.round(values, decimals, out=values)
+        # 四舍五入后重新保证最高/最低价包含开盘价和收盘价
+        np.maximum(high, np.maximum(open_, close), out=high)
+        np.minimum(low, np.minimum(open_, close), out=low)
+
+    df = pd.DataFrame({
+        'Date': _bar_dates(rows, freq, end),
+        'Open': open_,
+        'High': high,
+        'Low': low,
+        'Close': close,
+        'Volume': rng.integers(volume_range[0], volume_range[1], rows)
+    })
+
+    if missing_ratio > 0:
+        keep = rng.random(rows) >= missing_ratio
+        keep[0] = keep[-1] = True
+        df = df[keep].reset_index(drop=True)
+    return df
+
+
+def _bootstrap_returns(rng: np.random.Generator, returns: Optional[Sequence[float]], rows: int,
+                       block_size: int) -> np.ndarray:
+    """按连续区块有放回地抽样历史收益率，返回对数收益率"""
+    if returns is None:
+        raise ValueError("bootstrap 模型需要提供 returns")
+    source = np.asarray(returns, dtype=np.float64)
+    source = np.log1p(source[np.isfinite(source)])
+    if len(source) == 0:
+        raise ValueError("returns 中没有有效的收益率")
+
+    block_size = max(1, min(block_size, len(source)))
+    blocks = -(-rows // block_size)
+    starts = rng.integers(0, len(source) - block_size + 1, blocks)
+    index = (starts[:, None] + np.arange(block_size)).ravel()[:rows]
+    return source[index]
+
+
+def _regime_states(rng: np.random.Generator, rows: int, n_states: int, mean_length: float) -> np.ndarray:
+    """按几何分布的持续期随机切换市场状态，返回每期所处的状态编号"""
+    p = 1.0 / max(mean_length, 1.0)
+    lengths = rng.geometric(p, size=max(16, int(rows * p * 2) + 1))
+    while lengths.sum() < rows:
+        lengths = np.concatenate([lengths, rng.geometric(p, size=len(lengths))])
+    segments = int(np.searchsorted(np.cumsum(lengths), rows)) + 1
+    lengths = lengths[:segments]
+
+    # 相邻区段的状态不同（只有一个状态时全部为0）
+    if n_states > 1:
+        steps = rng.integers(1, n_states, segments)
+        steps[0] = rng.integers(0, n_states)
+        states = np.cumsum(steps) % n_states
+    else:
+        states = np.zeros(segments, dtype=np.int64)
+    return np.repeat(states, lengths)[:rows]
+
+
+def _bar_fraction(freq: str) -> float:
+    """K线时长占一天的比例（日线及更长周期为1）"""
+    try:
+        bar_nanos = pd.tseries.frequencies.to_offset(freq).nanos
+    except ValueError:
+        return 1.0
+    return min(1.0, bar_nanos / _NS_PER_DAY)
+
+
+def _bar_dates(rows: int, freq: str, end) -> pd.DatetimeIndex:
+    end = pd.Timestamp(end if end is not None else datetime.now()).floor('s')
+    offset = pd.tseries.frequencies.to_offset(freq)
+    try:
+        span = offset.nanos * (rows - 1)
+    except ValueError:
+        # 月/工作日等不固定长度的频率，按小于 datetime64[ns] 跨度处理
+        span = 0
+    # datetime64[ns] 只能表示1677年以后的时间，更长的日线序列改用秒精度
+    if span >= end.value - pd.Timestamp.min.value:
+        return pd.date_range(end=end, periods=rows, freq=freq, unit='s')
+    return pd.date_range(end=end, periods=rows, freq=freq)
@@ -1,3 +1,4 @@
+import copy
 import pandas as pd
 import numpy as np
 from ta import add_all_ta_features
@@ -5,11 +6,36 @@ from ta.trend import SMAIndicator, EMAIndicator, MACD
 from ta.momentum import RSIIndicator, StochasticOscillator
 from ta.volatility import BollingerBands, AverageTrueRange
 from ta.volume import MFIIndicator
-from typing import Dict, List
+from typing import Dict, Iterable, List, Optional, Tuple
+from indicator_stream import IndicatorStream
+from indicator_kernels import (MA_PERIODS, SIGNAL_COLUMNS, default_params, indicator_frame, indicator_groups,
+                               resolve_indicators)
+from indicator_sweep import bollinger_sweep, ema_sweep, macd_sweep, rsi_sweep, sma_sweep, stochastic_sweep
+from indicator_cache import FULL, TAIL, IndicatorCache, frame_digest, input_arrays
+from support_resistance import SWING_ORDERS, support_resistance_levels
+from config import Config
+
+# 流式更新时 NaN 指标的默认值，与 calculate_all_indicators 的填充规则一致
+_STREAM_FILL_DEFAULTS = {
+    'RSI': 50,
+    'MACD': 0,
+    'MACD_Signal': 0,
+    'MACD_Diff': 0,
+    'BB_Width': 2,
+    'BB_Pct': 0.5,
+    'Stoch_K': 50,
+    'Stoch_D': 50
+}
 
 class TechnicalAnalyzer:
     def __init__(self):
         self.indicators = {}
+        # numpy：向量化指标内核一次算完全部指标；ta：逐项调用 ta 库
+        self.engine = Config.INDICATOR_ENGINE
+        # 流式指标状态：已提交除最后一根外的全部K线，供 preview_indicators 使用
+        self._stream: Optional[IndicatorStream] = None
+        # update_indicators 的结果缓存和流式指标检查点
+        self.cache = IndicatorCache()
     
     def calculate_moving_averages(self, df: pd.DataFrame, periods: List[int] = [5, 10, 20, 50, 200]) -> pd.DataFrame:
         if df.empty:
@@ -97,29 +123,86 @@ class TechnicalAnalyzer:
         
         return df
     
-    def calculate_all_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
+    def sweep_indicators(self, df: pd.DataFrame, sma_periods: Iterable[int] = (), ema_periods: Iterable[int] = (),
+                         rsi_periods: Iterable[int] = (), macd_params: Iterable[Tuple[int, int, int]] = (),
+                         bb_periods: Iterable[int] = (), bb_dev: float = 2, stoch_periods: Iterable[int] = (),
+                         stoch_smooth: int = 3) -> Dict[str, np.ndarray]:
+        """
+        批量计算多组参数下的指标，用于调参
+        
+        每类指标返回 len(df) × 参数个数 的二维数组，第 j 列对应传入的第 j 个参数
+        （macd_params 为 (fast, slow, signal) 列表），键为 SMA、EMA、RSI、MACD、
+        MACD_Signal、MACD_Diff、BB_Mid、BB_Std、BB_High、BB_Low、BB_Width、BB_Pct、
+        Stoch_K、Stoch_D；未传参数的指标不计算。结果按日期排序，不填充 NaN。
+        """
+        if df.empty:
+            return {}
+        
+        df = df.sort_values('Date')
+        high, low, close = df['High'].to_numpy(), df['Low'].to_numpy(), df['Close'].to_numpy()
+        sma_periods, ema_periods, rsi_periods, macd_params, bb_periods, stoch_periods = (
+            list(values) for values in (sma_periods, ema_periods, rsi_periods, macd_params, bb_periods, stoch_periods))
+        result = {}
+        if sma_periods:
+            result['SMA'] = sma_sweep(close, sma_periods)
+        if ema_periods:
+            result['EMA'] = ema_sweep(close, ema_periods)
+        if rsi_periods:
+            result['RSI'] = rsi_sweep(close, rsi_periods)
+        if macd_params:
+            result.update(macd_sweep(close, macd_params))
+        if bb_periods:
+            result.update(bollinger_sweep(close, bb_periods, bb_dev))
+        if stoch_periods:
+            result.update(stochastic_sweep(high, low, close, stoch_periods, stoch_smooth))
+        return result
+    
+    def calculate_all_indicators(self, df: pd.DataFrame, indicators: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """
+        计算技术指标
+        
+        indicators 为需要的列名（如 'RSI'、'MA_Cross_Signal'）或分组名（'moving_averages'、
+        'rsi'、'macd'、'bollinger_bands'、'stochastic'、'atr'），只计算这些指标及其依赖，
+        例如 'MA_Cross_Signal' 会同时计算 SMA_20 和 SMA_50；为 None 时计算全部指标。
+        """
         if df.empty:
             return df
         
+        needed = resolve_indicators(indicators)
+        
         # 确保数据按日期排序
         df = df.sort_values('Date')
         
-        # 计算各个技术指标
-        df = self.calculate_moving_averages(df)
-        df = self.calculate_rsi(df)
-        df = self.calculate_macd(df)
-        df = self.calculate_bollinger_bands(df)
-        df = self.calculate_stochastic(df)
-        df = self.calculate_atr(df)
-        
-        # 计算综合信号
-        df['Overall_Signal'] = (
-            df['MA_Cross_Signal'].fillna(0) * 0.2 +
-            df['RSI_Signal'].fillna(0) * 0.2 +
-            df['MACD_Cross_Signal'].fillna(0) * 0.2 +
-            df['BB_Signal'].fillna(0) * 0.2 +
-            df['Stoch_Signal'].fillna(0) * 0.2
-        )
+        if self.engine == 'numpy':
+            # 需要的指标（含综合信号）写入同一个二维数组，一次拼接到 df
+            frame = indicator_frame(df, indicators=needed)
+            df = pd.concat([df.drop(columns=frame.columns, errors='ignore'), frame], axis=1)
+        else:
+            # 计算各个技术指标（ta 按分组计算，用不到的列之后删除）
+            steps = {
+                'moving_averages': self.calculate_moving_averages,
+                'rsi': self.calculate_rsi,
+                'macd': self.calculate_macd,
+                'bollinger_bands': self.calculate_bollinger_bands,
+                'stochastic': self.calculate_stochastic,
+                'atr': self.calculate_atr
+            }
+            unused = []
+            for group, columns in indicator_groups().items():
+                if set(columns) & set(needed):
+                    df = steps[group](df)
+                    unused += [col for col in columns if col not in needed]
+            
+            # 计算综合信号
+            if 'Overall_Signal' in needed:
+                df['Overall_Signal'] = (
+                    df['MA_Cross_Signal'].fillna(0) * 0.2 +
+                    df['RSI_Signal'].fillna(0) * 0.2 +
+                    df['MACD_Cross_Signal'].fillna(0) * 0.2 +
+                    df['BB_Signal'].fillna(0) * 0.2 +
+                    df['Stoch_Signal'].fillna(0) * 0.2
+                )
+            df = df.drop(columns=unused)
         
         # 智能填充NaN值，避免所有指标都显示为0
         # 对于移动平均线，使用最近的有效值
@@ -127,33 +210,32 @@ class TechnicalAnalyzer:
             if col.startswith('SMA_') or col.startswith('EMA_'):
                 df[col] = df[col].ffill().bfill().fillna(df['Close'])
         
-        # 对于RSI，使用默认值50（中性）
-        df['RSI'] = df['RSI'].fillna(50)
-        
-        # 对于MACD，使用0（中性）
-        df['MACD'] = df['MACD'].fillna(0)
-        df['MACD_Signal'] = df['MACD_Signal'].fillna(0)
-        df['MACD_Diff'] = df['MACD_Diff'].fillna(0)
-        
-        # 对于布林带，使用基于收盘价的默认值
-        df['BB_Mid'] = df['BB_Mid'].fillna(df['Close'])
-        df['BB_High'] = df['BB_High'].fillna(df['Close'] * 1.02)
-        df['BB_Low'] = df['BB_Low'].fillna(df['Close'] * 0.98)
-        df['BB_Width'] = df['BB_Width'].fillna(2)
-        df['BB_Pct'] = df['BB_Pct'].fillna(0.5)
-        
-        # 对于随机指标，使用默认值50（中性）
-        df['Stoch_K'] = df['Stoch_K'].fillna(50)
-        df['Stoch_D'] = df['Stoch_D'].fillna(50)
-        
-        # 对于ATR，使用基于价格范围的默认值
-        df['ATR'] = df['ATR'].fillna((df['High'] - df['Low']).mean())
-        df['ATR_Pct'] = df['ATR_Pct'].fillna(((df['High'] - df['Low']).mean() / df['Close']) * 100)
-        
+        average_range = (df['High'] - df['Low']).mean()
+        defaults = {
+            # 对于RSI，使用默认值50（中性）
+            'RSI': 50,
+            # 对于MACD，使用0（中性）
+            'MACD': 0,
+            'MACD_Signal': 0,
+            'MACD_Diff': 0,
+            # 对于布林带，使用基于收盘价的默认值
+            'BB_Mid': df['Close'],
+            'BB_High': df['Close'] * 1.02,
+            'BB_Low': df['Close'] * 0.98,
+            'BB_Width': 2,
+            'BB_Pct': 0.5,
+            # 对于随机指标，使用默认值50（中性）
+            'Stoch_K': 50,
+            'Stoch_D': 50,
+            # 对于ATR，使用基于价格范围的默认值
+            'ATR': average_range,
+            'ATR_Pct': (average_range / df['Close']) * 100
+        }
         # 对于信号值，使用0（中性）
-        signal_cols = ['MA_Cross_Signal', 'RSI_Signal', 'MACD_Cross_Signal', 'BB_Signal', 'Stoch_Signal']
-        for col in signal_cols:
-            df[col] = df[col].fillna(0)
+        defaults.update({col: 0 for col in SIGNAL_COLUMNS})
+        for col, value in defaults.items():
+            if col in df.columns:
+                df[col] = df[col].fillna(value)
         
         # 最后填充任何剩余的NaN值
         numeric_columns = df.select_dtypes(include=['number']).columns
@@ -161,29 +243,127 @@ class TechnicalAnalyzer:
         
         return df
     
-    def get_support_resistance(self, df: pd.DataFrame, window: int = 20) -> Dict:
+    def update_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        带缓存的增量技术指标计算，结果与 calculate_all_indicators(df) 相同
+        
+        输入（OHLCV 和指标参数）与上次完全相同时直接返回上次的结果；第一处变化
+        在流式指标检查点之后（追加了新K线、最后一根未收盘K线的价格变化、最近几根
+        K线被修订）时，只从检查点重放之后的K线；否则完整计算。最后一根K线只做
+        预览，之后可以用 preview_indicators 按实时报价更新。
+        """
         if df.empty:
-            return {}
+            return df
         
-        recent_df = df.tail(window)
+        if not df['Date'].is_monotonic_increasing:
+            df = df.sort_values('Date')
+        cache = self.cache
+        arrays = input_arrays(df)
+        digest = frame_digest(arrays, {'engine': self.engine, **default_params()})
+        cached = cache.lookup(digest)
+        if cached is not None:
+            return cached
+        
+        start = cache.tail_start(arrays)
+        if start is not None:
+            result, status = self._replay_tail(df, cache.checkpoint_position), TAIL
+        else:
+            result, status = self._full_update(df), FULL
+        cache.store(digest, arrays, result, status)
+        return result
+    
+    def _full_update(self, df: pd.DataFrame) -> pd.DataFrame:
+        """完整计算，并为之后的增量计算建立流式指标检查点"""
+        cache = self.cache
+        result = self.calculate_all_indicators(df)
+        self._stream = IndicatorStream()
+        position = len(df) - cache.tail_window
+        # 检查点之前的K线要足够计算所有指标，重放出的行才与完整计算（含 NaN 填充）一致
+        if position >= max(MA_PERIODS):
+            self._stream.warm_up(df.iloc[:position])
+            cache.checkpoint = copy.deepcopy(self._stream)
+            cache.checkpoint_position = position
+            self._stream.warm_up(df.iloc[position:-1])
+        else:
+            self._stream.warm_up(df.iloc[:-1])
+            cache.checkpoint = None
+            cache.checkpoint_position = 0
+        return result
+    
+    def _replay_tail(self, df: pd.DataFrame, position: int) -> pd.DataFrame:
+        """从检查点重放 position 之后的K线，检查点随之移动到距末尾 tail_window 根处"""
+        cache = self.cache
+        stream = copy.deepcopy(cache.checkpoint)
+        next_checkpoint = max(position, len(df) - cache.tail_window)
+        tail = df.iloc[position:]
+        bars = zip(tail['High'].to_numpy(), tail['Low'].to_numpy(), tail['Close'].to_numpy(),
+                   tail.to_dict('records'))
+        
+        rows = []
+        for i, (high, low, close, record) in enumerate(bars, start=position):
+            if i == next_checkpoint and i != position:
+                cache.checkpoint = copy.deepcopy(stream)
+                cache.checkpoint_position = i
+            if i < len(df) - 1:
+                indicators = stream.update(high, low, close)
+            else:
+                indicators = stream.preview(high, low, close)
+            rows.append({**record, **self._fill_stream_row(indicators, record)})
+        self._stream = stream
+        
+        previous = cache.result
+        tail_frame = pd.DataFrame(rows, index=tail.index).reindex(columns=previous.columns)
+        return pd.concat([previous.iloc[:position], tail_frame])
+    
+    def preview_indicators(self, high: float, low: float, close: float) -> Dict[str, float]:
+        """
+        按实时报价计算当前未收盘K线的指标（每个报价约几十微秒）
         
-        support_levels = []
-        resistance_levels = []
+        需要先调用 update_indicators 建立流式状态，报价K线接在最后一根已提交的K线之后。
+        """
+        if self._stream is None:
+            return {}
+        bar = pd.Series({'High': high, 'Low': low, 'Close': close})
+        return self._fill_stream_row(self._stream.preview(high, low, close), bar)
+    
+    @staticmethod
+    def _fill_stream_row(indicators: Dict[str, float], bar) -> Dict[str, float]:
+        """按 calculate_all_indicators 的规则填充流式结果中的 NaN"""
+        close = bar['Close']
+        defaults = {
+            **_STREAM_FILL_DEFAULTS,
+            'BB_Mid': close,
+            'BB_High': close * 1.02,
+            'BB_Low': close * 0.98
+        }
+        filled = {}
+        for col, value in indicators.items():
+            if pd.isna(value):
+                if col.startswith('SMA_') or col.startswith('EMA_'):
+                    value = close
+                else:
+                    value = defaults.get(col, 0)
+            filled[col] = value
+        return filled
+    
+    def get_support_resistance(self, df: pd.DataFrame, window: int = 20,
+                               orders: Iterable[int] = SWING_ORDERS, tolerance: Optional[float] = None,
+                               max_zones: int = 10) -> Dict:
+        """
+        支撑阻力位
+        
+        在全部历史上按多个窗口（orders）识别摆动高/低点并聚合为价格区间，
+        support/resistance 为当前价格下方/上方触及次数最多的区间，zones 为排名前
+        max_zones 的区间明细。找不到时按最近 window 根K线的价格范围估算。
+        """
+        if df.empty:
+            return {}
         
-        for i in range(2, len(recent_df) - 2):
-            if (recent_df.iloc[i]['Low'] < recent_df.iloc[i-1]['Low'] and 
-                recent_df.iloc[i]['Low'] < recent_df.iloc[i-2]['Low'] and
-                recent_df.iloc[i]['Low'] < recent_df.iloc[i+1]['Low'] and
-                recent_df.iloc[i]['Low'] < recent_df.iloc[i+2]['Low']):
-                support_levels.append(recent_df.iloc[i]['Low'])
-            
-            if (recent_df.iloc[i]['High'] > recent_df.iloc[i-1]['High'] and 
-                recent_df.iloc[i]['High'] > recent_df.iloc[i-2]['High'] and
-                recent_df.iloc[i]['High'] > recent_df.iloc[i+1]['High'] and
-                recent_df.iloc[i]['High'] > recent_df.iloc[i+2]['High']):
-                resistance_levels.append(recent_df.iloc[i]['High'])
+        recent_df = df.tail(window)
+        support_levels, resistance_levels, zones = support_resistance_levels(df, orders, tolerance,
+                                                                             max_zones=max_zones)
         
-        current_price = df.iloc[-1]['Close']
+        current_price = df['Close'].iloc[-1]
         
         # 如果没有找到支撑和阻力位，使用基于移动平均线和价格范围的默认值
         if not support_levels:
@@ -207,5 +387,6 @@ class TechnicalAnalyzer:
         return {
             'support': sorted(set(support_levels))[-3:] if support_levels else [],
             'resistance': sorted(set(resistance_levels))[:3] if resistance_levels else [],
-            'current_price': current_price
+            'current_price': current_price,
+            'zones': zones
         }
@@ -0,0 +1,123 @@
+import time
+import warnings
+
+import numpy as np
+
+import backtest as bt
+from synthetic_market import generate_ohlc
+from technical_analysis import TechnicalAnalyzer
+
+warnings.simplefilter('ignore', RuntimeWarning)
+
+
+def loop_backtest(close, signal, threshold, mode, cost_bps, long_only):
+    """逐根K线的参考实现：返回净值和逐笔交易收益"""
+    cost = cost_bps / 10000.0
+    equity, position, target = 1.0, 0, 0
+    curve, trades = [], []
+    trade_value = None
+    for t in range(len(close)):
+        # 第 t-1 根收盘时按目标仓位调仓
+        if target != position:
+            if position != 0:
+                trade_value *= 1 - cost
+                trades.append(trade_value - 1)
+                trade_value = None
+            equity *= (1 - cost) ** abs(target - position)
+            if target != 0:
+                trade_value = 1 - cost
+            position = target
+        if t > 0 and position != 0:
+            growth = 1 + position * (close[t] / close[t - 1] - 1)
+            equity *= growth
+            trade_value *= growth
+        curve.append(equity)
+
+        value = signal[t]
+        if value >= threshold:
+            new = 1
+        elif value <= -threshold:
+            new = -1
+        else:
+            new = target if mode == 'hold' else 0
+        if long_only:
+            new = max(new, 0)
+        target = new
+    if trade_value is not None:
+        trades.append(trade_value - 1)
+    return np.array(curve), np.array(trades)
+
+
+def test_signal_positions():
+    signals = np.array([0.0, 0.6, 0.2, 0.0, -0.4, -0.2, np.nan, 0.8])
+    assert bt.signal_positions(signals).tolist() == [0, 1, 0, 0, -1, 0, 0, 1]
+    assert bt.signal_positions(signals, mode='hold').tolist() == [0, 1, 1, 1, -1, -1, -1, 1]
+    assert bt.signal_positions(signals, mode='hold', long_only=True).tolist() == [0, 1, 1, 1, 0, 0, 0, 1]
+    assert bt.signal_positions(signals, threshold=0.7).tolist() == [0, 0, 0, 0, 0, 0, 0, 1]
+
+    # 多列时每列独立向下填充，不会串到下一列
+    matrix = np.column_stack((signals, -signals))
+    held = bt.signal_positions(matrix, mode='hold')
+    assert held[:, 1].tolist() == [0, -1, -1, -1, 1, 1, 1, -1]
+    try:
+        bt.signal_positions(signals, mode='unknown')
+        assert False, "未知模式应抛出 ValueError"
+    except ValueError:
+        pass
+
+
+def test_matches_per_bar_loop():
+    df = TechnicalAnalyzer().calculate_all_indicators(generate_ohlc(1500, seed=21), indicators=bt.SIGNALS)
+    close = df['Close'].to_numpy()
+    for mode in bt.MODES:
+        for long_only in [False, True]:
+            result = bt.backtest(df, mode=mode, cost_bps=5, long_only=long_only)
+            for j, name in enumerate(bt.SIGNALS):
+                curve, trade_returns = loop_backtest(close, df[name].to_numpy(), 0.4, mode, 5, long_only)
+                label = f'{name} {mode} long_only={long_only}'
+                assert np.allclose(result.equity[:, j], curve, rtol=1e-9), label
+                trades = result.trades[result.trades['signal'] == name]
+                assert np.allclose(trades['return'].to_numpy(), trade_returns, rtol=1e-9, atol=1e-12), label
+                metrics = result.metrics.loc[name]
+                assert metrics['trades'] == len(trade_returns), label
+                if len(trade_returns):
+                    assert np.isclose(metrics['hit_rate'], (trade_returns > 0).mean()), label
+            if long_only:
+                assert (result.trades['direction'] > 0).all()
+
+    # 买入持有基准：第一根收盘买入，只付一次开仓成本
+    result = bt.backtest(df, signals=['RSI_Signal'], cost_bps=5)
+    assert np.isclose(result.equity[-1, -1], close[-1] / close[0] * (1 - 5e-4))
+    assert result.metrics.loc[bt.BENCHMARK, 'trades'] == 1
+    assert bool(result.trades['open'].iloc[-1])
+    assert np.allclose(result.returns[2:, -1], close[2:] / close[1:-1] - 1)
+
+
+def test_long_history_speed():
+    analyzer = TechnicalAnalyzer()
+    daily = analyzer.calculate_all_indicators(generate_ohlc(10000, seed=2), indicators=bt.SIGNALS)
+    minute = analyzer.calculate_all_indicators(generate_ohlc(1000000, freq='min', seed=3), indicators=bt.SIGNALS)
+
+    def timed(df, **kwargs):
+        bt.backtest(df, **kwargs)
+        start = time.perf_counter()
+        bt.backtest(df, **kwargs)
+        return time.perf_counter() - start
+
+    daily_time = timed(daily, cost_bps=2)
+    minute_time = timed(minute, mode='hold', cost_bps=2)
+    print(f"约 40 年日线 x {len(bt.SIGNALS) + 1} 个信号: {daily_time * 1e3:.2f} 毫秒")
+    print(f"100 万根分钟线 x {len(bt.SIGNALS) + 1} 个信号: {minute_time:.3f} 秒")
+    assert daily_time < 0.1
+    # 留出共享测试机的波动余量
+    assert minute_time < 2.0
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("信号回测测试")
+    print("=" * 60)
+    test_signal_positions()
+    test_matches_per_bar_loop()
+    test_long_history_speed()
+    print("所有测试通过")
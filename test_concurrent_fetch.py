@@ -0,0 +1,70 @@
+import time
+import pandas as pd
+from data_fetcher import GoldDataFetcher
+from fixtures import make_fetcher, make_price_df
+
+
+def make_delayed_fetcher(delays: dict) -> GoldDataFetcher:
+    """构造一个数据源延迟可控的 fetcher（不访问网络）"""
+    fetcher = make_fetcher(sources=delays.keys(), source_timeout=2.0, fetch_deadline=3.0)
+
+    def fake_fetch(source, period):
+        delay, df = delays[source]
+        time.sleep(delay)
+        return df
+
+    fetcher._fetch_from_source = fake_fetch
+    return fetcher
+
+
+def test_concurrent_fetch_returns_first_high_quality_result():
+    good = make_price_df()
+    fetcher = make_delayed_fetcher({
+        'slow': (1.5, make_price_df()),
+        'fast': (0.1, good),
+    })
+
+    start = time.monotonic()
+    df, score = fetcher._fetch_sources_concurrently(['slow', 'fast'], 100)
+    elapsed = time.monotonic() - start
+
+    print(f"并发获取耗时: {elapsed:.2f}秒, 质量分数: {score}")
+    assert df is good
+    assert score >= 90
+    assert elapsed < 1.0
+
+
+def test_concurrent_fetch_ignores_sources_past_their_deadline():
+    fetcher = make_delayed_fetcher({
+        'hung': (5.0, make_price_df()),
+        'empty': (0.05, pd.DataFrame()),
+    })
+
+    start = time.monotonic()
+    df, score = fetcher._fetch_sources_concurrently(['hung', 'empty'], 100)
+    elapsed = time.monotonic() - start
+
+    print(f"超时场景耗时: {elapsed:.2f}秒")
+    assert df.empty
+    assert score == 0
+    assert elapsed < 2.5
+
+
+def test_concurrent_fetch_keeps_best_valid_result_when_none_reaches_90():
+    small = make_price_df(8)  # 数据量不足，质量分数 85
+    fetcher = make_delayed_fetcher({
+        'small': (0.05, small),
+        'broken': (0.05, None),
+    })
+
+    df, score = fetcher._fetch_sources_concurrently(['small', 'broken'], 100)
+
+    assert df is small
+    assert 60 <= score < 90
+
+
+if __name__ == "__main__":
+    test_concurrent_fetch_returns_first_high_quality_result()
+    test_concurrent_fetch_ignores_sources_past_their_deadline()
+    test_concurrent_fetch_keeps_best_valid_result_when_none_reaches_90()
+    print("并发获取测试完成")
@@ -0,0 +1,82 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import backend_optimized
+from config import Config
+
+
+def test_backend_import_defers_heavy_dependencies():
+    code = ("import sys, backend_optimized; "
+            "print('loaded=' + ','.join(m for m in ('pandas', 'sklearn', 'ta', 'akshare', 'psutil') if m in sys.modules)); "
+            "print('import_s=' + str(backend_optimized.startup_metrics['import_s']))")
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, timeout=60,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    lines = dict(line.split('=', 1) for line in result.stdout.splitlines() if '=' in line)
+    loaded, import_s = lines['loaded'], lines['import_s']
+    print(f"导入耗时: {import_s}s, 已加载的重依赖: {loaded or '无'}")
+    assert loaded == ''
+    assert float(import_s) > 0
+
+
+def test_snapshot_restore_serves_requests_before_first_update():
+    cache_dir = tempfile.mkdtemp()
+    original_file = Config.BACKEND_SNAPSHOT_FILE
+    original_run_update = backend_optimized._run_update
+    saved_cache = dict(backend_optimized.data_cache)
+    Config.BACKEND_SNAPSHOT_FILE = os.path.join(cache_dir, 'snapshot.pkl.gz')
+    try:
+        backend_optimized.data_cache.update({
+            'price_data': [{'Date': '2026-01-01', 'Close': 2650.0}],
+            'realtime_price': {'price': 2651.0},
+            'last_update': '2026-01-01T08:00:00'
+        })
+        backend_optimized._save_snapshot()
+        for key in list(backend_optimized.data_cache):
+            backend_optimized.data_cache[key] = None
+
+        # 后台刷新很慢时，接口仍应立即返回快照数据
+        updates = []
+
+        def slow_update():
+            updates.append(time.time())
+            time.sleep(2)
+
+        backend_optimized._run_update = slow_update
+        backend_optimized.start_background_startup()
+        assert backend_optimized._startup_ready.wait(timeout=5)
+
+        client = backend_optimized.app.test_client()
+        start = time.perf_counter()
+        response = client.get('/api/price')
+        elapsed = time.perf_counter() - start
+        assert response.status_code == 200
+        assert response.get_json()['data'][0]['Close'] == 2650.0
+        assert elapsed < 1.5
+
+        startup = backend_optimized.startup_metrics
+        print(f"启动耗时: {startup}")
+        assert startup['mode'] == 'fast'
+        assert startup['restore_s'] is not None
+        assert startup['restored_snapshot_time'] == '2026-01-01T08:00:00'
+        assert startup['first_ready_s'] is not None
+
+        time.sleep(0.2)
+        assert len(updates) == 1  # 后台刷新已开始
+    finally:
+        Config.BACKEND_SNAPSHOT_FILE = original_file
+        backend_optimized._run_update = original_run_update
+        backend_optimized.data_cache.update(saved_cache)
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("快速启动测试")
+    print("=" * 60)
+    test_backend_import_defers_heavy_dependencies()
+    test_snapshot_restore_serves_requests_before_first_update()
+    print("所有测试通过")
@@ -0,0 +1,74 @@
+import threading
+import time
+import pandas as pd
+from datetime import datetime
+from fetch_context import FetchContext, memoized
+from fixtures import make_fetcher, make_price_df
+
+
+def test_memoized_runs_once_per_context_and_single_flights():
+    calls = []
+
+    def slow_fetch():
+        calls.append(threading.current_thread().name)
+        time.sleep(0.2)
+        return {'price': 2650.0}
+
+    with FetchContext('test') as context:
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(context.get_or_fetch('quote', slow_fetch)))
+                   for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        results.append(memoized('quote', slow_fetch))
+
+    assert len(calls) == 1
+    assert all(r == {'price': 2650.0} for r in results)
+    # 调用方拿到的是副本
+    results[0]['price'] = 0
+    assert results[1]['price'] == 2650.0
+    assert context.stats()['hits'] == 5
+
+    # 离开周期后不再去重
+    memoized('quote', slow_fetch)
+    assert len(calls) == 2
+
+
+def test_update_cycle_fetches_each_upstream_once():
+    fetcher = make_fetcher(incremental_fetch=False)
+    fetcher._load_from_cache = lambda: pd.DataFrame()
+    fetcher._save_to_cache = lambda df: None
+
+    calls = {'historical': 0, 'realtime': 0}
+
+    def fake_fetch(source, period):
+        calls['historical'] += 1
+        return make_price_df(end=datetime.now() - pd.Timedelta(days=1))
+
+    def failing_realtime(source):
+        calls['realtime'] += 1
+        return {}
+
+    fetcher._fetch_from_source = fake_fetch
+    fetcher._fetch_realtime_from_source = failing_realtime
+    fetcher.realtime_race = False
+
+    with FetchContext('update_data'):
+        # 与 update_data 相同的调用顺序：实时源全部失败时会回退到历史数据
+        df = fetcher.get_latest_data()
+        realtime = fetcher.fetch_realtime_price()
+
+    print(f"历史数据请求 {calls['historical']} 次, 实时数据源请求 {calls['realtime']} 次")
+    assert calls['historical'] == 1
+    assert calls['realtime'] == len(fetcher.realtime_sources)
+    assert realtime['price'] == float(df['Close'].iloc[-2])
+    # get_latest_data 对返回数据的修改不影响周期内缓存
+    assert 'Daily_Return' in df.columns
+
+
+if __name__ == "__main__":
+    test_memoized_runs_once_per_context_and_single_flights()
+    test_update_cycle_fetches_each_upstream_once()
+    print("请求去重测试完成")
@@ -0,0 +1,249 @@
+import gzip
+import os
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+from fixtures import LocalHandler, make_fetcher, start_server, stop_server
+from http_cache import HttpResponseCache, parse_cache_ttls
+from http_client import HttpClient
+
+
+class GraphHandler(LocalHandler):
+    version = 1
+    full_responses = 0
+    not_modified = 0
+
+    def do_GET(self):
+        etag = f'"v{GraphHandler.version}"'
+        if self.headers.get('If-None-Match') == etag:
+            GraphHandler.not_modified += 1
+            self.send_body(304, b'', {'ETag': etag})
+            return
+
+        GraphHandler.full_responses += 1
+        body = ('{"gold": {"prices": [[1, 2650.0, 2660.0, 2640.0, 2655.0]], "version": %d}}'
+                % GraphHandler.version).encode('utf-8')
+        self.send_body(200, body, {'Content-Type': 'application/json', 'ETag': etag})
+
+
+def start_graph_server():
+    GraphHandler.version = 1
+    GraphHandler.full_responses = 0
+    GraphHandler.not_modified = 0
+    return start_server(GraphHandler, '/graph/kitco-gold.json')
+
+
+def test_conditional_get_returns_cached_body_on_304():
+    cache_dir = tempfile.mkdtemp()
+    server, url = start_graph_server()
+    try:
+        cache = HttpResponseCache(cache_dir, default_ttl=0)
+        client = HttpClient(timeout=5, max_retries=0, cache=cache, use_cache=True)
+
+        first = client.get(url, params={'apikey': 'secret-key'})
+        second = client.get(url, params={'apikey': 'secret-key'})
+        assert first.json() == second.json()
+        assert GraphHandler.full_responses == 1
+        assert GraphHandler.not_modified == 1
+
+        # 上游数据变化后重新下载
+        GraphHandler.version = 2
+        third = client.get(url, params={'apikey': 'secret-key'})
+        assert third.json()['gold']['version'] == 2
+        assert GraphHandler.full_responses == 2
+
+        stats = client.stats()[url.split('/')[2]]
+        print(f"缓存统计: {stats}")
+        assert stats['not_modified'] == 1
+
+        # 响应体压缩保存，文件中不包含 API key
+        files = [f for f in os.listdir(cache_dir) if f.endswith('.gz')]
+        assert len(files) == 1
+        with open(os.path.join(cache_dir, files[0]), 'rb') as f:
+            raw = f.read()
+        content = gzip.decompress(raw)
+        assert b'secret-key' not in content
+        assert b'"version": 2' in content
+
+        # 新的客户端（如进程重启后）从磁盘读取缓存并继续发送条件请求
+        client = HttpClient(timeout=5, max_retries=0, cache=HttpResponseCache(cache_dir), use_cache=True)
+        assert client.get(url, params={'apikey': 'secret-key'}).json()['gold']['version'] == 2
+        assert GraphHandler.full_responses == 2
+        assert GraphHandler.not_modified == 2
+    finally:
+        stop_server(server)
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def test_ttl_hit_skips_network_until_expired():
+    cache_dir = tempfile.mkdtemp()
+    server, url = start_graph_server()
+    try:
+        host = url.split('/')[2]
+        cache = HttpResponseCache(cache_dir, ttls={f'{host}/graph/': 60})
+        client = HttpClient(timeout=5, max_retries=0, cache=cache, use_cache=True)
+
+        for _ in range(5):
+            assert client.get(url).status_code == 200
+        assert GraphHandler.full_responses == 1
+        assert GraphHandler.not_modified == 0
+        assert client.stats()[host]['cache_hits'] == 4
+
+        # cache_ttl=0 强制重新验证
+        client.get(url, cache_ttl=0)
+        assert GraphHandler.not_modified == 1
+    finally:
+        stop_server(server)
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def test_ttl_rules_match_most_specific_endpoint():
+    cache = HttpResponseCache(tempfile.mkdtemp(), ttls=parse_cache_ttls('www.kitco.com/graph/=60'))
+    try:
+        assert cache.ttl_for('https://www.kitco.com/graph/kitco-gold.json') == 60
+        assert cache.ttl_for('https://www.kitco.com/news/') == 300
+        assert cache.ttl_for('https://www.investing.com/commodities/gold-news') == 300
+        assert cache.ttl_for('https://www.investing.com/commodities/gold-historical-data') == 900
+        assert cache.ttl_for('https://www.alphavantage.co/query?apikey=x&function=TIME_SERIES_DAILY&symbol=XAU') == 3600
+        assert cache.ttl_for('https://www.alphavantage.co/query?function=GLOBAL_QUOTE&symbol=XAU') == 0
+        assert cache.ttl_for('http://hq.sinajs.cn/list=hf_XAU') == 0
+        assert cache.ttl_for('akshare:futures_foreign_hist') == 900
+        assert cache.ttl_for('https://unknown.example.com/') == 0
+    finally:
+        shutil.rmtree(cache.cache_dir, ignore_errors=True)
+
+
+class ErrorPageHandler(LocalHandler):
+    """依次返回正常数据、以 200 返回的限流提示和验证码页面"""
+    bodies = []
+    requests = 0
+
+    def do_GET(self):
+        ErrorPageHandler.requests += 1
+        content_type, body = ErrorPageHandler.bodies.pop(0)
+        self.send_body(200, body, {'Content-Type': content_type})
+
+
+def test_error_bodies_are_not_cached():
+    cache_dir = tempfile.mkdtemp()
+    ErrorPageHandler.requests = 0
+    ErrorPageHandler.bodies = [
+        ('application/json', b'{"Note": "Thank you for using Alpha Vantage! Our standard API call frequency is 5 calls per minute."}'),
+        ('text/html', b'<html><head><title>Just a moment...</title></head><body>captcha</body></html>'),
+        ('application/json', b'{"Time Series (Daily)": {"2026-01-02": {"4. close": "2650.0"}}}'),
+        ('application/json', b'{"Time Series (Daily)": {}}'),
+    ]
+    server, url = start_server(ErrorPageHandler, '/query')
+    try:
+        host = url.split('/')[2]
+        cache = HttpResponseCache(cache_dir, ttls={f'{host}/query': 3600})
+        client = HttpClient(timeout=5, max_retries=0, cache=cache, use_cache=True)
+        params = {'function': 'TIME_SERIES_DAILY'}
+
+        assert 'Note' in client.get(url, params=params).json()
+        assert b'captcha' in client.get(url, params=params).content
+        assert not os.listdir(cache_dir)
+
+        # 正常数据在有效期内直接使用缓存
+        assert 'Time Series (Daily)' in client.get(url, params=params).json()
+        assert 'Time Series (Daily)' in client.get(url, params=params).json()
+        assert ErrorPageHandler.requests == 3
+
+        # 调用方发现内容无法使用时删除缓存，下次重新下载
+        client.evict(url, params=params)
+        assert not [f for f in os.listdir(cache_dir) if f.endswith('.gz')]
+        assert client.get(url, params=params).json() == {'Time Series (Daily)': {}}
+        assert ErrorPageHandler.requests == 4
+    finally:
+        stop_server(server)
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def test_memory_copies_are_bounded_and_old_files_pruned():
+    cache_dir = tempfile.mkdtemp()
+    server, url = start_graph_server()
+    try:
+        cache = HttpResponseCache(cache_dir, default_ttl=60, max_memory_bytes=300)
+        client = HttpClient(timeout=5, max_retries=0, cache=cache, use_cache=True)
+        for i in range(5):
+            client.get(url, params={'i': i})
+        # 内存中只保留放得下的最近几条
+        body_size = len(next(iter(cache._entries.values())).body)
+        assert len(cache._entries) == 300 // body_size < 5
+        assert cache._memory_bytes <= 300
+        assert 'i=4' in next(reversed(cache._entries))
+
+        # 内存中丢弃的条目仍可从磁盘读取
+        assert client.get(url, params={'i': 0}).json()['gold']['version'] == 1
+        assert GraphHandler.full_responses == 5
+
+        # 超过 max_age 未刷新的文件被删除，cached_call 的文件同样适用
+        cache.cached_call('akshare:futures_foreign_hist', {'symbol': 'GC'}, lambda: pd.DataFrame({'close': [1.0]}))
+        files = sorted(os.listdir(cache_dir))
+        old = time.time() - cache.max_age - 60
+        for name in files[:2]:
+            os.utime(os.path.join(cache_dir, name), (old, old))
+        assert cache.prune() == 2
+        assert sorted(os.listdir(cache_dir)) == files[2:]
+    finally:
+        stop_server(server)
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def test_finnhub_candle_url_is_stable_within_a_day():
+    requests_seen = []
+
+    class FakeHttp:
+        def get(self, url, params=None, **kwargs):
+            requests_seen.append(dict(params))
+            raise ConnectionError('offline')
+
+    fetcher = make_fetcher(finnhub_key='key', http=FakeHttp())
+    fetcher._fetch_finnhub(365)
+    time.sleep(1.1)
+    fetcher._fetch_finnhub(365)
+    assert requests_seen[0] == requests_seen[1]
+    assert requests_seen[0]['from'] % 86400 == 0 and requests_seen[0]['to'] % 86400 == 0
+    assert requests_seen[0]['to'] > time.time()
+
+
+def test_cached_call_reuses_results_within_ttl():
+    cache_dir = tempfile.mkdtemp()
+    try:
+        cache = HttpResponseCache(cache_dir)
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return pd.DataFrame({'date': ['2026-01-01'], 'close': [2650.0]})
+
+        first = cache.cached_call('akshare:futures_foreign_hist', {'symbol': 'GC'}, fetch)
+        second = HttpResponseCache(cache_dir).cached_call('akshare:futures_foreign_hist', {'symbol': 'GC'}, fetch)
+        assert first.equals(second)
+        assert len(calls) == 1
+
+        cache.cached_call('akshare:futures_foreign_hist', {'symbol': 'SI'}, fetch)
+        assert len(calls) == 2
+
+        # 空结果不缓存
+        cache.cached_call('akshare:stock_news_em', {'symbol': '黄金'}, lambda: pd.DataFrame())
+        assert len([f for f in os.listdir(cache_dir) if f.endswith('.pkl.gz')]) == 2
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("HTTP 响应缓存测试")
+    print("=" * 60)
+    test_conditional_get_returns_cached_body_on_304()
+    test_ttl_hit_skips_network_until_expired()
+    test_ttl_rules_match_most_specific_endpoint()
+    test_error_bodies_are_not_cached()
+    test_memory_copies_are_bounded_and_old_files_pruned()
+    test_finnhub_candle_url_is_stable_within_a_day()
+    test_cached_call_reuses_results_within_ttl()
+    print("所有测试通过")
@@ -0,0 +1,126 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import requests
+
+from fixtures import LocalHandler, start_server, stop_server
+from http_cassette import CassetteAdapter, HttpCassette, use_cassette
+from http_client import HttpClient
+
+
+class QuoteHandler(LocalHandler):
+    price = 2650.5
+
+    def do_GET(self):
+        body = f'var hq_str_hf_XAU="{QuoteHandler.price},0.1,2650.4,2650.6,2660.0,2640.0";'.encode('gbk')
+        QuoteHandler.price += 1
+        self.send_body(200, body, {'Content-Type': 'text/plain; charset=gbk'})
+
+
+def record_quotes(path, url, count):
+    """访问本地服务器录制 count 次报价，返回录制到的响应体"""
+    client = HttpClient(timeout=5, max_retries=0)
+    cassette = HttpCassette(path, mode='record')
+    client.set_transport(CassetteAdapter(cassette, client.adapter))
+    bodies = [client.get(url, params={'apikey': 'secret-key'}).text for _ in range(count)]
+    cassette.save()
+    return bodies
+
+
+def test_cassette_replays_recorded_sequence_offline():
+    cache_dir = tempfile.mkdtemp()
+    path = os.path.join(cache_dir, 'quotes.json')
+    try:
+        server, url = start_server(QuoteHandler, '/list=hf_XAU')
+        try:
+            recorded = record_quotes(path, url, 3)
+        finally:
+            stop_server(server)
+
+        # 服务器已关闭，回放不访问网络，按录制顺序循环返回
+        client = HttpClient(timeout=5, max_retries=0)
+        cassette = HttpCassette(path, mode='replay', latency=0)
+        client.set_transport(CassetteAdapter(cassette, client.adapter))
+        replayed = [client.get(url, params={'apikey': 'other-key'}) for _ in range(4)]
+
+        assert [r.text for r in replayed[:3]] == recorded
+        assert replayed[3].text == recorded[0]
+        assert all(r.status_code == 200 for r in replayed)
+        assert replayed[0].encoding == 'gbk'
+        assert cassette.stats()['hits'] == 4
+
+        # API key 不写入 cassette 文件
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        assert 'secret-key' not in content
+        assert len(json.loads(content)['interactions']) == 1
+        print(f"回放结果: {[r.text[:30] for r in replayed]}")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def test_cassette_synthetic_latency_and_missing_requests():
+    cache_dir = tempfile.mkdtemp()
+    path = os.path.join(cache_dir, 'quotes.json')
+    try:
+        server, url = start_server(QuoteHandler, '/list=hf_XAU')
+        try:
+            record_quotes(path, url, 1)
+        finally:
+            stop_server(server)
+
+        client = HttpClient(timeout=5, max_retries=0)
+        cassette = HttpCassette(path, mode='replay', latency=0.05)
+        client.set_transport(CassetteAdapter(cassette, client.adapter))
+
+        start = time.perf_counter()
+        for _ in range(3):
+            client.get(url, params={'apikey': 'x'})
+        elapsed = time.perf_counter() - start
+        print(f"3 次回放耗时: {elapsed:.3f}s")
+        assert elapsed >= 0.15
+
+        # 没有录制的请求在回放模式下直接失败，不会访问网络
+        try:
+            client.get(url + '_other')
+            assert False, '未录制的请求应当失败'
+        except requests.exceptions.ConnectionError:
+            pass
+        assert cassette.stats()['misses'] == 1
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def test_use_cassette_captures_plain_requests_calls():
+    cache_dir = tempfile.mkdtemp()
+    path = os.path.join(cache_dir, 'plain.json')
+    original_get_adapter = requests.Session.get_adapter
+    try:
+        server, url = start_server(QuoteHandler, '/list=hf_XAU')
+        try:
+            # 第三方库（如 akshare）直接调用 requests，同样会被录制
+            with use_cassette(path, mode='record') as cassette:
+                recorded = requests.get(url, timeout=5).text
+            assert cassette.recorded == 1
+        finally:
+            stop_server(server)
+
+        with use_cassette(path, mode='replay', latency=0):
+            assert requests.get(url, timeout=5).text == recorded
+
+        assert requests.Session.get_adapter is original_get_adapter
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("HTTP 录制/回放测试")
+    print("=" * 60)
+    test_cassette_replays_recorded_sequence_offline()
+    test_cassette_synthetic_latency_and_missing_requests()
+    test_use_cassette_captures_plain_requests_calls()
+    print("所有测试通过")
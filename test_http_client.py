@@ -0,0 +1,75 @@
+from concurrent.futures import ThreadPoolExecutor
+from fixtures import LocalHandler, start_server, stop_server
+from http_client import HttpClient
+
+
+class QuoteHandler(LocalHandler):
+    fail_remaining = 0
+
+    def do_GET(self):
+        if QuoteHandler.fail_remaining > 0:
+            QuoteHandler.fail_remaining -= 1
+            self.send_body(503, b'busy')
+        else:
+            self.send_body(200, b'var hq_str_hf_XAU="2650.5,0.1,2650.4,2650.6,2660.0,2640.0";')
+
+
+def test_http_client_reuses_connections():
+    server, url = start_server(QuoteHandler, '/list=hf_XAU')
+    try:
+        client = HttpClient(pool_maxsize=4, timeout=5, max_retries=0)
+        for _ in range(10):
+            assert client.get(url).status_code == 200
+
+        host = url.split('/')[2]
+        stats = client.stats()[host]
+        print(f"连接统计: {stats}")
+        assert stats['requests'] == 10
+        assert stats['errors'] == 0
+        assert stats['connections_opened'] == 1
+        assert stats['connection_reuse_ratio'] == 0.9
+        assert stats['latency_p95_ms'] is not None
+    finally:
+        stop_server(server)
+
+
+def test_http_client_is_thread_safe_and_bounded_per_host():
+    server, url = start_server(QuoteHandler, '/list=hf_XAU')
+    try:
+        client = HttpClient(pool_maxsize=4, timeout=5, max_retries=0)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            codes = list(executor.map(lambda _: client.get(url).status_code, range(40)))
+
+        assert codes == [200] * 40
+        stats = client.stats()[url.split('/')[2]]
+        assert stats['requests'] == 40
+        # 每个线程的 Session 共享同一个连接池
+        assert stats['connections_opened'] < 40
+    finally:
+        stop_server(server)
+
+
+def test_http_client_retries_server_errors_with_backoff():
+    server, url = start_server(QuoteHandler, '/list=hf_XAU')
+    try:
+        QuoteHandler.fail_remaining = 2
+        client = HttpClient(timeout=5, max_retries=2, backoff_factor=0.01)
+        response = client.get(url)
+        assert response.status_code == 200
+
+        QuoteHandler.fail_remaining = 5
+        client = HttpClient(timeout=5, max_retries=1, backoff_factor=0.01)
+        response = client.get(url)
+        # 重试用尽后返回最后一次响应，由调用方按状态码处理
+        assert response.status_code == 503
+        assert client.stats()[url.split('/')[2]]['errors'] == 1
+    finally:
+        QuoteHandler.fail_remaining = 0
+        stop_server(server)
+
+
+if __name__ == "__main__":
+    test_http_client_reuses_connections()
+    test_http_client_is_thread_safe_and_bounded_per_host()
+    test_http_client_retries_server_errors_with_backoff()
+    print("HTTP客户端测试完成")
@@ -0,0 +1,154 @@
+import tempfile
+import time
+import pandas as pd
+from datetime import datetime, timedelta
+from data_fetcher import GoldDataFetcher
+from fixtures import make_fetcher, make_price_df
+
+
+def make_sync_fetcher(cache_dir: str) -> GoldDataFetcher:
+    fetcher = make_fetcher(cache_dir)
+    # 这里测试同步的增量获取，过期缓存不走 stale-while-revalidate
+    fetcher.cache_max_stale_hours = fetcher.cache_expiry_hours
+    return fetcher
+
+
+def expire_cache(fetcher: GoldDataFetcher) -> None:
+    fetcher.price_store.touch(datetime.now().timestamp() - (fetcher.cache_expiry_hours + 1) * 3600)
+
+
+def test_incremental_fetch_appends_only_new_rows():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        fetcher = make_sync_fetcher(cache_dir)
+        start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=59)
+        cached = make_price_df(55, start=start)
+        fetcher._save_to_cache(cached)
+        expire_cache(fetcher)
+
+        # 数据源返回完整历史，增量逻辑应只保留最后缓存日期之后的数据
+        upstream = make_price_df(60, start=start)
+        requested = {}
+
+        def fake_fetch(source, period, since=None):
+            requested['since'] = since
+            return upstream
+
+        fetcher._fetch_from_source = fake_fetch
+
+        validated_sizes = []
+        original_validate = fetcher.validate_data_quality
+
+        def tracking_validate(df):
+            validated_sizes.append(len(df))
+            return original_validate(df)
+
+        fetcher.validate_data_quality = tracking_validate
+
+        df = fetcher.fetch_historical_data()
+
+        assert requested['since'] == cached['Date'].max()
+        assert len(df) == 60
+        assert df['Date'].is_monotonic_increasing
+        # 只验证新数据及少量缓存上下文
+        assert validated_sizes == [fetcher.delta_context_rows + 5]
+
+        on_disk = fetcher._read_cache()
+        assert len(on_disk) == 60
+        assert on_disk['Close'].iloc[-1] == upstream['Close'].iloc[-1]
+        print(f"增量追加后缓存行数: {len(on_disk)}")
+
+
+def test_incremental_fetch_without_new_rows_refreshes_cache_time():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        fetcher = make_sync_fetcher(cache_dir)
+        start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=29)
+        cached = make_price_df(30, start=start)
+        fetcher._save_to_cache(cached)
+        expire_cache(fetcher)
+
+        fetcher._fetch_from_source = lambda source, period, since=None: cached
+
+        df = fetcher.fetch_historical_data()
+
+        assert len(df) == 30
+        assert not fetcher._load_from_cache().empty
+
+
+def test_incremental_fetch_trims_to_configured_window():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        fetcher = make_sync_fetcher(cache_dir)
+        fetcher.historical_days = 50
+        start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=59)
+        fetcher._save_to_cache(make_price_df(50, start=start))
+        expire_cache(fetcher)
+
+        upstream = make_price_df(60, start=start)
+        fetcher._fetch_from_source = lambda source, period, since=None: upstream
+
+        df = fetcher.fetch_historical_data()
+
+        # 合并后只保留最近 50 根，缓存同样被裁剪
+        assert len(df) == 50
+        assert df['Date'].iloc[0] == upstream['Date'].iloc[10]
+        assert df['Date'].iloc[-1] == upstream['Date'].iloc[-1]
+        on_disk = fetcher._read_cache()
+        assert len(on_disk) == 50
+        assert on_disk['Date'].iloc[0] == upstream['Date'].iloc[10]
+
+
+def test_lagging_source_without_new_rows_does_not_win():
+    for concurrent in [False, True]:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            fetcher = make_sync_fetcher(cache_dir)
+            fetcher.data_sources = ['akshare', 'yfinance', 'mock']
+            fetcher.concurrent_fetch = concurrent
+            start = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=59)
+            cached = make_price_df(55, start=start)
+            fetcher._save_to_cache(cached)
+            expire_cache(fetcher)
+
+            # akshare 更新滞后且先返回（只有缓存中已有的数据），yfinance 稍后返回新数据
+            def fake_fetch(source, period, since=None):
+                if source == 'akshare':
+                    return cached
+                time.sleep(0.2)
+                return make_price_df(60, start=start)
+
+            fetcher._fetch_from_source = fake_fetch
+
+            df = fetcher.fetch_historical_data()
+
+            assert len(df) == 60, f"concurrent={concurrent}"
+            assert len(fetcher._read_cache()) == 60
+
+
+def test_incremental_fetch_falls_back_to_full_fetch_when_sources_fail():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        fetcher = make_sync_fetcher(cache_dir)
+        start = datetime.now() - timedelta(days=29)
+        fetcher._save_to_cache(make_price_df(30, start=start))
+        expire_cache(fetcher)
+
+        calls = []
+
+        def failing_fetch(source, period, since=None):
+            calls.append(since)
+            return pd.DataFrame()
+
+        fetcher._fetch_from_source = failing_fetch
+
+        df = fetcher.fetch_historical_data()
+
+        assert df.empty
+        # 先增量尝试，再全量尝试
+        assert calls[0] is not None
+        assert calls[-1] is None
+
+
+if __name__ == "__main__":
+    test_incremental_fetch_appends_only_new_rows()
+    test_incremental_fetch_without_new_rows_refreshes_cache_time()
+    test_incremental_fetch_trims_to_configured_window()
+    test_lagging_source_without_new_rows_does_not_win()
+    test_incremental_fetch_falls_back_to_full_fetch_when_sources_fail()
+    print("增量获取测试完成")
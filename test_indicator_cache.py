@@ -0,0 +1,195 @@
+import os
+import shutil
+import tempfile
+import time
+import warnings
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+import backend_optimized
+import central_bank_reserves
+import data_fetcher
+import predictor
+import sentiment_analysis
+from config import Config
+from indicator_cache import FULL, HIT, TAIL, first_changed_row, frame_digest, input_arrays
+from synthetic_market import generate_ohlc
+from technical_analysis import TechnicalAnalyzer
+
+warnings.simplefilter('ignore', RuntimeWarning)
+
+
+def assert_matches_full(result, df):
+    full = TechnicalAnalyzer().calculate_all_indicators(df.copy())
+    assert list(result.columns) == list(full.columns)
+    assert (result.index == full.index).all()
+    for col in full.select_dtypes(include=['number']).columns:
+        assert np.allclose(result[col].to_numpy(dtype=float), full[col].to_numpy(dtype=float),
+                           rtol=1e-9, atol=1e-8), col
+
+
+def test_digest_and_first_changed_row():
+    df = generate_ohlc(500, seed=5)
+    arrays = input_arrays(df)
+    assert frame_digest(arrays, {'a': 1}) == frame_digest(input_arrays(df.copy()), {'a': 1})
+    assert frame_digest(arrays, {'a': 1}) != frame_digest(arrays, {'a': 2})
+
+    changed = df.copy()
+    changed.loc[changed.index[450], 'Volume'] += 1
+    assert frame_digest(input_arrays(changed)) != frame_digest(arrays)
+    assert first_changed_row(arrays, input_arrays(changed)) == 450
+    assert first_changed_row(arrays, input_arrays(df.iloc[:300])) == 300
+    assert first_changed_row(arrays, input_arrays(df.drop(columns=['Volume']))) == 0
+
+
+def test_unchanged_input_is_a_cache_hit():
+    df = generate_ohlc(2520, seed=1)
+    analyzer = TechnicalAnalyzer()
+    first = analyzer.update_indicators(df.copy())
+    assert analyzer.cache.last_status == FULL
+
+    same = df.copy()
+    start = time.perf_counter()
+    second = analyzer.update_indicators(same)
+    elapsed = time.perf_counter() - start
+    assert analyzer.cache.last_status == HIT
+    assert second is first
+    print(f"缓存命中耗时: {elapsed * 1e3:.3f} 毫秒")
+    assert elapsed < 0.005
+
+    # 换一种引擎时参数不同，不能命中
+    analyzer.engine = 'ta'
+    analyzer.update_indicators(df.copy())
+    assert analyzer.cache.last_status == FULL
+
+
+def test_tail_changes_replay_from_checkpoint():
+    df = generate_ohlc(800, seed=12)
+    analyzer = TechnicalAnalyzer()
+    analyzer.cache.tail_window = 10
+    analyzer.update_indicators(df.iloc[:700].copy())
+
+    # 追加新K线，最后一根按实时报价变化
+    window = df.iloc[:720].copy()
+    window.loc[window.index[-1], ['High', 'Close']] += 4
+    assert_matches_full(analyzer.update_indicators(window), window)
+    assert analyzer.cache.last_status == TAIL
+    assert analyzer.cache.checkpoint_position == 710
+    assert analyzer._stream.bars == 719
+
+    # 修订检查点之后的历史K线
+    revised = window.copy()
+    revised.loc[revised.index[712], 'Close'] -= 3
+    assert_matches_full(analyzer.update_indicators(revised), revised)
+    assert analyzer.cache.last_status == TAIL
+
+    # 修订检查点之前的K线、截短数据时完整计算
+    older = revised.copy()
+    older.loc[older.index[600], 'Close'] += 3
+    assert_matches_full(analyzer.update_indicators(older), older)
+    assert analyzer.cache.last_status == FULL
+    shorter = older.iloc[:715].copy()
+    assert_matches_full(analyzer.update_indicators(shorter), shorter)
+    assert analyzer.cache.last_status == FULL
+    assert analyzer.cache.stats()['tail_updates'] == 2
+
+
+def test_short_history_without_checkpoint():
+    df = generate_ohlc(150, seed=3)
+    analyzer = TechnicalAnalyzer()
+    analyzer.update_indicators(df.iloc[:140].copy())
+    assert analyzer.cache.checkpoint is None
+    assert_matches_full(analyzer.update_indicators(df.copy()), df)
+    assert analyzer.cache.last_status == FULL
+
+
+def test_backend_skips_unchanged_technical_data():
+    cache_dir = tempfile.mkdtemp()
+    # 历史数据截止到昨天，get_latest_data 用实时报价补上今天的K线
+    history = generate_ohlc(300, seed=8, end=datetime.now() - timedelta(days=1))
+
+    class Fetcher(data_fetcher.GoldDataFetcher):
+        def __init__(self):
+            super().__init__(cache_dir=cache_dir)
+            self.price_pyramid_enabled = False
+
+        def fetch_historical_data(self, period=None):
+            return history.copy()
+
+        def fetch_realtime_price(self):
+            return {'success': True, 'price': 2655.0, 'high': 2660.0, 'low': 2650.0, 'volume': 0}
+
+    class Sentiment:
+        def fetch_gold_news(self):
+            return []
+
+        def analyze_news_sentiment(self, news):
+            return pd.DataFrame()
+
+        def calculate_overall_sentiment(self, sentiment_df):
+            return {'avg_compound': 0}
+
+        def analyze_market_fear_greed(self, df):
+            return {'index': 50, 'label': 'Neutral'}
+
+    class Predictor:
+        def train(self, df, sentiment_score):
+            pass
+
+        def ensemble_predict(self, df, days, sentiment_score):
+            return {'success': True}
+
+    class CentralBank:
+        revalidation = None
+
+        def get_central_bank_data(self):
+            return {'success': True, 'data': []}
+
+    analyzer = TechnicalAnalyzer()
+    support_calls = []
+    find_levels = analyzer.get_support_resistance
+
+    def get_support_resistance(df):
+        support_calls.append(len(df))
+        return find_levels(df)
+
+    analyzer.get_support_resistance = get_support_resistance
+    patches = [(data_fetcher, 'GoldDataFetcher', Fetcher), (sentiment_analysis, 'SentimentAnalyzer', Sentiment),
+               (predictor, 'GoldPricePredictor', Predictor),
+               (central_bank_reserves, 'CentralBankGoldReserves', CentralBank),
+               (backend_optimized, '_tech_analyzer', analyzer), (backend_optimized, '_technical_digest', None),
+               (Config, 'BACKEND_SNAPSHOT_FILE', os.path.join(cache_dir, 'snapshot.pkl.gz'))]
+    originals = [(target, name, getattr(target, name)) for target, name, _ in patches]
+    saved_cache = dict(backend_optimized.data_cache)
+    try:
+        for target, name, value in patches:
+            setattr(target, name, value)
+        backend_optimized.update_data()
+        technical_data = backend_optimized.data_cache['technical_data']
+        assert analyzer.cache.last_status == FULL
+        assert len(technical_data) == len(history) + 1
+
+        # 历史数据和报价都没有变化（如周末）：指标缓存命中，不再重新计算支撑阻力位和导出指标
+        backend_optimized.update_data()
+        assert analyzer.cache.last_status == HIT
+        assert backend_optimized.data_cache['technical_data'] is technical_data
+        assert len(support_calls) == 1
+    finally:
+        for target, name, value in originals:
+            setattr(target, name, value)
+        backend_optimized.data_cache.update(saved_cache)
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("技术指标结果缓存测试")
+    print("=" * 60)
+    test_digest_and_first_changed_row()
+    test_unchanged_input_is_a_cache_hit()
+    test_tail_changes_replay_from_checkpoint()
+    test_short_history_without_checkpoint()
+    test_backend_skips_unchanged_technical_data()
+    print("所有测试通过")
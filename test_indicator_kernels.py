@@ -0,0 +1,139 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+import indicator_kernels as kernels
+from synthetic_market import generate_ohlc
+from technical_analysis import TechnicalAnalyzer
+
+warnings.simplefilter('ignore', RuntimeWarning)
+
+
+def assert_close(actual, expected, name: str) -> None:
+    actual = np.asarray(actual, dtype=float)
+    expected = np.asarray(expected, dtype=float)
+    assert np.allclose(actual, expected, rtol=1e-9, atol=1e-8, equal_nan=True), f"{name} 与参考结果不一致"
+
+
+def make_df(rows: int = 2000, seed: int = 8, missing_close: bool = False) -> pd.DataFrame:
+    df = generate_ohlc(rows, seed=seed)
+    # 一段价格不变的K线，覆盖标准差为 0、随机指标 0/0 的情况
+    if rows > 400:
+        df.loc[300:330, ['Open', 'High', 'Low', 'Close']] = 2600.0
+    if missing_close:
+        df.loc[rows // 2, 'Close'] = np.nan
+    return df
+
+
+def test_kernels_match_pandas():
+    df = make_df()
+    close = df['Close']
+    x = close.to_numpy()
+    for window in [1, 3, 14, 20, 200]:
+        assert_close(kernels.sma(x, window), close.rolling(window).mean(), f'SMA_{window}')
+        assert_close(kernels.ema(x, window), close.ewm(span=window, adjust=False, min_periods=window).mean(),
+                     f'EMA_{window}')
+        assert_close(kernels.rolling_extreme(x, window, True), close.rolling(window).max(), f'max_{window}')
+        assert_close(kernels.rolling_extreme(x, window, False), close.rolling(window).min(), f'min_{window}')
+    flat = (close.rolling(20).max() == close.rolling(20).min()).to_numpy()
+    assert_close(kernels.rolling_std(x, 20, flat), close.rolling(20).std(ddof=0), 'std_20')
+
+    # 价格明显漂移、跨越多个分块的长序列，与逐窗口两遍求方差比较（pandas 的在线算法本身也有误差）
+    long_close = generate_ohlc(10000, seed=6, drift=1e-4)['Close'].to_numpy()
+    for window in [2, 20, 33, 200, 5000]:
+        expected = np.full(len(long_close), np.nan)
+        expected[window - 1:] = np.lib.stride_tricks.sliding_window_view(long_close, window).std(axis=1)
+        assert_close(kernels.rolling_std(long_close, window), expected, f'std_{window}_long')
+
+    # 开头带 NaN 的序列（MACD 信号线）
+    with_nan = np.concatenate(([np.nan] * 25, x[25:]))
+    expected = pd.Series(with_nan).ewm(span=9, adjust=False, min_periods=9).mean()
+    assert_close(kernels.ema(with_nan, 9), expected, 'EMA_9_nan')
+
+    # 中间缺失的收盘价：只影响包含它的窗口，之后恢复正常
+    gappy = close.copy()
+    gappy[[150, 700, 701, 1500]] = np.nan
+    g = gappy.to_numpy()
+    for window in [1, 3, 20, 200]:
+        assert_close(kernels.sma(g, window), gappy.rolling(window).mean(), f'SMA_{window}_gap')
+        assert_close(kernels.ema(g, window), gappy.ewm(span=window, adjust=False, min_periods=window).mean(),
+                     f'EMA_{window}_gap')
+    for window in [20, 200]:
+        assert_close(kernels.rolling_std(g, window), gappy.rolling(window).std(ddof=0), f'std_{window}_gap')
+
+
+def test_indicator_array_matches_ta():
+    ta_analyzer = TechnicalAnalyzer()
+    for rows, seed, missing_close in [(60, 1, False), (250, 2, False), (2000, 8, False), (300, 3, True)]:
+        df = make_df(rows, seed, missing_close)
+        expected = df.copy()
+        for step in [ta_analyzer.calculate_moving_averages, ta_analyzer.calculate_rsi, ta_analyzer.calculate_macd,
+                     ta_analyzer.calculate_bollinger_bands, ta_analyzer.calculate_stochastic,
+                     ta_analyzer.calculate_atr]:
+            expected = step(expected)
+
+        columns, values = kernels.compute_indicator_array(df['High'], df['Low'], df['Close'])
+        assert values.shape == (rows, len(columns))
+        for i, name in enumerate(columns):
+            if name != 'Overall_Signal':
+                assert_close(values[:, i], expected[name], name)
+
+
+def test_calculate_all_indicators_engines_agree():
+    numpy_analyzer = TechnicalAnalyzer()
+    numpy_analyzer.engine = 'numpy'
+    ta_analyzer = TechnicalAnalyzer()
+    ta_analyzer.engine = 'ta'
+
+    # 含一根缺失收盘价时两种实现也一致
+    for df in [make_df(1500, 4), make_df(300, 5, missing_close=True)]:
+        fast = numpy_analyzer.calculate_all_indicators(df.copy())
+        reference = ta_analyzer.calculate_all_indicators(df.copy())
+        assert list(fast.columns) == list(reference.columns)
+        for col in reference.select_dtypes(include=['number']).columns:
+            assert_close(fast[col], reference[col], col)
+        for col in kernels.SIGNAL_COLUMNS:
+            assert fast[col].dtype == np.int64
+
+    df = make_df(1500, 4)
+
+    # ta 在K线少于 ATR 周期时会出错，向量化内核可以正常计算
+    short = numpy_analyzer.calculate_all_indicators(df.head(5).copy())
+    assert len(short) == 5
+    assert not short.select_dtypes(include=['number']).isna().any().any()
+
+
+def test_selected_indicators_resolve_dependencies():
+    assert kernels.resolve_indicators(['MA_Cross_Signal']) == ['SMA_20', 'SMA_50', 'MA_Cross_Signal']
+    assert kernels.resolve_indicators('macd') == ['MACD', 'MACD_Signal', 'MACD_Diff', 'MACD_Cross_Signal']
+    assert kernels.resolve_indicators(['BB_Pct']) == ['BB_High', 'BB_Mid', 'BB_Low', 'BB_Pct']
+    assert set(kernels.SIGNAL_COLUMNS) <= set(kernels.resolve_indicators(['Overall_Signal']))
+    try:
+        kernels.resolve_indicators(['VWAP'])
+        assert False, "未知指标应该报错"
+    except ValueError:
+        pass
+
+    df = make_df(1500, 6)
+    for engine in ['numpy', 'ta']:
+        analyzer = TechnicalAnalyzer()
+        analyzer.engine = engine
+        full = analyzer.calculate_all_indicators(df.copy())
+        for indicators in [['RSI', 'MACD'], ['MA_Cross_Signal', 'ATR_Pct'], ['Overall_Signal'], ['stochastic']]:
+            narrow = analyzer.calculate_all_indicators(df.copy(), indicators=indicators)
+            expected = list(df.columns) + kernels.resolve_indicators(indicators)
+            assert list(narrow.columns) == expected, (engine, indicators)
+            for col in kernels.resolve_indicators(indicators):
+                assert_close(narrow[col], full[col], f'{engine} {col}')
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("向量化技术指标内核测试")
+    print("=" * 60)
+    test_kernels_match_pandas()
+    test_indicator_array_matches_ta()
+    test_calculate_all_indicators_engines_agree()
+    test_selected_indicators_resolve_dependencies()
+    print("所有测试通过")
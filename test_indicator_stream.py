@@ -0,0 +1,113 @@
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from indicator_stream import IndicatorStream
+from synthetic_market import generate_ohlc
+from technical_analysis import TechnicalAnalyzer
+
+warnings.simplefilter('ignore', RuntimeWarning)
+
+
+def raw_ta_indicators(df: pd.DataFrame) -> pd.DataFrame:
+    """用 ta 库逐项计算（不做 NaN 填充）"""
+    analyzer = TechnicalAnalyzer()
+    raw = df.copy()
+    raw = analyzer.calculate_moving_averages(raw)
+    raw = analyzer.calculate_rsi(raw)
+    raw = analyzer.calculate_macd(raw)
+    raw = analyzer.calculate_bollinger_bands(raw)
+    raw = analyzer.calculate_stochastic(raw)
+    raw = analyzer.calculate_atr(raw)
+    return raw
+
+
+def assert_frames_close(actual: pd.DataFrame, expected: pd.DataFrame, columns) -> None:
+    for col in columns:
+        a = actual[col].to_numpy(dtype=float)
+        e = expected[col].to_numpy(dtype=float)
+        assert np.allclose(a, e, rtol=1e-9, atol=1e-8, equal_nan=True), f"{col} 与 ta 结果不一致"
+
+
+def test_stream_matches_ta_columns():
+    df = generate_ohlc(1500, seed=11)
+    # 插入一段价格不变的K线，覆盖 0/0 的情况
+    df.loc[300:330, ['Open', 'High', 'Low', 'Close']] = 2600.0
+
+    stream = IndicatorStream()
+    streamed = stream.warm_up(df)
+    expected = raw_ta_indicators(df)
+    columns = [col for col in streamed.columns if col != 'Overall_Signal']
+    assert_frames_close(streamed, expected, columns)
+    assert stream.bars == len(df)
+
+
+def test_preview_does_not_change_state():
+    df = generate_ohlc(300, seed=5)
+    stream = IndicatorStream()
+    stream.warm_up(df.iloc[:-1])
+    last = df.iloc[-1]
+
+    for price in [last['Close'] - 30, last['Close'] + 30]:
+        stream.preview(max(price, last['High']), min(price, last['Low']), price)
+    previewed = stream.preview(last['High'], last['Low'], last['Close'])
+    committed = stream.update(last['High'], last['Low'], last['Close'])
+    for col, value in committed.items():
+        assert np.isclose(previewed[col], value, equal_nan=True), col
+
+
+def test_update_indicators_matches_full_recompute():
+    df = generate_ohlc(600, seed=21)
+    analyzer = TechnicalAnalyzer()
+    analyzer.update_indicators(df.iloc[:400].copy())
+
+    for end in range(401, 600, 37):
+        # 最后一根是未收盘K线，每次更新时价格不同
+        window = df.iloc[:end].copy()
+        window.loc[window.index[-1], 'Close'] += 5
+        window.loc[window.index[-1], 'High'] += 5
+
+        incremental = analyzer.update_indicators(window)
+        full = TechnicalAnalyzer().calculate_all_indicators(window.copy())
+        assert list(incremental.columns) == list(full.columns)
+        numeric = full.select_dtypes(include=['number']).columns
+        assert_frames_close(incremental, full, numeric)
+        assert analyzer._stream.bars == end - 1
+
+    # 历史数据被修改时退回完整计算
+    revised = df.copy()
+    revised.loc[revised.index[100], 'Close'] += 10
+    incremental = analyzer.update_indicators(revised)
+    full = TechnicalAnalyzer().calculate_all_indicators(revised.copy())
+    assert_frames_close(incremental, full, full.select_dtypes(include=['number']).columns)
+
+
+def test_stream_update_is_cheap():
+    df = generate_ohlc(2000, seed=2)
+    stream = IndicatorStream()
+    stream.warm_up(df.iloc[:1000])
+
+    start = time.perf_counter()
+    for high, low, close in zip(df['High'].iloc[1000:], df['Low'].iloc[1000:], df['Close'].iloc[1000:]):
+        stream.update(high, low, close)
+    per_bar = (time.perf_counter() - start) / 1000
+
+    start = time.perf_counter()
+    TechnicalAnalyzer().calculate_all_indicators(df.copy())
+    full = time.perf_counter() - start
+
+    print(f"流式更新每根K线 {per_bar * 1e6:.1f} 微秒，完整重算 {full * 1e3:.1f} 毫秒")
+    assert per_bar < full / 10
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("流式技术指标测试")
+    print("=" * 60)
+    test_stream_matches_ta_columns()
+    test_preview_does_not_change_state()
+    test_update_indicators_matches_full_recompute()
+    test_stream_update_is_cheap()
+    print("所有测试通过")
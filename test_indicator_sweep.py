@@ -0,0 +1,114 @@
+import time
+import warnings
+
+import numpy as np
+
+import indicator_kernels as kernels
+from indicator_sweep import SparseTable
+from synthetic_market import generate_ohlc
+from technical_analysis import TechnicalAnalyzer
+
+warnings.simplefilter('ignore', RuntimeWarning)
+
+
+def make_df(rows: int = 1500, seed: int = 11):
+    df = generate_ohlc(rows, seed=seed)
+    # 一段价格不变的K线，覆盖标准差为 0、随机指标 0/0 的情况
+    df.loc[300:330, ['Open', 'High', 'Low', 'Close']] = 2600.0
+    return df
+
+
+def assert_close(actual, expected, name: str, rtol: float = 1e-9) -> None:
+    assert np.allclose(actual, expected, rtol=rtol, atol=1e-8, equal_nan=True), f"{name} 与逐个参数计算的结果不一致"
+
+
+def reference(df, name: str, **params):
+    columns, values = kernels.compute_indicator_array(df['High'], df['Low'], df['Close'], **params)
+    return values[:, columns.index(name)]
+
+
+def test_sparse_table_matches_rolling_extreme():
+    x = make_df()['Close'].to_numpy()
+    highest = SparseTable(x, 300, is_max=True)
+    lowest = SparseTable(x, 300, is_max=False)
+    for window in [1, 2, 3, 7, 14, 64, 65, 300]:
+        assert_close(highest.rolling(window), kernels.rolling_extreme(x, window, True), f'max_{window}')
+        assert_close(lowest.rolling(window), kernels.rolling_extreme(x, window, False), f'min_{window}')
+
+
+def test_sweep_matches_single_parameter_kernels():
+    df = make_df()
+    x = df['Close'].to_numpy()
+    periods = [2, 5, 14, 21, 50, 200]
+    macd_params = [(12, 26, 9), (5, 35, 5), (8, 21, 9), (26, 12, 9)]
+    result = TechnicalAnalyzer().sweep_indicators(df, sma_periods=periods, ema_periods=periods, rsi_periods=periods,
+                                                  macd_params=macd_params, bb_periods=periods,
+                                                  stoch_periods=periods)
+    for name, values in result.items():
+        assert values.shape[0] == len(df), name
+
+    for j, period in enumerate(periods):
+        assert_close(result['SMA'][:, j], kernels.sma(x, period), f'SMA_{period}')
+        assert_close(result['EMA'][:, j], kernels.ema(x, period), f'EMA_{period}')
+        assert_close(result['RSI'][:, j], reference(df, 'RSI', rsi_period=period), f'RSI_{period}')
+        for name in ['Stoch_K', 'Stoch_D']:
+            assert_close(result[name][:, j], reference(df, name, stoch_period=period), f'{name}_{period}')
+        # 方差用累加和相减，误差略大于逐窗口两遍求方差
+        for name in ['BB_Mid', 'BB_High', 'BB_Low', 'BB_Width']:
+            assert_close(result[name][:, j], reference(df, name, bb_period=period), f'{name}_{period}', rtol=1e-7)
+        pct = reference(df, 'BB_Pct', bb_period=period)
+        assert np.isnan(result['BB_Pct'][:, j]).sum() == np.isnan(pct).sum()
+
+    for j, (fast, slow, signal) in enumerate(macd_params):
+        for name in ['MACD', 'MACD_Signal', 'MACD_Diff']:
+            expected = reference(df, name, macd_fast=fast, macd_slow=slow, macd_signal=signal)
+            assert_close(result[name][:, j], expected, f'{name}_{fast}_{slow}_{signal}')
+
+
+def test_grid_is_much_cheaper_than_per_parameter_calls():
+    df = generate_ohlc(2520, seed=4)
+    analyzer = TechnicalAnalyzer()
+
+    def timed(**grid):
+        analyzer.sweep_indicators(df, **grid)
+        start = time.perf_counter()
+        analyzer.sweep_indicators(df, **grid)
+        return time.perf_counter() - start
+
+    def per_call(method, periods):
+        method(df.copy(), periods[0])
+        start = time.perf_counter()
+        for period in periods:
+            method(df.copy(), period)
+        return (time.perf_counter() - start) / len(periods)
+
+    periods = range(5, 305)
+    small = timed(sma_periods=range(10, 13), bb_periods=range(10, 13), stoch_periods=range(10, 13))
+    large = timed(sma_periods=periods, bb_periods=periods, stoch_periods=periods)
+    macd_grid = [(fast, slow, 9) for fast in range(5, 25) for slow in range(20, 60, 2)]
+    macd = timed(macd_params=macd_grid)
+    rsi = timed(rsi_periods=periods)
+
+    loop = per_call(analyzer.calculate_bollinger_bands, range(10, 20)) + per_call(analyzer.calculate_stochastic,
+                                                                                 range(10, 20))
+    rsi_loop = per_call(analyzer.calculate_rsi, range(10, 20))
+    macd_loop = per_call(lambda frame, fast: analyzer.calculate_macd(frame, fast, 26, 9), range(5, 10))
+
+    print(f"SMA/布林带/随机指标 3 组参数: {small * 1e3:.2f} 毫秒，300 组参数: {large * 1e3:.2f} 毫秒"
+          f"（布林带+随机指标逐个调用每组 {loop * 1e3:.2f} 毫秒）")
+    print(f"MACD {len(macd_grid)} 组参数: {macd * 1e3:.2f} 毫秒（逐个调用每组 {macd_loop * 1e3:.2f} 毫秒）")
+    print(f"RSI 300 组参数: {rsi * 1e3:.2f} 毫秒（逐个调用每组 {rsi_loop * 1e3:.2f} 毫秒）")
+    # 每组参数的边际耗时只有逐个调用的一小部分（留出共享测试机的波动余量）
+    assert large / 300 < loop / 5
+    assert macd / len(macd_grid) < macd_loop / 5
+    assert rsi / 300 < rsi_loop / 5
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("技术指标参数批量扫描测试")
+    print("=" * 60)
+    test_sparse_table_matches_rolling_extreme()
+    test_sweep_matches_single_parameter_kernels()
+    test_grid_is_much_cheaper_than_per_parameter_calls()
+    print("所有测试通过")
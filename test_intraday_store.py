@@ -0,0 +1,97 @@
+import tempfile
+import numpy as np
+import pandas as pd
+from data_fetcher import GoldDataFetcher
+from intraday_store import IntradayBarStore, resample_bars
+
+
+def make_hourly_bars(end: pd.Timestamp, hours: int) -> pd.DataFrame:
+    dates = pd.date_range(end=end.floor('h'), periods=hours, freq='h')
+    close = 2650 + np.arange(hours, dtype=float)
+    return pd.DataFrame({
+        'Date': dates,
+        'Open': close - 0.5,
+        'High': close + 1,
+        'Low': close - 1,
+        'Close': close,
+        'Volume': np.full(hours, 100, dtype=np.int64)
+    })
+
+
+class FakeIntradayFetcher(GoldDataFetcher):
+    """按请求天数返回合成小时K线的 fetcher（不访问网络）"""
+
+    def __init__(self, cache_dir):
+        super().__init__(cache_dir=cache_dir)
+        self.now = pd.Timestamp.now(tz='UTC').tz_localize(None)
+        self.downloads = []
+
+    def _utcnow(self):
+        return self.now
+
+    def _download_intraday_bars(self, interval, days):
+        self.downloads.append((interval, days))
+        return make_hourly_bars(self.now, days * 24)
+
+
+def test_store_appends_only_newer_bars():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        store = IntradayBarStore(cache_dir, 'gold_intraday', backend='npy')
+        end = pd.Timestamp('2026-01-05 12:00')
+        assert store.append('1h', make_hourly_bars(end, 48)) == 48
+        # 重叠部分被忽略，只追加更新的K线
+        assert store.append('1H', make_hourly_bars(end + pd.Timedelta(hours=6), 48)) == 6
+        bars = store.load('60m')
+        assert len(bars) == 54
+        assert bars['Date'].is_unique and bars['Date'].is_monotonic_increasing
+        assert store.load('15m').empty
+
+
+def test_resample_to_coarser_intervals():
+    bars = make_hourly_bars(pd.Timestamp('2026-01-05 23:00'), 48)
+    four_hour = resample_bars(bars, '4h')
+    assert len(four_hour) == 12
+    first = four_hour.iloc[0]
+    assert first['Open'] == bars['Open'].iloc[0]
+    assert first['High'] == bars['High'].iloc[:4].max()
+    assert first['Close'] == bars['Close'].iloc[3]
+    assert first['Volume'] == 400
+
+    daily = resample_bars(bars, '1d')
+    assert len(daily) == 2
+    assert daily['Low'].iloc[1] == bars['Low'].iloc[24:].min()
+
+
+def test_fetch_intraday_downloads_only_the_gap():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        fetcher = FakeIntradayFetcher(cache_dir)
+
+        first = fetcher.fetch_intraday_data('1h')
+        assert fetcher.downloads == [('1h', 5)]
+        # 仍在进行中的K线不写入存储
+        assert (first['Datetime'] + pd.Timedelta(hours=1) <= fetcher.now).all()
+
+        # 下一根K线尚未走完时不会重新下载
+        fetcher.fetch_intraday_data('1h')
+        assert len(fetcher.downloads) == 1
+
+        # 3小时后只下载缺口对应的天数，并追加新的K线
+        fetcher.now = fetcher.now + pd.Timedelta(hours=3)
+        second = fetcher.fetch_intraday_data('1h')
+        assert fetcher.downloads[-1] == ('1h', 1)
+        assert len(second) == len(first) + 3
+
+        # 4h / 1d 由 1h 重采样得到，不单独下载
+        downloads = len(fetcher.downloads)
+        four_hour = fetcher.fetch_intraday_data('4h')
+        daily = fetcher.fetch_intraday_data('1d', days=2)
+        assert len(fetcher.downloads) == downloads
+        assert four_hour['Volume'].sum() == second['Volume'].sum()
+        assert len(daily) <= 3
+
+
+if __name__ == "__main__":
+    test_store_appends_only_newer_bars()
+    test_resample_to_coarser_intervals()
+    test_fetch_intraday_downloads_only_the_gap()
+    print("日内K线存储测试完成")
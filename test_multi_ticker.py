@@ -0,0 +1,77 @@
+import os
+import tempfile
+import time
+import pandas as pd
+from datetime import datetime
+from config import Config
+from data_fetcher import GoldDataFetcher, ticker_cache_name
+from source_health import SourceHealthRegistry
+
+BASE_PRICES = {'XAUUSD=X': 2650.0, 'XAGUSD=X': 31.0, 'XPTUSD=X': 960.0, 'DX-Y.NYB': 104.0}
+
+
+class FakeFetcher(GoldDataFetcher):
+    """各品种数据源延迟固定、价格不同的 fetcher（不访问网络）"""
+
+    def __init__(self, ticker=None, cache_dir='data_cache'):
+        super().__init__(ticker, cache_dir=cache_dir)
+        self.source_health = SourceHealthRegistry()
+        self.concurrent_fetch = False
+
+    def _fetch_from_source(self, source, period, since=None):
+        time.sleep(0.3)
+        base = BASE_PRICES[self.ticker]
+        rows = 60
+        return pd.DataFrame({
+            'Date': pd.date_range(end=datetime.now(), periods=rows),
+            'Open': [base] * rows,
+            'High': [base * 1.01] * rows,
+            'Low': [base * 0.99] * rows,
+            'Close': [base] * rows,
+            'Volume': [0] * rows
+        })
+
+
+def test_fetch_multiple_tickers_in_parallel_with_separate_caches():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        fetcher = FakeFetcher(cache_dir=cache_dir)
+        tickers = list(BASE_PRICES)
+
+        start = time.monotonic()
+        data = fetcher.fetch_multiple_tickers(tickers)
+        elapsed = time.monotonic() - start
+
+        print(f"并行获取 {len(tickers)} 个品种耗时: {elapsed:.2f}秒")
+        assert set(data) == set(tickers)
+        assert elapsed < 0.3 * len(tickers)
+        for ticker, df in data.items():
+            assert df['Close'].iloc[-1] == BASE_PRICES[ticker]
+
+        # 原实例的品种没有被修改，各品种缓存互不覆盖
+        assert fetcher.ticker == Config.GOLD_TICKER
+        cache_names = {ticker_cache_name(t) for t in tickers}
+        assert len(cache_names) == len(tickers)
+        for name in cache_names:
+            assert os.path.exists(os.path.join(cache_dir, name))
+
+        # 再次获取时直接命中各自的缓存
+        silver = FakeFetcher('XAGUSD=X', cache_dir=cache_dir)
+        assert silver._load_from_cache()['Close'].iloc[-1] == BASE_PRICES['XAGUSD=X']
+
+
+def test_sources_without_symbol_are_skipped():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        fetcher = GoldDataFetcher('DX-Y.NYB', cache_dir=cache_dir)
+        assert fetcher.data_sources == ['investing', 'yfinance', 'mock']
+        assert fetcher.realtime_sources == ['yfinance']
+        assert fetcher.historical_kind == 'historical:DX-Y.NYB'
+
+        gold = GoldDataFetcher(cache_dir=cache_dir)
+        assert gold.data_sources == ['akshare', 'kitco', 'investing', 'yfinance', 'mock']
+        assert gold.price_store.path.endswith('gold_price_cache')
+
+
+if __name__ == "__main__":
+    test_fetch_multiple_tickers_in_parallel_with_separate_caches()
+    test_sources_without_symbol_are_skipped()
+    print("多品种获取测试完成")
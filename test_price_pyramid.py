@@ -0,0 +1,108 @@
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from fixtures import make_fetcher
+from price_pyramid import COARSE_LEVELS, LEVEL_PERIODS, PricePyramid, aggregate_bars, choose_level
+from synthetic_market import generate_ohlc
+
+
+def make_daily(rows: int = 800) -> pd.DataFrame:
+    return generate_ohlc(rows, freq='D', end=pd.Timestamp('2024-06-28'), seed=7)
+
+
+def reference_bars(daily: pd.DataFrame, level: str) -> pd.DataFrame:
+    periods = daily['Date'].dt.to_period(LEVEL_PERIODS[level])
+    grouped = daily.groupby(periods).agg(Open=('Open', 'first'), High=('High', 'max'), Low=('Low', 'min'),
+                                         Close=('Close', 'last'), Volume=('Volume', 'sum'))
+    grouped.index = grouped.index.start_time
+    return grouped
+
+
+def assert_same_bars(actual: pd.DataFrame, expected: pd.DataFrame) -> None:
+    assert len(actual) == len(expected)
+    assert (actual['Date'].to_numpy() == expected.index.to_numpy()).all()
+    for column in ['Open', 'High', 'Low', 'Close', 'Volume']:
+        assert np.allclose(actual[column].to_numpy(dtype=float), expected[column].to_numpy(dtype=float))
+
+
+def test_aggregate_matches_pandas_groupby():
+    daily = make_daily()
+    for level in COARSE_LEVELS:
+        bars = aggregate_bars(daily, level)
+        assert_same_bars(bars, reference_bars(daily, level))
+        assert bars['Bars'].sum() == len(daily)
+        print(f"{level}: {len(daily)} 根日线 -> {len(bars)} 根K线")
+
+
+def test_incremental_update_matches_full_rebuild():
+    daily = make_daily()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        pyramid = PricePyramid(cache_dir, 'gold_pyramid', backend='npy')
+        assert not pyramid.update(daily.iloc[:10])
+
+        pyramid.rebuild(daily.iloc[:500])
+        # 分批追加，批次边界落在周/月中间；重复的旧数据会被忽略
+        for start, end in [(500, 503), (498, 517), (517, 518), (518, 800)]:
+            assert pyramid.update(daily.iloc[start:end])
+
+        for level in COARSE_LEVELS:
+            assert_same_bars(pyramid.load(level), reference_bars(daily, level))
+
+
+def test_pending_rows_are_merged_without_writing():
+    daily = make_daily()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        pyramid = PricePyramid(cache_dir, 'gold_pyramid', backend='npy')
+        pyramid.rebuild(daily.iloc[:-1])
+
+        weekly = pyramid.load('1w', pending=daily)
+        assert_same_bars(weekly, reference_bars(daily, '1w'))
+        assert len(pyramid.load('1w')) == len(reference_bars(daily.iloc[:-1], '1w'))
+        assert pyramid.load('1w')['LastDate'].iloc[-1] == daily['Date'].iloc[-2]
+
+
+def test_choose_level():
+    counts = {'1d': 2500, '1w': 520, '1M': 120, '1Q': 40}
+    assert choose_level(counts) == '1d'
+    assert choose_level(counts, resolution='1w') == '1w'
+    assert choose_level(counts, resolution='2w') == '1w'
+    assert choose_level(counts, resolution='month') == '1M'
+    assert choose_level(counts, resolution='1y') == '1Q'
+    assert choose_level(counts, max_points=3000) == '1d'
+    assert choose_level(counts, max_points=400) == '1M'
+    assert choose_level(counts, max_points=10) == '1Q'
+    # 缺失的层不会被选中
+    assert choose_level({'1d': 2500}, resolution='1M') == '1d'
+    try:
+        choose_level(counts, resolution='1h')
+        assert False, '不支持的周期应抛出 ValueError'
+    except ValueError:
+        pass
+
+
+def test_fetcher_maintains_pyramid_with_cache():
+    daily = make_daily()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        fetcher = make_fetcher(cache_dir)
+
+        fetcher._save_to_cache(daily.iloc[:700])
+        fetcher._append_to_cache(daily.iloc[700:])
+        assert fetcher.price_pyramid.root.startswith(cache_dir)
+
+        levels = fetcher.load_price_levels()
+        for level in COARSE_LEVELS:
+            assert_same_bars(levels[level], reference_bars(daily, level))
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("多周期K线金字塔测试")
+    print("=" * 60)
+    test_aggregate_matches_pandas_groupby()
+    test_incremental_update_matches_full_rebuild()
+    test_pending_rows_are_merged_without_writing()
+    test_choose_level()
+    test_fetcher_maintains_pyramid_with_cache()
+    print("所有测试通过")
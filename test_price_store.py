@@ -0,0 +1,155 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from unittest import mock
+from fixtures import make_price_df
+from price_store import create_price_store, migrate_price_store, CSVPriceStore, ColumnarPriceStore
+
+# 固定截止日期，使各次生成的数据完全相同
+END = datetime(2026, 3, 1)
+
+
+def available_backends():
+    backends = ['csv', 'npy']
+    try:
+        import pyarrow  # noqa: F401
+        backends += ['feather', 'parquet']
+    except ImportError:
+        pass
+    return backends
+
+
+def test_price_store_roundtrip_and_append():
+    df = make_price_df(50, end=END)
+    for backend in available_backends():
+        with tempfile.TemporaryDirectory() as cache_dir:
+            store = create_price_store(backend, cache_dir, 'gold_price_cache')
+            assert not store.exists()
+            assert store.load().empty
+
+            store.save(df.head(40))
+            store.append(df.tail(10))
+            loaded = store.load()
+
+            print(f"{backend}: {len(loaded)} 行, Date 类型 {loaded['Date'].dtype}")
+            assert len(loaded) == 50
+            assert pd.api.types.is_datetime64_any_dtype(loaded['Date'])
+            pd.testing.assert_frame_equal(loaded[df.columns], df, check_dtype=False)
+
+
+def test_columnar_store_is_writable_copy_on_write():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        store = create_price_store('npy', cache_dir, 'gold_price_cache')
+        store.save(make_price_df(50, end=END))
+
+        loaded = store.load()
+        loaded.loc[0, 'Close'] = -1.0
+
+        # 修改内存中的数据不影响磁盘文件
+        assert store.load()['Close'].iloc[0] == 2000.0
+
+
+def test_columnar_store_ignores_unfinished_append():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        store = create_price_store('npy', cache_dir, 'gold_price_cache')
+        df = make_price_df(50, end=END)
+        store.save(df)
+
+        # 模拟追加写了一半后进程退出：列文件多出尾部数据，但 meta.json 未更新
+        meta = store._read_meta()
+        with open(store._column_path('Close', meta['generation']), 'ab') as f:
+            f.write(np.array([9999.0]).tobytes())
+        assert len(store.load()) == 50
+
+        store.append(df.tail(1))
+        loaded = store.load()
+        assert len(loaded) == 51
+        assert loaded['Close'].iloc[-1] == df['Close'].iloc[-1]
+
+
+def test_columnar_append_widens_column_instead_of_truncating():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        store = create_price_store('npy', cache_dir, 'gold_price_cache')
+        df = make_price_df(50, end=END)
+        store.save(df)
+        assert store.load()['Volume'].dtype == np.int64
+
+        # 小数成交量不能截断写入整数列
+        extra = make_price_df(51, end=END).tail(1).copy()
+        extra['Volume'] = 1234.75
+        store.append(extra)
+        loaded = store.load()
+        assert len(loaded) == 51
+        assert loaded['Volume'].dtype == np.float64
+        assert loaded['Volume'].iloc[-1] == 1234.75
+        assert (loaded['Volume'].iloc[:50] == 100000).all()
+
+        # 之后同类型的追加仍走原地追加
+        store.append(extra.assign(Close=2100.0))
+        assert store.load()['Close'].iloc[-1] == 2100.0
+        assert len([f for f in os.listdir(store.path) if f.endswith('.bin')]) == 6
+
+
+def test_csv_store_interrupted_append_keeps_file():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        store = CSVPriceStore(cache_dir, 'gold_price_cache')
+        df = make_price_df(50, end=END)
+        store.save(df)
+        with open(store.path, 'rb') as f:
+            before = f.read()
+
+        # 模拟追加写了一半时出错：原文件不应出现半行数据
+        def partial_to_csv(frame, path, **kwargs):
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write('2026-03-02,20')
+            raise OSError('磁盘已满')
+
+        with mock.patch.object(pd.DataFrame, 'to_csv', partial_to_csv):
+            try:
+                store.append(df.tail(1))
+                assert False, '写入失败应抛出异常'
+            except OSError:
+                pass
+        with open(store.path, 'rb') as f:
+            assert f.read() == before
+        assert [f for f in os.listdir(cache_dir)] == ['gold_price_cache.csv']
+
+        store.append(df.tail(1))
+        assert len(store.load()) == 51
+
+
+def test_columnar_store_save_replaces_generation():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        store = create_price_store('npy', cache_dir, 'gold_price_cache')
+        store.save(make_price_df(10, end=END))
+        store.save(make_price_df(20, end=END))
+
+        files = [f for f in os.listdir(store.path) if f.endswith('.bin')]
+        assert len(files) == 6
+        assert len(store.load()) == 20
+
+
+def test_migrate_legacy_csv_keeps_mtime():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        legacy = CSVPriceStore(cache_dir, 'gold_price_cache')
+        legacy.save(make_price_df(50, end=END))
+        legacy.touch(1700000000)
+
+        store = ColumnarPriceStore(cache_dir, 'gold_price_cache')
+        assert migrate_price_store(legacy, store)
+        assert int(store.mtime()) == 1700000000
+        assert len(store.load()) == 50
+        assert not migrate_price_store(legacy, store)
+
+
+if __name__ == "__main__":
+    test_price_store_roundtrip_and_append()
+    test_columnar_store_is_writable_copy_on_write()
+    test_columnar_store_ignores_unfinished_append()
+    test_columnar_append_widens_column_instead_of_truncating()
+    test_csv_store_interrupted_append_keeps_file()
+    test_columnar_store_save_replaces_generation()
+    test_migrate_legacy_csv_keeps_mtime()
+    print("价格存储测试完成")
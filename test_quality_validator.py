@@ -0,0 +1,173 @@
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from data_quality import DataQualityValidator, ISSUE_INVALID_HIGH, ISSUE_INVALID_LOW, ISSUE_MISSING_VALUE
+from fixtures import make_fetcher
+
+
+def legacy_validate(df: pd.DataFrame) -> tuple:
+    """重写前的 validate_data_quality，用于对照"""
+    if df.empty:
+        return False, 0, ['数据为空']
+    issues = []
+    quality_score = 100
+    required_cols = ['Date', 'Open', 'High', 'Low', 'Close']
+    missing_cols = [col for col in required_cols if col not in df.columns]
+    if missing_cols:
+        issues.append(f'缺少必要列: {", ".join(missing_cols)}')
+        quality_score -= 30
+    null_ratio = df.isnull().sum().sum() / (len(df) * len(df.columns))
+    if null_ratio > 0.1:
+        issues.append(f'缺失值过多: {null_ratio*100:.1f}%')
+        quality_score -= 20
+    elif null_ratio > 0.05:
+        issues.append(f'缺失值较多: {null_ratio*100:.1f}%')
+        quality_score -= 10
+    if 'Close' in df.columns:
+        if (df['Close'] <= 0).any():
+            issues.append('存在非正价格')
+            quality_score -= 20
+        if (df['Close'] > 100000).any():
+            issues.append('存在异常高价')
+            quality_score -= 15
+        price_changes = df['Close'].ffill().pct_change().abs()
+        if (price_changes > 0.5).any():
+            issues.append('存在异常价格波动')
+            quality_score -= 10
+    if all(col in df.columns for col in ['High', 'Low', 'Open', 'Close']):
+        invalid_high = (df['High'] < df['Open']) | (df['High'] < df['Close'])
+        if invalid_high.any():
+            issues.append(f'存在{invalid_high.sum()}条数据最高价低于开盘价或收盘价')
+            quality_score -= 10
+        invalid_low = (df['Low'] > df['Open']) | (df['Low'] > df['Close'])
+        if invalid_low.any():
+            issues.append(f'存在{invalid_low.sum()}条数据最低价高于开盘价或收盘价')
+            quality_score -= 10
+    if len(df) < 10:
+        issues.append(f'数据量不足: 仅{len(df)}条')
+        quality_score -= 15
+    if 'Date' in df.columns and len(df) > 1:
+        date_diffs = df['Date'].diff().dt.days
+        if date_diffs.max() > 7:
+            issues.append('数据存在较大时间间隔')
+            quality_score -= 5
+    quality_score = max(0, min(100, quality_score))
+    return quality_score >= 60, quality_score, issues
+
+
+def make_noisy_df(rows: int, seed: int, freq: str = 'D') -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 2000 * np.exp(np.cumsum(rng.normal(0, 0.01, rows)))
+    dates = pd.date_range(end=datetime(2026, 1, 1), periods=rows, freq=freq)
+    df = pd.DataFrame({
+        'Date': dates,
+        'Open': close * (1 + rng.normal(0, 0.003, rows)),
+        'High': close * 1.01,
+        'Low': close * 0.99,
+        'Close': close,
+        'Volume': rng.integers(50000, 150000, rows).astype(float)
+    })
+    # 注入各类问题
+    for col in ['Open', 'High', 'Low', 'Close', 'Volume']:
+        df.loc[rng.choice(rows, rows // 20, replace=False), col] = np.nan
+    df.loc[rng.choice(rows, 3, replace=False), 'High'] = 1.0
+    df.loc[rng.choice(rows, 3, replace=False), 'Low'] = 1e6
+    df.loc[rng.choice(rows, 2, replace=False), 'Close'] = -5.0
+    df.loc[rng.choice(rows, 1), 'Close'] = 200000.0
+    df.loc[rng.choice(rows, 2, replace=False), 'Date'] = pd.NaT
+    gap_at = int(rng.integers(1, rows))
+    df.loc[gap_at:, 'Date'] = df.loc[gap_at:, 'Date'] + pd.Timedelta(days=int(rng.integers(5, 12)))
+    return df
+
+
+def test_validator_matches_legacy_implementation():
+    validator = DataQualityValidator()
+    for seed in range(20):
+        df = make_noisy_df(int(50 + seed * 37), seed)
+        for frame in [df, df.dropna(), df.drop(columns=['Volume']), df.head(8), df.drop(columns=['Date'])]:
+            assert validator.validate(frame).as_tuple() == legacy_validate(frame)
+
+    clean = make_noisy_df(200, 1).dropna()
+    clean['High'] = clean[['Open', 'Close']].max(axis=1) + 1
+    clean['Low'] = clean[['Open', 'Close']].min(axis=1) - 1
+    clean = clean[clean['Close'] > 0]
+    assert validator.validate(clean).as_tuple() == legacy_validate(clean)
+    assert validator.validate(pd.DataFrame()).as_tuple() == (False, 0, ['数据为空'])
+
+
+def test_flags_mark_offending_rows():
+    df = make_noisy_df(100, 7).dropna().reset_index(drop=True)
+    df.loc[5, 'High'] = 1.0
+    df.loc[6, 'Low'] = 1e6
+    report = DataQualityValidator().validate(df)
+    assert report.flags[5] & ISSUE_INVALID_HIGH
+    assert report.flags[6] & ISSUE_INVALID_LOW
+    assert not report.flags[5] & ISSUE_MISSING_VALUE
+
+
+def test_non_datetime_dates_raise_type_error():
+    df = make_noisy_df(20, 3).dropna().reset_index(drop=True)
+    df['Date'] = df['Date'].dt.strftime('%Y-%m-%d')
+    try:
+        DataQualityValidator().validate(df)
+        assert False, '字符串类型的 Date 列应抛出 TypeError'
+    except TypeError:
+        pass
+
+
+def test_incremental_validation_matches_full_validation():
+    validator = DataQualityValidator()
+    for seed in range(10):
+        df = make_noisy_df(300, seed)
+        split = 250 - seed * 7
+        base = validator.validate(df.iloc[:split])
+        appended = validator.validate_appended(base.state.copy(), df.iloc[split:])
+        assert appended.as_tuple() == legacy_validate(df)
+        assert appended.state.rows == len(df)
+        # 衔接处的价格波动和日期间隔同样被检查
+        full_flags = validator.validate(df).flags
+        assert (appended.flags == full_flags[split:]).all()
+
+
+def test_cached_history_is_not_rescanned_after_append():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        fetcher = make_fetcher(cache_dir)
+
+        history = make_noisy_df(200000, 3, freq='h').dropna().reset_index(drop=True)
+        fetcher._save_to_cache(history.iloc[:-5])
+        df = fetcher._read_cache()
+
+        start = time.perf_counter()
+        first = fetcher._validate_cached(df)
+        full_time = time.perf_counter() - start
+
+        fetcher._append_to_cache(history.iloc[-5:])
+        df = fetcher._read_cache()
+
+        scanned = []
+        original_scan = fetcher.quality_validator._scan
+
+        def tracking_scan(frame, state):
+            scanned.append(len(frame))
+            return original_scan(frame, state)
+
+        fetcher.quality_validator._scan = tracking_scan
+        start = time.perf_counter()
+        second = fetcher._validate_cached(df)
+        incremental_time = time.perf_counter() - start
+
+        print(f"完整验证 {full_time*1000:.1f}ms, 增量验证 {incremental_time*1000:.1f}ms")
+        assert scanned == [5]
+        assert second == legacy_validate(df)
+        assert first[1] >= second[1] - 10
+
+
+if __name__ == "__main__":
+    test_validator_matches_legacy_implementation()
+    test_flags_mark_offending_rows()
+    test_non_datetime_dates_raise_type_error()
+    test_incremental_validation_matches_full_validation()
+    test_cached_history_is_not_rescanned_after_append()
+    print("数据质量验证器测试完成")
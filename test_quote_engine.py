@@ -0,0 +1,88 @@
+import time
+from quote_engine import RealtimeQuoteEngine
+
+
+class FakeFetcher:
+    """实时数据源延迟和返回值可控的 fetcher（不访问网络）"""
+
+    def __init__(self, sources):
+        self.sources = sources
+        self.realtime_sources = list(sources.keys())
+
+    def _fetch_realtime_from_source(self, source):
+        delay, price = self.sources[source]
+        time.sleep(delay)
+        if price is None:
+            raise ValueError('upstream error')
+        return {'price': price, 'change': 0.0, 'change_percent': 0.0,
+                'high': price, 'low': price, 'volume': 0, 'timestamp': ''}
+
+
+def test_quote_engine_returns_first_valid_quote():
+    fetcher = FakeFetcher({
+        'sina': (0.6, 2650.0),
+        'alpha_vantage': (0.05, 0),        # 无效报价
+        'finnhub': (0.05, None),           # 请求出错
+        'yfinance': (0.1, 2651.0),
+    })
+    engine = RealtimeQuoteEngine(fetcher, latency_budget=1.0, median_of=1)
+
+    start = time.monotonic()
+    quote = engine.fetch_quote()
+    elapsed = time.monotonic() - start
+
+    print(f"竞速结果: {quote['source']} {quote['price']} ({elapsed:.2f}秒)")
+    assert quote['source'] == 'yfinance'
+    assert quote['price'] == 2651.0
+    assert elapsed < 0.5
+
+
+def test_quote_engine_enforces_latency_budget():
+    fetcher = FakeFetcher({
+        'sina': (3.0, 2650.0),
+        'yfinance': (3.0, 2651.0),
+    })
+    engine = RealtimeQuoteEngine(fetcher, latency_budget=0.3)
+
+    start = time.monotonic()
+    quote = engine.fetch_quote()
+    elapsed = time.monotonic() - start
+
+    assert quote == {}
+    assert elapsed < 0.6
+
+
+def test_quote_engine_median_of_first_n():
+    fetcher = FakeFetcher({
+        'sina': (0.05, 2650.0),
+        'alpha_vantage': (0.1, 2700.0),
+        'finnhub': (0.15, 2652.0),
+        'yfinance': (2.0, 9999.0),
+    })
+    engine = RealtimeQuoteEngine(fetcher, latency_budget=1.0, median_of=3)
+
+    quote = engine.fetch_quote()
+
+    assert quote['price'] == 2652.0
+    assert set(quote['source'].split(',')) == {'sina', 'alpha_vantage', 'finnhub'}
+
+
+def test_quote_engine_median_uses_what_arrived_within_budget():
+    fetcher = FakeFetcher({
+        'sina': (0.05, 2650.0),
+        'alpha_vantage': (0.05, 2654.0),
+        'yfinance': (2.0, 9999.0),
+    })
+    engine = RealtimeQuoteEngine(fetcher, latency_budget=0.3, median_of=3)
+
+    quote = engine.fetch_quote()
+
+    assert quote['price'] == 2652.0
+
+
+if __name__ == "__main__":
+    test_quote_engine_returns_first_valid_quote()
+    test_quote_engine_enforces_latency_budget()
+    test_quote_engine_median_of_first_n()
+    test_quote_engine_median_uses_what_arrived_within_budget()
+    print("实时行情引擎测试完成")
@@ -0,0 +1,140 @@
+import time
+from unittest import mock
+
+import rate_limiter
+from config import Config
+from fixtures import LocalHandler, start_server, stop_server
+from http_client import HttpClient
+from rate_limiter import RateLimiter, RateLimitExceeded, acquire_quota, parse_rate_limits
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class CountingHandler(LocalHandler):
+    requests = 0
+
+    def do_GET(self):
+        CountingHandler.requests += 1
+        self.send_body(200, b'{"c": 2650.0}')
+
+
+def make_limiter(spec, max_wait=2.0):
+    clock = FakeClock()
+    limiter = RateLimiter(parse_rate_limits(spec), max_wait=max_wait, clock=clock.time, sleep=clock.sleep)
+    return limiter, clock
+
+
+def test_bucket_waits_for_short_deficit_and_fails_fast_for_long_one():
+    limiter, clock = make_limiter('finnhub=2/2')
+
+    limiter.acquire('finnhub')
+    limiter.acquire('finnhub')
+    # 第三次需要等待约1秒，在 max_wait 之内
+    limiter.acquire('finnhub')
+    assert abs(sum(clock.sleeps) - 1.0) < 1e-6
+
+    limiter, clock = make_limiter('alpha_vantage=5/60+25/86400')
+    for _ in range(5):
+        limiter.acquire('alpha_vantage')
+    try:
+        limiter.acquire('alpha_vantage')
+        assert False, '配额不足时应立即失败'
+    except RateLimitExceeded as e:
+        print(f"限流: {e}")
+        assert e.provider == 'alpha_vantage'
+        assert abs(e.retry_after - 12.0) < 1e-6
+    assert clock.sleeps == []
+
+    snapshot = limiter.snapshot()['alpha_vantage']
+    print(f"配额统计: {snapshot}")
+    assert snapshot['remaining'] == 0
+    assert snapshot['allowed'] == 5
+    assert snapshot['throttled'] == 1
+    assert snapshot['limits'] == ['5/60s', '25/86400s']
+
+
+def test_daily_quota_outlasts_per_minute_refill():
+    limiter, clock = make_limiter('alpha_vantage=5/60+25/86400')
+    allowed = 0
+    for _ in range(40):
+        try:
+            limiter.acquire('alpha_vantage')
+            allowed += 1
+        except RateLimitExceeded:
+            clock.now += 60
+    # 每分钟配额不断恢复，但每天最多25次
+    assert allowed == 25
+    assert limiter.snapshot()['alpha_vantage']['retry_after_seconds'] > 60
+
+
+def test_unknown_providers_are_not_limited():
+    limiter, _ = make_limiter('finnhub=1/60')
+    for _ in range(10):
+        limiter.acquire(None)
+        limiter.acquire('kitco')
+    assert limiter.provider_for('www.alphavantage.co') == 'alpha_vantage'
+    assert limiter.provider_for('search-api-web.eastmoney.com') == 'eastmoney'
+    assert limiter.provider_for('hq.sinajs.cn') == 'sina'
+    assert limiter.provider_for('example.com') is None
+
+
+def test_http_client_throttles_before_sending():
+    CountingHandler.requests = 0
+    server, url = start_server(CountingHandler, '/api/v1/quote')
+    try:
+        limiter = RateLimiter({'local': [(2, 600)]}, max_wait=0.5, hosts={'127.0.0.1': 'local'})
+        client = HttpClient(timeout=5, max_retries=0, use_cache=False, rate_limiter=limiter)
+
+        assert client.get(url).status_code == 200
+        assert client.get(url).status_code == 200
+        start = time.perf_counter()
+        try:
+            client.get(url)
+            assert False, '超出配额的请求不应发出'
+        except RateLimitExceeded:
+            pass
+        assert time.perf_counter() - start < 0.1
+        assert CountingHandler.requests == 2
+        assert client.stats()[url.split('/')[2]]['throttled'] == 1
+    finally:
+        stop_server(server)
+
+
+def test_acquire_quota_respects_rate_limit_switch():
+    limiter, _ = make_limiter('sina=1/600', max_wait=0)
+    with mock.patch.object(rate_limiter, '_limiter', limiter):
+        with mock.patch.object(Config, 'RATE_LIMIT', False):
+            for _ in range(5):
+                acquire_quota('sina')
+        assert limiter.snapshot()['sina']['allowed'] == 0
+
+        with mock.patch.object(Config, 'RATE_LIMIT', True):
+            acquire_quota('sina')
+            try:
+                acquire_quota('sina')
+                assert False, '启用限流时超出配额应失败'
+            except RateLimitExceeded:
+                pass
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("上游请求限流测试")
+    print("=" * 60)
+    test_bucket_waits_for_short_deficit_and_fails_fast_for_long_one()
+    test_daily_quota_outlasts_per_minute_refill()
+    test_unknown_providers_are_not_limited()
+    test_http_client_throttles_before_sending()
+    test_acquire_quota_respects_rate_limit_switch()
+    print("所有测试通过")
@@ -0,0 +1,115 @@
+import time
+import pandas as pd
+from fixtures import make_fetcher, make_price_df
+from source_health import SourceHealthRegistry, OPEN, HALF_OPEN, CLOSED
+
+
+def test_circuit_opens_after_repeated_failures_and_half_opens():
+    health = SourceHealthRegistry(window=20, failure_threshold=3, cooldown=0.2)
+
+    for _ in range(3):
+        assert health.allow('historical', 'kitco')
+        health.record_failure('historical', 'kitco', 0.5, 'timeout')
+
+    snapshot = health.snapshot()['historical']['kitco']
+    assert snapshot['state'] == OPEN
+    assert snapshot['last_error'] == 'timeout'
+    assert not health.allow('historical', 'kitco')
+
+    # 冷却后只放行一次探测
+    time.sleep(0.25)
+    assert health.allow('historical', 'kitco')
+    assert health.snapshot()['historical']['kitco']['state'] == HALF_OPEN
+    assert not health.allow('historical', 'kitco')
+
+    # 探测失败重新熔断，探测成功则关闭
+    health.record_failure('historical', 'kitco', 0.5, 'timeout')
+    assert health.snapshot()['historical']['kitco']['state'] == OPEN
+    time.sleep(0.25)
+    assert health.allow('historical', 'kitco')
+    health.record_success('historical', 'kitco', 0.1)
+    assert health.snapshot()['historical']['kitco']['state'] == CLOSED
+    assert health.allow('historical', 'kitco')
+
+
+def test_order_prefers_fast_reliable_sources():
+    health = SourceHealthRegistry(window=20, failure_threshold=10, cooldown=60)
+    for _ in range(4):
+        health.record_success('realtime', 'sina', 2.0)
+        health.record_success('realtime', 'yfinance', 0.2)
+        health.record_success('realtime', 'finnhub', 0.1)
+        health.record_failure('realtime', 'finnhub', 0.1, 'HTTP 500')
+    health.record_failure('realtime', 'alpha_vantage', 1.0, 'rate limited')
+
+    # 未调用过的数据源排在最前，成功率为0的排在最后
+    order = health.order('realtime', ['sina', 'alpha_vantage', 'finnhub', 'yfinance', 'new'])
+    print(f"数据源顺序: {order}")
+    assert order == ['new', 'finnhub', 'yfinance', 'sina', 'alpha_vantage']
+
+
+def test_fetch_historical_data_skips_open_circuit():
+    fetcher = make_fetcher(sources=['broken', 'good'], incremental_fetch=False,
+                           source_health=SourceHealthRegistry(failure_threshold=2, cooldown=60))
+    fetcher._load_from_cache = lambda: pd.DataFrame()
+    fetcher._save_to_cache = lambda df: None
+
+    calls = []
+
+    def fake_fetch(source, period):
+        calls.append(source)
+        if source == 'broken':
+            raise ConnectionError('connection refused')
+        return make_price_df()
+
+    fetcher._fetch_from_source = fake_fetch
+
+    # broken 首次失败后被排到 good 之后；good 质量足够高，不再尝试 broken
+    for _ in range(3):
+        assert not fetcher.fetch_historical_data().empty
+    assert calls == ['broken', 'good', 'good', 'good']
+
+    # 连续失败后熔断，即使排在最前也不会再被调用
+    fetcher.data_sources = ['broken', 'mock']
+    fetcher.source_health.record_failure('historical', 'broken', 0.1, 'connection refused')
+    calls.clear()
+    assert fetcher.fetch_historical_data().empty
+    assert calls == []
+    assert fetcher.source_health.snapshot()['historical']['broken']['state'] == OPEN
+
+
+def test_half_open_probe_is_taken_only_when_source_is_called():
+    fetcher = make_fetcher(sources=['good', 'broken'], incremental_fetch=False,
+                           source_health=SourceHealthRegistry(failure_threshold=1, cooldown=0.2))
+    fetcher._load_from_cache = lambda: pd.DataFrame()
+    fetcher._save_to_cache = lambda df: None
+    fetcher.source_health.record_failure('historical', 'broken', 0.1, 'connection refused')
+    time.sleep(0.25)
+
+    calls = []
+
+    def fake_fetch(source, period):
+        calls.append(source)
+        return make_price_df()
+
+    fetcher._fetch_from_source = fake_fetch
+
+    # broken 冷却已结束但排在 good 之后；good 质量足够高，broken 没有被调用
+    for _ in range(2):
+        assert not fetcher.fetch_historical_data().empty
+    assert calls == ['good', 'good']
+    assert fetcher.source_health.snapshot()['historical']['broken']['state'] == OPEN
+    assert fetcher.source_health.order('historical', ['broken']) == ['broken']
+
+    # 真正调用时才进入 half_open，探测成功后关闭
+    fetcher.data_sources = ['broken', 'mock']
+    assert not fetcher.fetch_historical_data().empty
+    assert calls[-1] == 'broken'
+    assert fetcher.source_health.snapshot()['historical']['broken']['state'] == CLOSED
+
+
+if __name__ == "__main__":
+    test_circuit_opens_after_repeated_failures_and_half_opens()
+    test_order_prefers_fast_reliable_sources()
+    test_fetch_historical_data_skips_open_circuit()
+    test_half_open_probe_is_taken_only_when_source_is_called()
+    print("数据源健康测试完成")
@@ -0,0 +1,150 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from central_bank_reserves import CentralBankGoldReserves
+from data_fetcher import GoldDataFetcher
+from fixtures import make_fetcher, make_price_df
+from stale_cache import BackgroundRefresher, EXPIRED, FRESH, STALE, cache_state
+
+
+def today() -> datetime:
+    return datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def age_cache(fetcher: GoldDataFetcher, hours: float) -> None:
+    fetcher.price_store.touch(datetime.now().timestamp() - hours * 3600)
+
+
+def test_cache_state_thresholds():
+    assert cache_state(None, 24, 72) == EXPIRED
+    assert cache_state(10, 24, 72) == FRESH
+    assert cache_state(30, 24, 72) == STALE
+    assert cache_state(80, 24, 72) == EXPIRED
+
+
+def test_refresher_is_single_flight_and_backs_off_after_failure():
+    refresher = BackgroundRefresher(retry_interval=60)
+    release = threading.Event()
+    calls = []
+
+    def slow_refresh():
+        calls.append(1)
+        release.wait(5)
+        return 'ok'
+
+    first = refresher.schedule('prices', slow_refresh)
+    second = refresher.schedule('prices', slow_refresh)
+    assert first is second
+    release.set()
+    assert first.result(timeout=5) == 'ok'
+    assert len(calls) == 1
+
+    def failing_refresh():
+        raise RuntimeError('上游不可用')
+
+    failed = refresher.schedule('news', failing_refresh)
+    try:
+        failed.result(timeout=5)
+    except RuntimeError:
+        pass
+    # 失败后冷却期内不再重试
+    assert refresher.schedule('news', failing_refresh) is None
+
+    stats = refresher.snapshot()
+    print(f"后台刷新统计: {stats}")
+    assert stats['prices']['succeeded'] == 1
+    assert stats['news']['failed'] == 1
+    assert stats['news']['in_progress'] is False
+
+
+def test_stale_price_cache_is_served_immediately_and_refreshed_in_background():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        fetcher = make_fetcher(cache_dir, incremental_fetch=False, refresher=BackgroundRefresher())
+        cached = make_price_df(60, end=today())
+        fetcher._save_to_cache(cached)
+        age_cache(fetcher, fetcher.cache_expiry_hours + 6)
+
+        upstream = make_price_df(60, end=today())
+        upstream['Close'] += 10
+        upstream['High'] += 10
+        upstream['Low'] += 10
+        upstream['Open'] += 10
+        calls = []
+
+        def slow_fetch(source, period, since=None):
+            calls.append(source)
+            time.sleep(0.5)
+            return upstream
+
+        fetcher._fetch_from_source = slow_fetch
+
+        start = time.perf_counter()
+        df = fetcher.fetch_historical_data()
+        elapsed = time.perf_counter() - start
+
+        assert elapsed < 0.4
+        assert df.attrs.get('stale') is True
+        assert df['Close'].iloc[-1] == cached['Close'].iloc[-1]
+        assert fetcher.last_cache_status['state'] == STALE
+
+        # 后台刷新完成后缓存恢复新鲜，再次读取得到新数据
+        fetcher.revalidation.result(timeout=5)
+        assert calls == ['akshare']
+        fresh = fetcher.fetch_historical_data()
+        assert not fresh.attrs.get('stale')
+        assert fresh['Close'].iloc[-1] == upstream['Close'].iloc[-1]
+
+
+def test_cache_beyond_max_staleness_blocks_on_fetch():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        fetcher = make_fetcher(cache_dir, incremental_fetch=False, refresher=BackgroundRefresher())
+        fetcher._save_to_cache(make_price_df(60, end=today()))
+        age_cache(fetcher, fetcher.cache_max_stale_hours + 1)
+
+        upstream = make_price_df(60, end=today())
+        fetcher._fetch_from_source = lambda source, period, since=None: upstream
+
+        df = fetcher.fetch_historical_data()
+        assert not df.attrs.get('stale')
+        assert fetcher.revalidation is None
+        assert fetcher.last_cache_status['state'] == EXPIRED
+
+
+def test_central_bank_serves_stale_data_while_revalidating():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        reserves = CentralBankGoldReserves()
+        reserves.cache_file = os.path.join(cache_dir, 'central_bank_reserves.json')
+        reserves.refresher = BackgroundRefresher()
+        old = {'success': True, 'data': [{'country': '中国'}],
+               'last_update': (datetime.now() - timedelta(hours=20)).isoformat()}
+        with open(reserves.cache_file, 'w', encoding='utf-8') as f:
+            json.dump(old, f)
+
+        new = {'success': True, 'data': [{'country': '中国'}, {'country': '美国'}],
+               'last_update': datetime.now().isoformat()}
+        reserves._fetch_world_gold_council_data = lambda: (time.sleep(0.3), new)[1]
+
+        data = reserves.get_central_bank_data()
+        assert data['stale'] is True
+        assert len(data['data']) == 1
+
+        reserves.revalidation.result(timeout=5)
+        data = reserves.get_central_bank_data()
+        assert 'stale' not in data
+        assert len(data['data']) == 2
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("过期缓存后台刷新测试")
+    print("=" * 60)
+    test_cache_state_thresholds()
+    test_refresher_is_single_flight_and_backs_off_after_failure()
+    test_stale_price_cache_is_served_immediately_and_refreshed_in_background()
+    test_cache_beyond_max_staleness_blocks_on_fetch()
+    test_central_bank_serves_stale_data_while_revalidating()
+    print("所有测试通过")
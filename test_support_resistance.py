@@ -0,0 +1,103 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from support_resistance import cluster_levels, find_swings, price_zones
+from synthetic_market import generate_ohlc
+from technical_analysis import TechnicalAnalyzer
+
+
+def naive_swings(values, order, is_high):
+    result = np.zeros(len(values), dtype=bool)
+    for i in range(order, len(values) - order):
+        neighbours = np.concatenate((values[i - order:i], values[i + 1:i + order + 1]))
+        result[i] = (values[i] > neighbours).all() if is_high else (values[i] < neighbours).all()
+    return result
+
+
+def make_range_market(rows: int = 600, seed: int = 3) -> pd.DataFrame:
+    """在 1900 与 2000 之间来回震荡的行情"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(rows)
+    close = 1950 + 50 * np.sin(t * 2 * np.pi / 40) + rng.normal(0, 2, rows)
+    return pd.DataFrame({
+        'Date': pd.date_range('2023-01-01', periods=rows),
+        'Open': close,
+        'High': close + rng.uniform(1, 4, rows),
+        'Low': close - rng.uniform(1, 4, rows),
+        'Close': close,
+        'Volume': 1000
+    })
+
+
+def test_swings_match_naive_loop():
+    df = generate_ohlc(800, seed=9)
+    for is_high, column in [(True, 'High'), (False, 'Low')]:
+        values = df[column].to_numpy()
+        strength = find_swings(values, orders=(2, 5, 10), is_high=is_high)
+        for order in (2, 5, 10):
+            assert ((strength >= order) == naive_swings(values, order, is_high)).all()
+    # 相等的相邻值不算摆动点
+    assert not find_swings(np.array([1.0, 2.0, 3.0, 3.0, 2.0, 1.0]), orders=(2,)).any()
+
+
+def test_cluster_levels_splits_gaps_and_wide_runs():
+    prices = np.array([100.0, 100.5, 101.0, 105.0, 105.2, 110.0, 110.9, 111.8, 112.7])
+    zones = cluster_levels(prices, tolerance=1.0)
+    assert list(zones[:5]) == [0, 0, 0, 1, 1]
+    # 间距都不超过 tolerance 的一串价格按 2 倍 tolerance 切分
+    assert zones[5] == zones[6] != zones[8]
+
+
+def test_range_market_zones_ranked_by_touches():
+    df = make_range_market()
+    zones = price_zones(df['High'], df['Low'], tolerance=5)
+    assert zones[0]['touches'] >= zones[-1]['touches']
+    top_prices = sorted(zone['price'] for zone in zones[:2])
+    assert abs(top_prices[0] - 1900) < 10
+    assert abs(top_prices[1] - 2000) < 10
+    assert zones[0]['touches'] >= 10
+
+    result = TechnicalAnalyzer().get_support_resistance(df)
+    assert set(result) == {'support', 'resistance', 'current_price', 'zones'}
+    assert all(level < result['current_price'] for level in result['support'])
+    assert all(level > result['current_price'] for level in result['resistance'])
+    assert result['zones'][0]['last_touch'].startswith('20')
+    print(f"支撑: {result['support']}，阻力: {result['resistance']}")
+
+
+def test_falls_back_to_recent_range_without_swings():
+    close = np.linspace(2000, 2100, 60)
+    df = pd.DataFrame({'Date': pd.date_range('2024-01-01', periods=60), 'High': close + 1, 'Low': close - 1,
+                       'Close': close})
+    result = TechnicalAnalyzer().get_support_resistance(df)
+    assert len(result['support']) == 3 and len(result['resistance']) == 3
+    assert result['zones'] == []
+
+
+def test_ten_years_of_data_within_refresh_budget():
+    analyzer = TechnicalAnalyzer()
+    df = analyzer.calculate_all_indicators(generate_ohlc(2520, seed=1))
+    analyzer.get_support_resistance(df)
+    timings = []
+    for _ in range(30):
+        start = time.perf_counter()
+        analyzer.get_support_resistance(df)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    print(f"10年日线支撑阻力计算: {best * 1e3:.3f} 毫秒")
+    # 测试机上约 1 毫秒，留出波动余量
+    assert best < 0.002
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("支撑阻力位测试")
+    print("=" * 60)
+    test_swings_match_naive_loop()
+    test_cluster_levels_splits_gaps_and_wide_runs()
+    test_range_market_zones_ranked_by_touches()
+    test_falls_back_to_recent_range_without_swings()
+    test_ten_years_of_data_within_refresh_budget()
+    print("所有测试通过")
@@ -0,0 +1,81 @@
+import time
+
+import numpy as np
+
+from data_quality import DataQualityValidator
+from fixtures import make_fetcher
+from synthetic_market import generate_ohlc
+
+
+def assert_ohlc_consistent(df):
+    assert (df['High'] >= df[['Open', 'Close']].max(axis=1)).all()
+    assert (df['Low'] <= df[['Open', 'Close']].min(axis=1)).all()
+    assert (df['Low'] > 0).all()
+    assert df['Date'].is_monotonic_increasing
+
+
+def test_generate_ohlc_is_reproducible_and_consistent():
+    a = generate_ohlc(500, seed=7, end='2026-01-01')
+    b = generate_ohlc(500, seed=7, end='2026-01-01')
+    c = generate_ohlc(500, seed=8, end='2026-01-01')
+
+    assert a.equals(b)
+    assert not a['Close'].equals(c['Close'])
+    assert list(a.columns) == ['Date', 'Open', 'High', 'Low', 'Close', 'Volume']
+    assert a['Date'].iloc[-1].strftime('%Y-%m-%d') == '2026-01-01'
+    assert_ohlc_consistent(a)
+
+    is_valid, score, issues = DataQualityValidator().validate(a).as_tuple()
+    print(f"模拟数据质量: {score} {issues}")
+    assert is_valid and score == 100
+
+
+def test_generate_ohlc_regimes_gaps_and_missing_bars():
+    df = generate_ohlc(20000, freq='h', seed=1, regimes=[(0.0, 0.5), (0.0, 3.0)], regime_length=500,
+                       gap_probability=0.01, gap_volatility=0.05, missing_ratio=0.05)
+    assert_ohlc_consistent(df)
+    assert 18500 < len(df) < 19500
+
+    # 高波动状态下收益率的离散程度明显大于低波动状态
+    returns = np.log(df['Close']).diff().abs().rolling(200).mean().dropna()
+    assert returns.max() > 3 * returns.min()
+
+    # 删除的K线在时间轴上留下间隔
+    gaps = df['Date'].diff().dropna()
+    assert (gaps > gaps.min()).sum() > 500
+
+
+def test_generate_ohlc_bootstrap_reuses_source_returns():
+    source = np.array([-0.01, 0.0, 0.01, 0.02])
+    df = generate_ohlc(1000, seed=3, model='bootstrap', returns=source, block_size=2, decimals=None)
+    realized = np.log(df['Close']).diff().dropna().to_numpy()
+    assert np.allclose(np.sort(np.unique(np.round(realized, 10))), np.round(np.log1p(source), 10))
+
+
+def test_generate_ohlc_scales_to_millions_of_bars():
+    start = time.perf_counter()
+    df = generate_ohlc(2_000_000, freq='min', seed=5)
+    elapsed = time.perf_counter() - start
+    print(f"200万条分钟K线生成耗时: {elapsed:.2f}s")
+    assert len(df) == 2_000_000
+    assert_ohlc_consistent(df)
+    assert elapsed < 5
+
+
+def test_mock_source_uses_vectorized_generator():
+    fetcher = make_fetcher()
+    df = fetcher._generate_mock_data()
+    assert len(df) == fetcher.historical_days
+    assert_ohlc_consistent(df)
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("模拟行情生成测试")
+    print("=" * 60)
+    test_generate_ohlc_is_reproducible_and_consistent()
+    test_generate_ohlc_regimes_gaps_and_missing_bars()
+    test_generate_ohlc_bootstrap_reuses_source_returns()
+    test_generate_ohlc_scales_to_millions_of_bars()
+    test_mock_source_uses_vectorized_generator()
+    print("所有测试通过")
@@ -0,0 +1,157 @@
+import threading
+import time
+from unittest import mock
+
+import backend_optimized
+from config import Config
+from tick_stream import TickRingBuffer, TickPoller, format_sse
+
+
+def make_quote(price: float) -> dict:
+    return {'price': price, 'high': price + 1, 'low': price - 1, 'change_percent': 0.1}
+
+
+def test_ring_buffer_overwrites_oldest_and_reads_since_seq():
+    buffer = TickRingBuffer(capacity=4)
+    assert buffer.latest() is None
+    for i in range(6):
+        buffer.append(make_quote(2000.0 + i))
+
+    assert buffer.last_seq == 6
+    assert len(buffer) == 4
+    assert buffer.latest()['price'] == 2005.0
+    # 序号1、2已被覆盖，只能读到仍在缓冲区中的报价
+    assert [t['seq'] for t in buffer.since(0)] == [3, 4, 5, 6]
+    assert [t['price'] for t in buffer.since(4)] == [2004.0, 2005.0]
+    assert buffer.since(6) == []
+
+
+def test_wait_since_wakes_up_on_new_tick():
+    buffer = TickRingBuffer(capacity=8)
+    threading.Timer(0.1, lambda: buffer.append(make_quote(2650.0))).start()
+
+    start = time.monotonic()
+    ticks = buffer.wait_since(0, timeout=2.0)
+    elapsed = time.monotonic() - start
+
+    assert [t['price'] for t in ticks] == [2650.0]
+    assert elapsed < 1.0
+    assert buffer.wait_since(1, timeout=0.05) == []
+
+
+def test_poller_shares_one_upstream_poll_across_streams():
+    prices = iter(2000.0 + i for i in range(1000))
+    calls = []
+
+    def fetch_quote():
+        calls.append(time.monotonic())
+        return make_quote(next(prices))
+
+    poller = TickPoller(fetch_quote, TickRingBuffer(capacity=16), interval=0.05, idle_timeout=0.1)
+    streams = [poller.stream(max_seconds=0.5, keepalive=0.1) for _ in range(3)]
+    received = [[], [], []]
+
+    def consume(index):
+        for event in streams[index]:
+            if event.startswith('id:'):
+                received[index].append(event)
+
+    threads = [threading.Thread(target=consume, args=(i,)) for i in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=2.0)
+
+    print(f"上游请求 {len(calls)} 次，各客户端收到 {[len(r) for r in received]} 条报价")
+    # 三个客户端共享同一个轮询线程：上游请求次数与单个客户端相当
+    assert len(calls) < 20
+    assert all(len(r) >= 3 for r in received)
+
+    # 最后一个订阅者离开后轮询线程自动停止
+    time.sleep(0.3)
+    assert not poller.running
+    assert poller.stats()['subscribers'] == 0
+
+
+def test_subscribe_while_poller_goes_idle_restarts_it():
+    class SlowExitPoller(TickPoller):
+        def _idle(self):
+            idle = super()._idle()
+            if idle:
+                # 放大“判定空闲”到“线程退出”之间的窗口
+                time.sleep(0.1)
+            return idle
+
+    poller = SlowExitPoller(lambda: make_quote(2650.0), TickRingBuffer(capacity=16), interval=0.01,
+                            idle_timeout=0.0)
+    poller.subscribe()
+    assert poller.buffer.wait_since(0, timeout=1.0)
+    poller.unsubscribe()
+
+    # 轮询线程判定空闲、尚未退出时有新的订阅者
+    time.sleep(0.05)
+    last_seq = poller.buffer.last_seq
+    poller.subscribe()
+    try:
+        assert poller.buffer.wait_since(last_seq, timeout=1.0), "新订阅者没有收到报价"
+    finally:
+        poller.unsubscribe()
+    poller.stop()
+    assert not poller.running
+
+
+def test_open_stream_caps_concurrent_clients():
+    poller = TickPoller(lambda: make_quote(2650.0), TickRingBuffer(capacity=8), interval=0.05, idle_timeout=0.1)
+    first = poller.open_stream(max_seconds=0.2, keepalive=0.05, max_subscribers=2)
+    second = poller.open_stream(max_seconds=0.2, keepalive=0.05, max_subscribers=2)
+    assert first is not None and second is not None
+    assert poller.open_stream(max_subscribers=2) is None
+    assert poller.stats()['subscribers'] == 2
+
+    # 从未开始发送的连接被关闭时同样释放名额，且只释放一次
+    first.close()
+    first.close()
+    assert poller.stats()['subscribers'] == 1
+
+    # 事件流到期结束后释放名额
+    events = list(second)
+    assert events[0].startswith('retry:')
+    assert poller.stats()['subscribers'] == 0
+    assert poller.open_stream(max_subscribers=2) is not None
+    poller.stop()
+
+
+def test_stream_route_returns_503_when_full():
+    poller = TickPoller(lambda: make_quote(2650.0), TickRingBuffer(capacity=8), interval=0.05, idle_timeout=0.1)
+    client = backend_optimized.app.test_client()
+    with mock.patch.object(backend_optimized, 'get_tick_poller', lambda create=True: poller), \
+            mock.patch.object(Config, 'TICK_STREAM_MAX_CLIENTS', 1), \
+            mock.patch.object(Config, 'TICK_STREAM_MAX_SECONDS', 0.2):
+        streaming = client.get('/api/stream/price', buffered=False)
+        assert streaming.status_code == 200
+        rejected = client.get('/api/stream/price')
+        assert rejected.status_code == 503
+        assert rejected.headers['Retry-After'] == '1'
+        assert not rejected.get_json()['success']
+
+        streaming.close()
+        assert poller.stats()['subscribers'] == 0
+        assert client.get('/api/stream/price').status_code == 200
+    poller.stop()
+
+
+def test_format_sse():
+    event = format_sse({'seq': 7, 'price': 2650.5})
+    assert event.startswith('id: 7\nevent: price\ndata: ')
+    assert event.endswith('\n\n')
+
+
+if __name__ == "__main__":
+    test_ring_buffer_overwrites_oldest_and_reads_since_seq()
+    test_wait_since_wakes_up_on_new_tick()
+    test_poller_shares_one_upstream_poll_across_streams()
+    test_subscribe_while_poller_goes_idle_restarts_it()
+    test_open_stream_caps_concurrent_clients()
+    test_stream_route_returns_503_when_full()
+    test_format_sse()
+    print("报价推送测试完成")
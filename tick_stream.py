@@ -0,0 +1,329 @@
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from config import Config
+
+TICK_DTYPE = np.dtype([
+    ('seq', 'i8'),
+    ('ts', 'f8'),
+    ('price', 'f8'),
+    ('high', 'f8'),
+    ('low', 'f8'),
+    ('change_percent', 'f8')
+])
+
+
+class TickRingBuffer:
+    """
+    固定容量的实时报价环形缓冲区
+
+    报价保存在预分配的 numpy 结构化数组中，写满后覆盖最旧的数据。每条报价
+    带有递增序号（seq），订阅者按序号读取新报价，并可通过条件变量阻塞等待。
+    """
+
+    def __init__(self, capacity: Optional[int] = None):
+        self.capacity = capacity if capacity is not None else Config.TICK_BUFFER_SIZE
+        self._data = np.zeros(self.capacity, dtype=TICK_DTYPE)
+        self._next_seq = 1
+        self._cond = threading.Condition()
+
+    @property
+    def last_seq(self) -> int:
+        """最新报价的序号，尚无报价时为0"""
+        return self._next_seq - 1
+
+    def __len__(self) -> int:
+        return min(self.last_seq, self.capacity)
+
+    def append(self, quote: Dict) -> int:
+        """写入一条报价并唤醒等待中的订阅者，返回该报价的序号"""
+        price = float(quote['price'])
+        with self._cond:
+            seq = self._next_seq
+            self._data[seq % self.capacity] = (
+                seq,
+                time.time(),
+                price,
+                float(quote.get('high', price)),
+                float(quote.get('low', price)),
+                float(quote.get('change_percent', 0.0))
+            )
+            self._next_seq += 1
+            self._cond.notify_all()
+        return seq
+
+    def _since_locked(self, seq: int) -> List[Dict]:
+        last = self._next_seq - 1
+        # 已被覆盖的报价无法再读取，从缓冲区中最旧的一条开始
+        first = max(seq + 1, last - self.capacity + 1, 1)
+        if first > last:
+            return []
+        rows = self._data[np.arange(first, last + 1) % self.capacity]
+        return [self._to_dict(row) for row in rows]
+
+    def since(self, seq: int) -> List[Dict]:
+        """序号大于 seq 的报价（按时间顺序）"""
+        with self._cond:
+            return self._since_locked(seq)
+
+    def latest(self) -> Optional[Dict]:
+        with self._cond:
+            if self._next_seq == 1:
+                return None
+            return self._to_dict(self._data[(self._next_seq - 1) % self.capacity])
+
+    def wait_since(self, seq: int, timeout: float) -> List[Dict]:
+        """阻塞等待序号大于 seq 的报价，超时返回空列表"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._next_seq - 1 > seq, timeout=timeout)
+            return self._since_locked(seq)
+
+    @staticmethod
+    def _to_dict(row) -> Dict:
+        return {
+            'seq': int(row['seq']),
+            'price': float(row['price']),
+            'high': float(row['high']),
+            'low': float(row['low']),
+            'change_percent': float(row['change_percent']),
+            'timestamp': datetime.fromtimestamp(float(row['ts'])).isoformat()
+        }
+
+
+def format_sse(tick: Dict) -> str:
+    """按 Server-Sent Events 格式编码一条报价"""
+    return f"id: {tick['seq']}\nevent: price\ndata: {json.dumps(tick)}\n\n"
+
+
+class TickPoller:
+    """
+    高频实时报价轮询器
+
+    单个后台线程按固定间隔请求上游报价并写入环形缓冲区，所有 SSE 客户端共享
+    同一份上游请求。有订阅者时自动启动；最后一个订阅者离开 idle_timeout 秒后
+    自动停止，避免无人观看时持续请求上游。
+    """
+
+    def __init__(self, fetch_quote: Callable[[], Dict], buffer: Optional[TickRingBuffer] = None,
+                 interval: Optional[float] = None, idle_timeout: Optional[float] = None):
+        self.fetch_quote = fetch_quote
+        self.buffer = buffer if buffer is not None else TickRingBuffer()
+        self.interval = interval if interval is not None else Config.TICK_POLL_INTERVAL_SECONDS
+        self.idle_timeout = idle_timeout if idle_timeout is not None else Config.TICK_IDLE_TIMEOUT_SECONDS
+
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._subscribers = 0
+        self._last_active = time.monotonic()
+        self.polls = 0
+        self.errors = 0
+        self.last_error = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        with self._lock:
+            # 轮询线程退出前会在锁内清除 _thread；正在停止的线程不再复用
+            if self._thread is not None and not self._stop.is_set():
+                return
+            # 每个线程使用自己的停止事件，重启不会让正在停止的旧线程继续运行
+            self._stop = threading.Event()
+            self._last_active = time.monotonic()
+            self._thread = threading.Thread(target=self._run, args=(self._stop,), name='tick-poller', daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        with self._lock:
+            stop, thread = self._stop, self._thread
+        stop.set()
+        if thread is not None:
+            thread.join(timeout=self.interval + 1)
+
+    def subscribe(self, max_subscribers: Optional[int] = None) -> bool:
+        """增加一个订阅者并确保轮询线程运行；已有 max_subscribers 个订阅者时返回 False"""
+        with self._lock:
+            if max_subscribers is not None and self._subscribers >= max_subscribers:
+                return False
+            self._subscribers += 1
+            self._last_active = time.monotonic()
+        self.start()
+        return True
+
+    def unsubscribe(self) -> None:
+        with self._lock:
+            self._subscribers = max(0, self._subscribers - 1)
+            self._last_active = time.monotonic()
+
+    def _idle(self) -> bool:
+        """调用方需持有 _lock"""
+        return self._subscribers == 0 and time.monotonic() - self._last_active >= self.idle_timeout
+
+    def poll_once(self) -> Optional[int]:
+        """请求一次上游报价，有效时写入缓冲区并返回序号"""
+        self.polls += 1
+        try:
+            quote = self.fetch_quote()
+        except Exception as e:
+            self.errors += 1
+            self.last_error = str(e)
+            print(f"实时报价轮询失败: {e}")
+            return None
+
+        if not quote or not quote.get('price', 0) > 0:
+            self.errors += 1
+            self.last_error = '无有效报价'
+            return None
+        return self.buffer.append(quote)
+
+    def _run(self, stop: threading.Event) -> None:
+        print(f"实时报价轮询已启动 (间隔 {self.interval} 秒)")
+        while True:
+            # 在同一把锁内判断是否退出并清除线程引用：之后的 subscribe 一定会启动新线程
+            with self._lock:
+                if stop.is_set() or self._idle():
+                    if self._thread is threading.current_thread():
+                        self._thread = None
+                    break
+            started = time.monotonic()
+            self.poll_once()
+            stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+        print("实时报价轮询已停止")
+
+    def stream(self, last_seq: Optional[int] = None, max_seconds: Optional[float] = None,
+               keepalive: float = 15.0) -> Iterator[str]:
+        """
+        SSE 事件流：先发送最新报价（或 last_seq 之后的报价），之后每有新报价即推送。
+
+        超过 max_seconds 后结束，由浏览器 EventSource 自动重连，避免长期占用工作线程。
+        """
+        self.subscribe()
+        try:
+            yield from self._events(last_seq, max_seconds, keepalive)
+        finally:
+            self.unsubscribe()
+
+    def open_stream(self, last_seq: Optional[int] = None, max_seconds: Optional[float] = None,
+                    keepalive: float = 15.0, max_subscribers: Optional[int] = None) -> Optional[Iterator[str]]:
+        """
+        立即占用一个订阅名额并返回 SSE 事件流（同 stream），订阅数已满时返回 None
+
+        名额在事件流结束或被关闭时释放，即使响应还没开始发送。
+        """
+        if not self.subscribe(max_subscribers):
+            return None
+        return _Subscription(self, self._events(last_seq, max_seconds, keepalive))
+
+    def _events(self, last_seq: Optional[int], max_seconds: Optional[float], keepalive: float) -> Iterator[str]:
+        max_seconds = max_seconds if max_seconds is not None else Config.TICK_STREAM_MAX_SECONDS
+        yield f"retry: {int(self.interval * 1000)}\n\n"
+
+        if last_seq is None:
+            latest = self.buffer.latest()
+            if latest is not None:
+                yield format_sse(latest)
+                last_seq = latest['seq']
+            else:
+                last_seq = self.buffer.last_seq
+
+        deadline = time.monotonic() + max_seconds
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            ticks = self.buffer.wait_since(last_seq, timeout=min(keepalive, remaining))
+            if not ticks:
+                yield ": keepalive\n\n"
+                continue
+            for tick in ticks:
+                yield format_sse(tick)
+                last_seq = tick['seq']
+
+    def stats(self) -> Dict:
+        latest = self.buffer.latest()
+        with self._lock:
+            subscribers = self._subscribers
+        return {
+            'running': self.running,
+            'subscribers': subscribers,
+            'interval_seconds': self.interval,
+            'polls': self.polls,
+            'errors': self.errors,
+            'last_error': self.last_error,
+            'buffered_ticks': len(self.buffer),
+            'last_tick': latest
+        }
+
+
+class _Subscription:
+    """open_stream 返回的事件流：迭代结束或 close() 时释放订阅名额（只释放一次）"""
+
+    def __init__(self, poller: TickPoller, events: Iterator[str]):
+        self._poller = poller
+        self._events = events
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def __iter__(self) -> 'Iterator[str]':
+        return self
+
+    def __next__(self) -> str:
+        try:
+            return next(self._events)
+        except StopIteration:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._events.close()
+        self._poller.unsubscribe()
+
+
+def _make_source_poll(source: str) -> Callable[[], Dict]:
+    """轮询单个实时数据源，遵循数据源熔断状态并记录健康统计"""
+    from data_fetcher import GoldDataFetcher
+
+    fetcher = GoldDataFetcher()
+
+    def poll() -> Dict:
+        health = fetcher.source_health
+        if not health.allow('realtime', source):
+            return {}
+        start = time.monotonic()
+        try:
+            quote = fetcher._fetch_realtime_from_source(source)
+        except Exception as e:
+            health.record_failure('realtime', source, time.monotonic() - start, str(e))
+            raise
+        if quote and quote.get('price', 0) > 0:
+            health.record_success('realtime', source, time.monotonic() - start)
+        else:
+            health.record_failure('realtime', source, time.monotonic() - start, '无有效报价')
+        return quote
+
+    return poll
+
+
+_poller = None
+_poller_lock = threading.Lock()
+
+
+def get_tick_poller(create: bool = True) -> Optional[TickPoller]:
+    """进程内共享的实时报价轮询器（首次使用时创建，默认轮询 TICK_SOURCE）"""
+    global _poller
+    if _poller is None and create:
+        with _poller_lock:
+            if _poller is None:
+                _poller = TickPoller(_make_source_poll(Config.TICK_SOURCE))
+    return _poller